@@ -8,12 +8,17 @@ from .models import (
     ContactMessage,
     NewsletterSubscription,
     Order,
+    OrderDailyStats,
     OrderItem,
     Payment,
     Product,
+    ProductCard,
     ProductImage,
+    ProductSalesDaily,
     ProductVariant,
+    StockReservation,
 )
+from .services import OrderService
 
 
 @admin.register(Category)
@@ -42,10 +47,18 @@ class ProductAdmin(admin.ModelAdmin):
     inlines = [ProductImageInline, ProductVariantInline]
 
 
+@admin.register(ProductCard)
+class ProductCardAdmin(admin.ModelAdmin):
+    list_display = ("name", "category_slug", "price", "in_stock", "is_active", "updated_at")
+    list_filter = ("is_active", "in_stock")
+    search_fields = ("name",)
+
+
 @admin.register(Cart)
 class CartAdmin(admin.ModelAdmin):
-    list_display = ("id", "user", "session_key", "status", "updated_at")
+    list_display = ("id", "user", "session_key", "status", "item_count", "subtotal", "updated_at")
     list_filter = ("status",)
+    readonly_fields = ("item_count", "subtotal")
 
 
 @admin.register(CartItem)
@@ -59,6 +72,12 @@ class OrderAdmin(admin.ModelAdmin):
     list_filter = ("status",)
     search_fields = ("order_number", "user__username")
 
+    def save_model(self, request, obj, form, change):
+        if change:
+            OrderService.save(obj)
+        else:
+            super().save_model(request, obj, form, change)
+
 
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
@@ -84,3 +103,36 @@ class ContactMessageAdmin(admin.ModelAdmin):
 @admin.register(NewsletterSubscription)
 class NewsletterSubscriptionAdmin(admin.ModelAdmin):
     list_display = ("email", "is_active", "created_at")
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ("holder", "variant", "quantity", "expires_at")
+    list_filter = ("expires_at",)
+    search_fields = ("holder", "variant__sku")
+    raw_id_fields = ("variant",)
+
+
+@admin.register(OrderDailyStats)
+class OrderDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ("date", "order_count", "revenue", "placed_count", "delivered_count", "cancelled_count")
+    date_hierarchy = "date"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ProductSalesDaily)
+class ProductSalesDailyAdmin(admin.ModelAdmin):
+    list_display = ("date", "product", "units", "revenue")
+    date_hierarchy = "date"
+    raw_id_fields = ("product",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
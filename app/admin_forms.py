@@ -1,3 +1,5 @@
+import zipfile
+
 from django import forms
 from django.forms import inlineformset_factory
 
@@ -111,3 +113,33 @@ ProductVariantFormSet = inlineformset_factory(
     can_delete=True,
 )
 
+
+
+class CatalogImportForm(forms.Form):
+    catalog_file = forms.FileField(
+        help_text="CSV (one row per variant) or JSONL (one product per line).",
+        widget=forms.FileInput(attrs={"class": "form-control", "accept": ".csv,.jsonl,.ndjson"}),
+    )
+    images_zip = forms.FileField(
+        required=False,
+        help_text="Optional zip of the images referenced in the catalog file.",
+        widget=forms.FileInput(attrs={"class": "form-control", "accept": ".zip"}),
+    )
+    dry_run = forms.BooleanField(
+        required=False,
+        initial=True,
+        widget=forms.CheckboxInput(attrs={"class": "form-check-input"}),
+    )
+
+    def clean_catalog_file(self):
+        catalog_file = self.cleaned_data["catalog_file"]
+        extension = catalog_file.name.rsplit(".", 1)[-1].lower()
+        if extension not in ("csv", "jsonl", "ndjson"):
+            raise forms.ValidationError("Upload a .csv or .jsonl file.")
+        return catalog_file
+
+    def clean_images_zip(self):
+        images_zip = self.cleaned_data.get("images_zip")
+        if images_zip and not zipfile.is_zipfile(images_zip):
+            raise forms.ValidationError("Upload a valid .zip archive.")
+        return images_zip
@@ -21,16 +21,25 @@ urlpatterns = [
     # Products
     path("products/", admin_views.ProductListView.as_view(), name="product_list"),
     path("products/create/", admin_views.ProductCreateView.as_view(), name="product_create"),
+    path("products/bulk/", admin_views.ProductBulkActionView.as_view(), name="product_bulk"),
+    path("products/import/", admin_views.CatalogImportView.as_view(), name="catalog_import"),
     path("products/<int:pk>/edit/", admin_views.ProductUpdateView.as_view(), name="product_edit"),
     path("products/<int:pk>/delete/", admin_views.ProductDeleteView.as_view(), name="product_delete"),
     
     # Orders
     path("orders/", admin_views.OrderListView.as_view(), name="order_list"),
+    path("orders/bulk-status/", admin_views.OrderBulkStatusView.as_view(), name="order_bulk_status"),
+    path("orders/export/", admin_views.OrderExportView.as_view(), name="order_export"),
     path("orders/<slug:order_number>/", admin_views.OrderDetailView.as_view(), name="order_detail"),
     path("orders/<slug:order_number>/update-status/", admin_views.OrderUpdateStatusView.as_view(), name="order_update_status"),
     
+    # Inventory
+    path("inventory/availability/", admin_views.InventoryAvailabilityView.as_view(), name="inventory_availability"),
+    path("inventory/sync/", admin_views.InventorySyncView.as_view(), name="inventory_sync"),
+    
     # Messages
     path("messages/", admin_views.MessageListView.as_view(), name="message_list"),
+    path("messages/bulk/", admin_views.MessageBulkResolveView.as_view(), name="message_bulk"),
     path("messages/<int:pk>/toggle-resolved/", admin_views.MessageToggleResolvedView.as_view(), name="message_toggle_resolved"),
 ]
 
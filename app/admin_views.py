@@ -1,23 +1,31 @@
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.mixins import UserPassesTestMixin
 from django.contrib.auth.decorators import user_passes_test
-from django.db.models import Count, Sum, Q, F
-from django.db.models.functions import TruncDate
-from django.http import JsonResponse
+from django.db.models import Count, Q
+from django.http import HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.middleware.csrf import CsrfViewMiddleware
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
 from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import (
     CreateView,
     DeleteView,
     DetailView,
+    FormView,
     ListView,
     TemplateView,
     UpdateView,
     View,
 )
-from datetime import timedelta
+import hmac
+import io
+import json
+import tempfile
+import zipfile
 
 from .models import (
     Category,
@@ -30,11 +38,18 @@ from .models import (
 )
 from .admin_forms import (
     AdminLoginForm,
+    CatalogImportForm,
     CategoryForm,
     ProductForm,
     ProductImageFormSet,
     ProductVariantFormSet,
 )
+from . import exports
+from .catalog import catalog_cache
+from .importers import CatalogImporter, CatalogImportError
+from .pagination import KeysetPaginationMixin
+from .search import get_search_backend
+from .services import InventoryService, OrderService, OrderStatsService, ProductSalesService, ProductService
 
 
 class StaffRequiredMixin(UserPassesTestMixin):
@@ -50,6 +65,13 @@ class StaffRequiredMixin(UserPassesTestMixin):
         return redirect("store:home")
 
 
+class BulkSelectionMixin:
+    """Read the ``ids`` checkboxes posted from a list page's bulk action form."""
+    
+    def get_selected_ids(self):
+        return [int(pk) for pk in self.request.POST.getlist("ids") if pk.isdigit()]
+
+
 # Authentication Views
 class AdminLoginView(View):
     template_name = "admin/login.html"
@@ -91,80 +113,43 @@ class AdminDashboardView(StaffRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Date filters
-        today = timezone.now().date()
-        last_7_days = today - timedelta(days=7)
-        last_30_days = today - timedelta(days=30)
-        
-        # Order statistics
-        total_orders = Order.objects.count()
-        orders_today = Order.objects.filter(created_at__date=today).count()
-        orders_this_week = Order.objects.filter(created_at__date__gte=last_7_days).count()
-        orders_this_month = Order.objects.filter(created_at__date__gte=last_30_days).count()
-        
-        # Revenue statistics
-        total_revenue = Order.objects.aggregate(total=Sum("total"))["total"] or 0
-        revenue_today = Order.objects.filter(created_at__date=today).aggregate(total=Sum("total"))["total"] or 0
-        revenue_this_week = Order.objects.filter(created_at__date__gte=last_7_days).aggregate(total=Sum("total"))["total"] or 0
-        revenue_this_month = Order.objects.filter(created_at__date__gte=last_30_days).aggregate(total=Sum("total"))["total"] or 0
-        
-        # Order status breakdown
-        order_status = Order.objects.values("status").annotate(count=Count("id"))
+        # Order statistics: stored daily rollups plus a live read of today
+        stats = OrderStatsService.summary()
         
         # Product statistics
         total_products = Product.objects.filter(is_active=True).count()
-        low_stock_products = ProductVariant.objects.filter(
-            is_active=True,
-            stock_quantity__lte=5,
-            stock_quantity__gt=0
-        ).count()
-        out_of_stock_products = ProductVariant.objects.filter(
-            is_active=True,
-            stock_quantity=0
-        ).count()
+        variant_stock = ProductVariant.objects.filter(is_active=True).aggregate(
+            low_stock=Count("id", filter=Q(stock_quantity__lte=5, stock_quantity__gt=0)),
+            out_of_stock=Count("id", filter=Q(stock_quantity=0)),
+        )
+        low_stock_products = variant_stock["low_stock"]
+        out_of_stock_products = variant_stock["out_of_stock"]
         
         # Recent orders
         recent_orders = Order.objects.select_related("address").order_by("-created_at")[:10]
         
         # Top selling products (last 30 days)
-        top_products = (
-            Product.objects.filter(
-                order_items__order__created_at__gte=last_30_days
-            )
-            .annotate(
-                total_sold=Sum("order_items__quantity"),
-                revenue=Sum(F("order_items__quantity") * F("order_items__unit_price"))
-            )
-            .order_by("-total_sold")[:5]
-        )
+        top_products = ProductSalesService.top_products(days=30, limit=5)
         
         # Recent messages
         unresolved_messages = ContactMessage.objects.filter(is_resolved=False).count()
         
         # Daily revenue chart data (last 14 days)
-        import json
-        chart_data = []
-        for i in range(13, -1, -1):
-            date = today - timedelta(days=i)
-            daily_revenue = Order.objects.filter(
-                created_at__date=date
-            ).aggregate(total=Sum("total"))["total"] or 0
-            chart_data.append({
-                "date": date.strftime("%d %b"),
-                "revenue": float(daily_revenue)
-            })
-        chart_data_json = json.dumps(chart_data)
+        chart_data_json = json.dumps([
+            {"date": date.strftime("%d %b"), "revenue": float(revenue)}
+            for date, revenue in stats["daily_revenue"]
+        ])
         
         context.update({
-            "total_orders": total_orders,
-            "orders_today": orders_today,
-            "orders_this_week": orders_this_week,
-            "orders_this_month": orders_this_month,
-            "total_revenue": total_revenue,
-            "revenue_today": revenue_today,
-            "revenue_this_week": revenue_this_week,
-            "revenue_this_month": revenue_this_month,
-            "order_status": order_status,
+            "total_orders": stats["total_orders"],
+            "orders_today": stats["orders_today"],
+            "orders_this_week": stats["orders_this_week"],
+            "orders_this_month": stats["orders_this_month"],
+            "total_revenue": stats["total_revenue"],
+            "revenue_today": stats["revenue_today"],
+            "revenue_this_week": stats["revenue_this_week"],
+            "revenue_this_month": stats["revenue_this_month"],
+            "order_status": stats["order_status"],
             "total_products": total_products,
             "low_stock_products": low_stock_products,
             "out_of_stock_products": out_of_stock_products,
@@ -248,11 +233,14 @@ class CategoryDeleteView(StaffRequiredMixin, DeleteView):
 
 
 # Product Management Views
-class ProductListView(StaffRequiredMixin, ListView):
+class ProductListView(StaffRequiredMixin, KeysetPaginationMixin, ListView):
     model = Product
     template_name = "admin/product_list.html"
     context_object_name = "products"
     paginate_by = 20
+
+    def use_keyset_pagination(self, queryset):
+        return not self.request.GET.get("search")
     
     def get_queryset(self):
         qs = Product.objects.select_related("category").prefetch_related("images", "variants")
@@ -260,21 +248,21 @@ class ProductListView(StaffRequiredMixin, ListView):
         category = self.request.GET.get("category")
         status = self.request.GET.get("status")
         
-        if search:
-            qs = qs.filter(Q(name__icontains=search) | Q(description__icontains=search))
         if category:
             qs = qs.filter(category_id=category)
         if status == "active":
             qs = qs.filter(is_active=True)
         elif status == "inactive":
             qs = qs.filter(is_active=False)
+        if search:
+            return get_search_backend().filter(qs, search)
         
         return qs.order_by("-created_at")
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["active_menu"] = "products"
-        context["categories"] = Category.objects.filter(is_active=True)
+        context["categories"] = catalog_cache.categories()
         context["search_query"] = self.request.GET.get("search", "")
         context["filter_category"] = self.request.GET.get("category", "")
         context["filter_status"] = self.request.GET.get("status", "")
@@ -355,6 +343,27 @@ class ProductUpdateView(StaffRequiredMixin, UpdateView):
             return self.form_invalid(form)
 
 
+class ProductBulkActionView(StaffRequiredMixin, BulkSelectionMixin, View):
+    actions = {
+        "activate": ("is_active", True),
+        "deactivate": ("is_active", False),
+        "feature": ("is_featured", True),
+        "unfeature": ("is_featured", False),
+        "bestseller": ("is_bestseller", True),
+        "unbestseller": ("is_bestseller", False),
+    }
+    
+    def post(self, request):
+        ids = self.get_selected_ids()
+        action = self.actions.get(request.POST.get("action"))
+        if not ids or action is None:
+            messages.error(request, "Select products and an action.")
+        else:
+            updated = ProductService.bulk_set_flag(ids, *action)
+            messages.success(request, f"Updated {updated} of {len(ids)} selected products.")
+        return redirect("admin_panel:product_list")
+
+
 class ProductDeleteView(StaffRequiredMixin, DeleteView):
     model = Product
     success_url = reverse_lazy("admin_panel:product_list")
@@ -365,15 +374,46 @@ class ProductDeleteView(StaffRequiredMixin, DeleteView):
         return super().post(request, *args, **kwargs)
 
 
+# Catalog Import
+class CatalogImportView(StaffRequiredMixin, FormView):
+    """Upload a CSV/JSONL catalog (plus an optional images zip) and show the import report."""
+    
+    form_class = CatalogImportForm
+    template_name = "admin/catalog_import.html"
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["active_menu"] = "products"
+        return context
+    
+    def form_valid(self, form):
+        catalog_file = form.cleaned_data["catalog_file"]
+        images_zip = form.cleaned_data.get("images_zip")
+        dry_run = form.cleaned_data["dry_run"]
+        file_format = "csv" if catalog_file.name.lower().endswith(".csv") else "jsonl"
+        with tempfile.TemporaryDirectory() as images_dir:
+            if images_zip:
+                with zipfile.ZipFile(images_zip) as archive:
+                    archive.extractall(images_dir)
+            importer = CatalogImporter(images_dir=images_dir, dry_run=dry_run)
+            try:
+                report = importer.run(io.TextIOWrapper(catalog_file, encoding="utf-8-sig", newline=""), file_format)
+            except (CatalogImportError, UnicodeDecodeError) as exc:
+                form.add_error("catalog_file", str(exc))
+                return self.form_invalid(form)
+        if not dry_run:
+            messages.success(
+                self.request,
+                f"Imported {report.total('products')} products ({len(report.errors)} rows skipped).",
+            )
+        return self.render_to_response(self.get_context_data(form=form, report=report))
+
+
 # Order Management Views
-class OrderListView(StaffRequiredMixin, ListView):
-    model = Order
-    template_name = "admin/order_list.html"
-    context_object_name = "orders"
-    paginate_by = 20
+class OrderFilterMixin:
+    """Search/status filters shared by the order list and its exports."""
     
-    def get_queryset(self):
-        qs = Order.objects.select_related("address").prefetch_related("items")
+    def filter_orders(self, qs):
         search = self.request.GET.get("search")
         status = self.request.GET.get("status")
         
@@ -386,7 +426,18 @@ class OrderListView(StaffRequiredMixin, ListView):
         if status:
             qs = qs.filter(status=status)
         
-        return qs.order_by("-created_at")
+        return qs
+
+
+class OrderListView(StaffRequiredMixin, OrderFilterMixin, KeysetPaginationMixin, ListView):
+    model = Order
+    template_name = "admin/order_list.html"
+    context_object_name = "orders"
+    paginate_by = 20
+    
+    def get_queryset(self):
+        qs = Order.objects.select_related("address").prefetch_related("items")
+        return self.filter_orders(qs).order_by("-created_at")
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -397,6 +448,27 @@ class OrderListView(StaffRequiredMixin, ListView):
         return context
 
 
+class OrderExportView(StaffRequiredMixin, OrderFilterMixin, View):
+    """Stream the filtered orders as CSV (one row per order or per item) or JSONL."""
+    
+    formats = {
+        "csv": (exports.orders_csv, "text/csv", "csv"),
+        "items-csv": (exports.order_items_csv, "text/csv", "csv"),
+        "jsonl": (exports.orders_jsonl, "application/x-ndjson", "jsonl"),
+    }
+    
+    def get(self, request):
+        export_format = request.GET.get("format", "csv")
+        if export_format not in self.formats:
+            return HttpResponseBadRequest("Unknown export format.")
+        generator, content_type, extension = self.formats[export_format]
+        orders = self.filter_orders(Order.objects.all())
+        response = StreamingHttpResponse(generator(orders), content_type=content_type)
+        filename = f"orders-{timezone.localdate():%Y%m%d}{'-items' if export_format == 'items-csv' else ''}.{extension}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
 class OrderDetailView(StaffRequiredMixin, DetailView):
     model = Order
     template_name = "admin/order_detail.html"
@@ -422,8 +494,7 @@ class OrderUpdateStatusView(StaffRequiredMixin, View):
         new_status = request.POST.get("status")
         
         if new_status in dict(Order.Status.choices):
-            order.status = new_status
-            order.save(update_fields=["status"])
+            OrderService.update_status(order, new_status)
             messages.success(request, f"Order status updated to {order.get_status_display()}.")
         else:
             messages.error(request, "Invalid status.")
@@ -431,8 +502,74 @@ class OrderUpdateStatusView(StaffRequiredMixin, View):
         return redirect("admin_panel:order_detail", order_number=order_number)
 
 
+class OrderBulkStatusView(StaffRequiredMixin, BulkSelectionMixin, View):
+    def post(self, request):
+        ids = self.get_selected_ids()
+        new_status = request.POST.get("status")
+        if not ids or new_status not in dict(Order.Status.choices):
+            messages.error(request, "Select orders and a status.")
+        else:
+            updated = OrderService.bulk_update_status(ids, new_status)
+            messages.success(
+                request, f"Moved {updated} of {len(ids)} selected orders to {Order.Status(new_status).label}."
+            )
+        return redirect("admin_panel:order_list")
+
+
+# Inventory
+class InventoryAvailabilityView(StaffRequiredMixin, View):
+    """Per-variant available-to-promise: on hand, held by checkouts, and free."""
+
+    def get(self, request):
+        variants = InventoryService.availability()
+        product_id = request.GET.get("product", "")
+        if product_id.isdigit():
+            variants = variants.filter(product_id=product_id)
+        rows = variants.order_by("product_id", "id").values(
+            "id", "sku", "product_id", "product__name", "size", "color", "on_hand", "reserved", "available"
+        )
+        return JsonResponse({"variants": list(rows[:1000])})
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class InventorySyncView(View):
+    """Apply ``{"updates": [{"sku", "quantity"|"delta"}, ...]}`` from the warehouse.
+
+    Accepts ``Authorization: Bearer <INVENTORY_SYNC_TOKEN>``, or a staff
+    session, in which case the usual CSRF check applies.
+    """
+
+    def has_token(self, request):
+        token = getattr(settings, "INVENTORY_SYNC_TOKEN", "")
+        scheme, _, supplied = request.headers.get("Authorization", "").partition(" ")
+        return bool(token) and scheme.lower() == "bearer" and hmac.compare_digest(supplied.strip(), token)
+
+    def post(self, request):
+        if not self.has_token(request):
+            if not (request.user.is_authenticated and request.user.is_staff):
+                return JsonResponse({"error": "Authentication required."}, status=401)
+            rejected = CsrfViewMiddleware(lambda request: None).process_view(request, None, (), {})
+            if rejected is not None:
+                return rejected
+        try:
+            updates = json.loads(request.body).get("updates")
+        except (ValueError, AttributeError):
+            updates = None
+        if not isinstance(updates, list):
+            return JsonResponse({"error": 'Expected a JSON object with an "updates" list.'}, status=400)
+        result = InventoryService.sync_stock(updates)
+        return JsonResponse(
+            {
+                "updated": result.updated,
+                "unchanged": result.unchanged,
+                "unknown": result.unknown,
+                "errors": result.errors,
+            }
+        )
+
+
 # Contact Messages Management
-class MessageListView(StaffRequiredMixin, ListView):
+class MessageListView(StaffRequiredMixin, KeysetPaginationMixin, ListView):
     model = ContactMessage
     template_name = "admin/message_list.html"
     context_object_name = "messages"
@@ -467,3 +604,16 @@ class MessageToggleResolvedView(StaffRequiredMixin, View):
         
         return redirect("admin_panel:message_list")
 
+
+class MessageBulkResolveView(StaffRequiredMixin, BulkSelectionMixin, View):
+    def post(self, request):
+        ids = self.get_selected_ids()
+        action = request.POST.get("action")
+        if not ids or action not in ("resolve", "unresolve"):
+            messages.error(request, "Select messages and an action.")
+        else:
+            updated = ContactMessage.objects.filter(pk__in=ids).exclude(is_resolved=action == "resolve").update(
+                is_resolved=action == "resolve", updated_at=timezone.now()
+            )
+            messages.success(request, f"Marked {updated} messages as {action}d.")
+        return redirect("admin_panel:message_list")
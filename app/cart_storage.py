@@ -0,0 +1,437 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core import signing
+from django.utils.module_loading import import_string
+
+from .models import Cart, CartItem, ProductVariant
+from .services import CartService, InventoryService, OrderService
+
+
+class CartStorage:
+    """Per-request cart backend behind ``request.cart``."""
+
+    # Set while this session may hold stock for checkout, so carts without a
+    # hold never pay for the lookup in held_quantities().
+    HOLD_SESSION_KEY = "stock_hold"
+
+    def __init__(self, request):
+        self.request = request
+        # Fixed for the storage's lifetime so an anonymous cart can still be
+        # read back after login() has replaced request.user (and cycled the
+        # session key the anonymous holds were taken under).
+        self.user = request.user if request.user.is_authenticated else None
+        self.session_key = request.session.session_key
+
+    @property
+    def count(self):
+        raise NotImplementedError
+
+    def lines(self):
+        raise NotImplementedError
+
+    def quantities(self):
+        """Return ``{variant_id: quantity}`` for every line."""
+        raise NotImplementedError
+
+    def is_empty(self):
+        return self.count == 0
+
+    def reservation_holder(self):
+        if self.user:
+            return f"user:{self.user.pk}"
+        if not self.session_key:
+            if not self.request.session.session_key:
+                self.request.session.save()
+            self.session_key = self.request.session.session_key
+        return f"session:{self.session_key}"
+
+    def reserve(self):
+        """Hold stock for every line while the shopper checks out."""
+        quantities = {line.variant_id: line.quantity for line in self.lines()}
+        InventoryService.reserve(self.reservation_holder(), quantities)
+        self.request.session[self.HOLD_SESSION_KEY] = True
+
+    def held_quantities(self):
+        """Return ``{variant_id: quantity}`` this shopper's checkout hold took out of stock."""
+        if not self.request.session.get(self.HOLD_SESSION_KEY):
+            return {}
+        return InventoryService.held(self.reservation_holder())
+
+    def release(self):
+        if self.request.session.pop(self.HOLD_SESSION_KEY, None):
+            InventoryService.release(self.reservation_holder())
+
+    def create_order(self, form_data):
+        return OrderService.create_order(self.lines(), form_data, user=self.user, holder=self.reservation_holder())
+
+    def place_order(self, form_data):
+        """Turn the lines into an order, settling this shopper's hold."""
+        order = self.create_order(form_data)
+        self.request.session.pop(self.HOLD_SESSION_KEY, None)
+        return order
+
+    def totals(self):
+        raise NotImplementedError
+
+    def line(self, line_id):
+        """Return one line; raises CartItem.DoesNotExist when it is not in the cart."""
+        raise NotImplementedError
+
+    def add(self, variant, quantity):
+        """Add ``quantity`` of ``variant``; returns the resulting line."""
+        raise NotImplementedError
+
+    def add_many(self, entries):
+        """Add several ``(variant, quantity)`` pairs at once, all or nothing."""
+        raise NotImplementedError
+
+    def update(self, line_id, quantity):
+        """Set a line's quantity; returns the line, or None when it was removed."""
+        raise NotImplementedError
+
+    def remove(self, line_id):
+        raise NotImplementedError
+
+    def discard(self):
+        """Drop the stored cart after its lines were merged elsewhere."""
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def save(self, response):
+        pass
+
+
+class DatabaseCartStorage(CartStorage):
+    SESSION_KEY = "cart"
+
+    def __init__(self, request):
+        super().__init__(request)
+        self._cart = None
+        self._loaded = False
+
+    def _state(self):
+        state = self.request.session.get(self.SESSION_KEY)
+        user = self.user
+        if not isinstance(state, dict) or state.get("user") != (user.pk if user else None):
+            return None
+        return state
+
+    def _store(self, cart, count):
+        user = self.user
+        self.request.session[self.SESSION_KEY] = {
+            "id": cart.pk if cart else None,
+            "count": count,
+            "user": user.pk if user else None,
+        }
+
+    def get(self):
+        if self._loaded:
+            return self._cart
+        self._loaded = True
+        user = self.user
+        if user:
+            self._cart = Cart.objects.filter(user=user, status=Cart.Status.ACTIVE).first()
+            return self._cart
+        state = self._state()
+        if state is not None:
+            if state.get("id"):
+                self._cart = Cart.objects.filter(
+                    pk=state["id"], user__isnull=True, status=Cart.Status.ACTIVE
+                ).first()
+            return self._cart
+        session_key = self.request.session.session_key
+        if session_key:
+            self._cart = Cart.objects.filter(session_key=session_key, status=Cart.Status.ACTIVE).first()
+        return self._cart
+
+    def get_or_create(self):
+        cart = self.get()
+        if cart is not None:
+            return cart
+        user = self.user
+        if user:
+            cart, _ = Cart.objects.get_or_create(user=user, status=Cart.Status.ACTIVE)
+        else:
+            if not self.request.session.session_key:
+                self.request.session.save()
+            cart, _ = Cart.objects.get_or_create(
+                session_key=self.request.session.session_key, status=Cart.Status.ACTIVE
+            )
+        self._cart = cart
+        self._store(cart, cart.item_count)
+        return cart
+
+    @property
+    def count(self):
+        state = self._state()
+        if state is not None:
+            return state["count"]
+        if not self.user and not self.request.session.session_key:
+            return 0
+        return self.update_count()
+
+    def update_count(self):
+        cart = self.get()
+        count = 0
+        if cart is not None:
+            cart.refresh_from_db(fields=["item_count", "subtotal"])
+            count = cart.item_count
+        self._store(cart, count)
+        return count
+
+    def lines(self):
+        cart = self.get()
+        if cart is None:
+            return []
+        return list(cart.items.select_related("product", "variant").prefetch_related("product__images"))
+
+    def quantities(self):
+        cart = self.get()
+        if cart is None:
+            return {}
+        return dict(cart.items.values_list("variant_id", "quantity"))
+
+    def is_empty(self):
+        cart = self.get()
+        return cart is None or not cart.items.exists()
+
+    def totals(self):
+        return CartService.compute_totals(self.get())
+
+    def _item(self, line_id):
+        item = CartItem.objects.select_related("product", "variant__product").get(pk=line_id, cart=self.get())
+        item.cart = self.get()
+        return item
+
+    def line(self, line_id):
+        return self._item(line_id)
+
+    def add(self, variant, quantity):
+        return self.add_many([(variant, quantity)])[0]
+
+    def add_many(self, entries):
+        cart = self.get_or_create()
+        items = CartService.add_items(cart, entries, held=self.held_quantities())
+        # add_items leaves the cart's counters current.
+        self._store(cart, cart.item_count)
+        return items
+
+    def update(self, line_id, quantity):
+        item = self._item(line_id)
+        CartService.update_item(item, quantity, held=self.held_quantities().get(item.variant_id, 0))
+        self._store(item.cart, item.cart.item_count)
+        return item if quantity > 0 else None
+
+    def remove(self, line_id):
+        item = self._item(line_id)
+        CartService.remove_item(item)
+        self._store(item.cart, item.cart.item_count)
+
+    def create_order(self, form_data):
+        return OrderService.create_order([], form_data, holder=self.reservation_holder(), cart=self.get())
+
+    def discard(self):
+        cart = self.get()
+        if cart is not None:
+            cart.status = Cart.Status.ABANDONED
+            cart.save(update_fields=["status", "updated_at"])
+        self.clear()
+
+    def clear(self):
+        self._cart = None
+        self._loaded = True
+        self._store(None, 0)
+
+
+class CompactCartStorage(CartStorage):
+    """Anonymous cart kept client-side as ``variant_id:quantity`` pairs."""
+
+    def __init__(self, request):
+        super().__init__(request)
+        self._pairs = None
+        self._lines = None
+        self.modified = False
+
+    def read(self):
+        raise NotImplementedError
+
+    @staticmethod
+    def decode(value):
+        pairs = {}
+        for chunk in (value or "").split("."):
+            variant_id, _, quantity = chunk.partition(":")
+            if variant_id.isdigit() and quantity.isdigit() and int(quantity) > 0:
+                pairs[int(variant_id)] = int(quantity)
+        return pairs
+
+    @staticmethod
+    def encode(pairs):
+        return ".".join(f"{variant_id}:{quantity}" for variant_id, quantity in pairs.items())
+
+    @property
+    def pairs(self):
+        if self._pairs is None:
+            self._pairs = self.decode(self.read())
+        return self._pairs
+
+    def _set(self, variant_id, quantity):
+        if quantity > 0:
+            self.pairs[variant_id] = quantity
+        else:
+            self.pairs.pop(variant_id, None)
+        self._lines = None
+        self.modified = True
+
+    @property
+    def count(self):
+        return sum(self.pairs.values())
+
+    def quantities(self):
+        return dict(self.pairs)
+
+    def lines(self):
+        if self._lines is None:
+            variants = (
+                ProductVariant.objects.filter(pk__in=list(self.pairs), is_active=True)
+                .select_related("product")
+                .prefetch_related("product__images")
+                .in_bulk()
+            )
+            lines = []
+            for variant_id, quantity in list(self.pairs.items()):
+                variant = variants.get(variant_id)
+                if variant is None:
+                    self._set(variant_id, 0)
+                    continue
+                lines.append(self._line(variant, quantity))
+            self._lines = lines
+        return self._lines
+
+    @staticmethod
+    def _line(variant, quantity):
+        return CartItem(
+            pk=variant.pk,
+            product=variant.product,
+            variant=variant,
+            quantity=quantity,
+            unit_price=variant.product.price,
+        )
+
+    def totals(self):
+        if self._lines is not None:
+            return CartService.totals_for_subtotal(sum(line.line_total for line in self._lines))
+        # Prices alone are enough here; lines() would also load every product.
+        prices = dict(
+            ProductVariant.objects.filter(pk__in=list(self.pairs), is_active=True).values_list("pk", "product__price")
+        )
+        subtotal = sum(
+            (prices[variant_id] * quantity for variant_id, quantity in self.pairs.items() if variant_id in prices),
+            Decimal("0"),
+        )
+        return CartService.totals_for_subtotal(subtotal)
+
+    def _variant(self, line_id):
+        # Deactivated variants are hidden from lines(); they must not be re-quantified either.
+        variant = ProductVariant.objects.select_related("product").filter(pk=line_id, is_active=True).first()
+        if line_id not in self.pairs or variant is None:
+            raise CartItem.DoesNotExist
+        return variant
+
+    def line(self, line_id):
+        return self._line(self._variant(line_id), self.pairs[line_id])
+
+    def add(self, variant, quantity):
+        self.add_many([(variant, quantity)])
+        return self._line(variant, self.pairs[variant.pk])
+
+    def add_many(self, entries):
+        pairs = dict(self.pairs)
+        held = self.held_quantities()
+        for variant, quantity in entries:
+            pairs[variant.pk] = CartService.check_quantity(
+                variant, quantity, pairs.get(variant.pk, 0), held.get(variant.pk, 0)
+            )
+        for variant_id, quantity in pairs.items():
+            if quantity != self.pairs.get(variant_id):
+                self._set(variant_id, quantity)
+
+    def update(self, line_id, quantity):
+        if quantity <= 0:
+            self.remove(line_id)
+            return None
+        variant = self._variant(line_id)
+        held = self.held_quantities().get(variant.pk, 0)
+        self._set(variant.pk, CartService.check_update_quantity(variant, quantity, held))
+        return self._line(variant, self.pairs[variant.pk])
+
+    def remove(self, line_id):
+        if line_id not in self.pairs:
+            raise CartItem.DoesNotExist
+        self._set(line_id, 0)
+
+    def discard(self):
+        self.clear()
+
+    def clear(self):
+        self._pairs = {}
+        self._lines = None
+        self.modified = True
+
+
+class SignedCookieCartStorage(CompactCartStorage):
+    salt = "app.cart"
+
+    @property
+    def cookie_name(self):
+        return getattr(settings, "CART_COOKIE_NAME", "cart")
+
+    @property
+    def max_age(self):
+        return getattr(settings, "CART_COOKIE_AGE", 60 * 60 * 24 * 30)
+
+    def read(self):
+        try:
+            return self.request.get_signed_cookie(self.cookie_name, default="", salt=self.salt, max_age=self.max_age)
+        except signing.BadSignature:
+            return ""
+
+    def save(self, response):
+        if not self.modified:
+            return
+        if self.pairs:
+            response.set_signed_cookie(
+                self.cookie_name,
+                self.encode(self.pairs),
+                salt=self.salt,
+                max_age=self.max_age,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite="Lax",
+            )
+        else:
+            response.delete_cookie(self.cookie_name, samesite="Lax")
+
+
+class SessionCartStorage(CompactCartStorage):
+    SESSION_KEY = "cart_lines"
+
+    def read(self):
+        return self.request.session.get(self.SESSION_KEY, "")
+
+    def save(self, response):
+        if not self.modified:
+            return
+        if self.pairs:
+            self.request.session[self.SESSION_KEY] = self.encode(self.pairs)
+        else:
+            self.request.session.pop(self.SESSION_KEY, None)
+
+
+def get_cart_storage(request):
+    if request.user.is_authenticated:
+        return DatabaseCartStorage(request)
+    backend_path = getattr(settings, "CART_STORAGE", "app.cart_storage.DatabaseCartStorage")
+    return import_string(backend_path)(request)
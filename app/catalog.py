@@ -0,0 +1,131 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+CATALOG_VERSION_KEY = "catalog:version"
+
+logger = logging.getLogger(__name__)
+
+# Set per request by CatalogVersionMiddleware so every reader in the request
+# shares one cache GET (and one consistent view of the catalog).
+_pinned_version = ContextVar("catalog_version", default=None)
+
+
+def get_catalog_version():
+    pinned = _pinned_version.get()
+    if pinned and "version" in pinned:
+        return pinned["version"]
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    if pinned is not None:
+        pinned["version"] = version
+    return version
+
+
+def bump_catalog_version():
+    try:
+        version = cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        get_catalog_version()
+        version = cache.incr(CATALOG_VERSION_KEY)
+    pinned = _pinned_version.get()
+    if pinned is not None:
+        pinned["version"] = version
+    return version
+
+
+@contextmanager
+def pinned_catalog_version():
+    token = _pinned_version.set({})
+    try:
+        yield
+    finally:
+        _pinned_version.reset(token)
+
+
+class CatalogIndex:
+    """Per-process index over the catalog, rebuilt when the catalog version moves.
+
+    Only the first build runs inside a request. After that a version change
+    keeps the current data serving while one background thread runs ``load``,
+    which must build aside and swap the result in under ``_lock``. Subclasses
+    may also apply ``product_cards_refreshed`` payloads directly.
+    """
+
+    def __init__(self):
+        self.version = None
+        self._lock = threading.RLock()
+        self._reloading = False
+
+    def ensure_current(self):
+        version = get_catalog_version()
+        if version == self.version:
+            return
+        with self._lock:
+            if self.version is None:
+                self.load(version)
+                return
+            if self._reloading or version == self.version:
+                return
+            self._reloading = True
+        if getattr(settings, "CATALOG_INDEX_BACKGROUND_RELOAD", True):
+            threading.Thread(target=self._reload, args=(version, True), daemon=True).start()
+        else:
+            self._reload(version)
+
+    def _reload(self, version, in_thread=False):
+        try:
+            self.load(version)
+        except Exception:
+            logger.exception("Rebuilding %s failed", type(self).__name__)
+        finally:
+            self._reloading = False
+            if in_thread:
+                connections.close_all()
+
+    def load(self, version):
+        raise NotImplementedError
+
+
+class CatalogCache:
+    """Per-process copy of slow-changing catalog lookups, reloaded when the version moves."""
+
+    def __init__(self):
+        self.version = None
+        self._lock = threading.Lock()
+        self._categories = []
+        self._by_slug = {}
+
+    def _ensure_current(self):
+        version = get_catalog_version()
+        if version != self.version:
+            with self._lock:
+                if version != self.version:
+                    self.load(version)
+
+    def load(self, version):
+        from .models import Category
+
+        categories = list(Category.objects.filter(is_active=True))
+        self._categories = categories
+        self._by_slug = {category.slug: category for category in categories}
+        self.version = version
+
+    def categories(self):
+        self._ensure_current()
+        return self._categories
+
+    def category(self, slug):
+        self._ensure_current()
+        return self._by_slug.get(slug)
+
+
+catalog_cache = CatalogCache()
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+from django.utils.module_loading import import_string
+
+from . import storage
+
+
+@register(Tags.staticfiles)
+def check_static_compression(app_configs, **kwargs):
+    """Warn when collectstatic would silently skip JS minification or .br output."""
+    backend = settings.STORAGES.get("staticfiles", {}).get("BACKEND", "")
+    try:
+        storage_class = import_string(backend)
+    except ImportError:
+        return []
+    if not (isinstance(storage_class, type) and issubclass(storage_class, storage.CompressedManifestStaticFilesStorage)):
+        return []
+    warnings = []
+    if storage.rjsmin is None:
+        warnings.append(
+            Warning(
+                "rjsmin is not installed, so collectstatic will not minify JavaScript.",
+                hint="pip install rjsmin",
+                id="app.W001",
+            )
+        )
+    if storage.brotli is None:
+        warnings.append(
+            Warning(
+                "brotli is not installed, so collectstatic will only write .gz siblings, not .br.",
+                hint="pip install brotli",
+                id="app.W002",
+            )
+        )
+    return warnings
@@ -0,0 +1,144 @@
+import hashlib
+from calendar import timegm
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe, quote_etag, urlencode
+
+from .catalog import get_catalog_version
+
+
+class ConditionalPageMixin:
+    """Answer If-None-Match / If-Modified-Since with 304 before building the page.
+
+    Views implement ``get_validators()`` returning ``(version, last_modified)``
+    from cheap queries, or None to always render. The ETag also covers what
+    base.html renders per visitor (user, cart badge, CSRF cookie), so it is
+    only ever reused by the same browser.
+    """
+
+    def get_validators(self):
+        raise NotImplementedError
+
+    def visitor_state(self):
+        request = self.request
+        cart = getattr(request, "cart", None)
+        return (
+            request.user.pk if request.user.is_authenticated else None,
+            cart.count if cart is not None else 0,
+            request.META.get("CSRF_COOKIE", ""),
+        )
+
+    def get(self, request, *args, **kwargs):
+        # Pending flash messages are rendered once; never answer those with a 304.
+        validators = None if len(get_messages(request)) else self.get_validators()
+        if validators is None:
+            return super().get(request, *args, **kwargs)
+        version, last_modified = validators
+        user_id, cart_count, csrf_cookie = self.visitor_state()
+        etag = quote_etag(hashlib.md5(f"{version}|{user_id}|{cart_count}|{csrf_cookie}".encode()).hexdigest())
+        # If-Modified-Since alone cannot tell visitors apart, so only blank
+        # visitors (crawlers, first-time shoppers) get a Last-Modified.
+        timestamp = None
+        if last_modified is not None and user_id is None and not cart_count:
+            timestamp = timegm(last_modified.utctimetuple())
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        response.headers.setdefault("ETag", etag)
+        if timestamp is not None:
+            response.headers.setdefault("Last-Modified", http_date(timestamp))
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ["Cookie"])
+        return response
+
+
+class SharedPageCacheMixin:
+    """Serve anonymous visitors one shared rendering of the page from the cache.
+
+    The shared copy leaves out the cart badge, flash messages and CSRF token;
+    main.js fills those in from ``SessionStateView``. Without scripts its POST
+    forms (newsletter, add to cart) would be rejected, so it is only served
+    to browsers carrying the ``script_cookie`` main.js sets; first visits and
+    visitors without JavaScript get a private rendering. Entries are keyed on the
+    path, the ``page_cache_params`` the view reads and the catalog version, so
+    a hit skips the view and the ORM entirely. Requests carrying any other
+    query parameter are rendered but not cached, so made-up query strings
+    cannot fill the cache. Place before ``ConditionalPageMixin`` so a hit also
+    skips its validators.
+    """
+
+    shared_page = False
+    page_cache_params = ()
+    script_cookie = "js"
+
+    def shares_page(self):
+        request = self.request
+        return (
+            request.method == "GET"
+            and not request.user.is_authenticated
+            and self.script_cookie in request.COOKIES
+            and request.GET.keys() <= set(self.page_cache_params)
+            and not len(get_messages(request))
+        )
+
+    def page_cache_key(self):
+        # QueryDict indexing returns the last value, which is what views read.
+        params = urlencode([(name, self.request.GET[name]) for name in self.page_cache_params if name in self.request.GET])
+        path = hashlib.md5(f"{self.request.path}?{params}".encode()).hexdigest()
+        return f"page:{get_catalog_version()}:{path}"
+
+    def visitor_state(self):
+        if self.shared_page:
+            return None, 0, ""
+        return super().visitor_state()
+
+    def get(self, request, *args, **kwargs):
+        self.shared_page = self.shares_page()
+        if not self.shared_page:
+            return super().get(request, *args, **kwargs)
+        key = self.page_cache_key()
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type, validators = cached
+            response = None
+            if validators:
+                last_modified = validators.get("Last-Modified")
+                response = get_conditional_response(
+                    request,
+                    etag=validators.get("ETag"),
+                    last_modified=parse_http_date_safe(last_modified) if last_modified else None,
+                )
+            if response is None:
+                response = HttpResponse(content, content_type=content_type)
+            if validators:
+                for name, value in validators.items():
+                    response.headers[name] = value
+                patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ["Cookie"])
+            return response
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200 and hasattr(response, "add_post_render_callback"):
+            timeout = getattr(settings, "PAGE_CACHE_TIMEOUT", 10 * 60)
+
+            def store(rendered):
+                validators = {name: rendered[name] for name in ("ETag", "Last-Modified") if rendered.has_header(name)}
+                cache.set(key, (rendered.content, rendered["Content-Type"], validators), timeout)
+
+            response.add_post_render_callback(store)
+        return response
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if self.shared_page:
+            context["shared_page"] = True
+            context["cart_count"] = 0
+            # The csrf context processor's own "no token" value: {% csrf_token %}
+            # renders nothing and the token is never generated for this visitor.
+            context["csrf_token"] = "NOTPROVIDED"
+        return context
@@ -1,9 +1,5 @@
-from .services import CartService
-
-
 def cart_context(request):
-    cart = CartService.get_or_create_cart(request)
+    cart = getattr(request, "cart", None)
     return {
-        "cart_count": sum(item.quantity for item in cart.items.all()),
+        "cart_count": cart.count if cart is not None else 0,
     }
-
@@ -0,0 +1,198 @@
+import csv
+import json
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import OrderItem
+
+ORDER_FIELDS = [
+    "id",
+    "order_number",
+    "created_at",
+    "status",
+    "subtotal",
+    "shipping",
+    "total",
+    "address__full_name",
+    "address__phone",
+    "address__email",
+    "address__address_line",
+    "address__city",
+    "address__state",
+    "address__pincode",
+    "payment__method",
+    "payment__status",
+]
+
+ORDER_COLUMNS = [
+    "order_number",
+    "created_at",
+    "status",
+    "subtotal",
+    "shipping",
+    "total",
+    "full_name",
+    "phone",
+    "email",
+    "address",
+    "city",
+    "state",
+    "pincode",
+    "payment_method",
+    "payment_status",
+    "item_count",
+    "items",
+]
+
+ITEM_FIELDS = ["order_id", "product_id", "product_name", "variant_snapshot", "unit_price", "quantity"]
+
+ITEM_COLUMNS = [
+    "order_number",
+    "created_at",
+    "status",
+    "product_id",
+    "product_name",
+    "variant",
+    "unit_price",
+    "quantity",
+    "line_total",
+]
+
+
+# Cells starting with these are evaluated as formulas by spreadsheet apps.
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def spreadsheet_safe(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+class Echo:
+    """File-like object whose write() hands the row back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+class SafeWriter:
+    """CSV writer that quotes customer-entered text so it cannot run as a formula."""
+
+    def __init__(self):
+        self.writer = csv.writer(Echo())
+
+    def writerow(self, row):
+        return self.writer.writerow([spreadsheet_safe(value) for value in row])
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def order_batches(orders, chunk_size=2000):
+    """Yield lists of order dicts, each with its items attached, one chunk at a time."""
+    rows = orders.order_by("-created_at", "-id").values(*ORDER_FIELDS).iterator(chunk_size=chunk_size)
+    for batch in batched(rows, chunk_size):
+        items = {}
+        item_rows = (
+            OrderItem.objects.filter(order_id__in=[row["id"] for row in batch])
+            .order_by("order_id", "id")
+            .values(*ITEM_FIELDS)
+        )
+        for item in item_rows:
+            items.setdefault(item["order_id"], []).append(item)
+        for row in batch:
+            row["items"] = items.get(row["id"], [])
+        yield batch
+
+
+def _order_record(row):
+    return {
+        "order_number": row["order_number"],
+        "created_at": row["created_at"],
+        "status": row["status"],
+        "subtotal": row["subtotal"],
+        "shipping": row["shipping"],
+        "total": row["total"],
+        "address": {
+            "full_name": row["address__full_name"],
+            "phone": row["address__phone"],
+            "email": row["address__email"],
+            "address": row["address__address_line"],
+            "city": row["address__city"],
+            "state": row["address__state"],
+            "pincode": row["address__pincode"],
+        },
+        "payment": {"method": row["payment__method"], "status": row["payment__status"]},
+        "items": [
+            {
+                "product_id": item["product_id"],
+                "product_name": item["product_name"],
+                "variant": item["variant_snapshot"],
+                "unit_price": item["unit_price"],
+                "quantity": item["quantity"],
+            }
+            for item in row["items"]
+        ],
+    }
+
+
+def orders_csv(orders, chunk_size=2000):
+    writer = SafeWriter()
+    yield writer.writerow(ORDER_COLUMNS)
+    for batch in order_batches(orders, chunk_size):
+        for row in batch:
+            yield writer.writerow(
+                [
+                    row["order_number"],
+                    row["created_at"].isoformat(),
+                    row["status"],
+                    row["subtotal"],
+                    row["shipping"],
+                    row["total"],
+                    row["address__full_name"],
+                    row["address__phone"],
+                    row["address__email"],
+                    row["address__address_line"],
+                    row["address__city"],
+                    row["address__state"],
+                    row["address__pincode"],
+                    row["payment__method"] or "",
+                    row["payment__status"] or "",
+                    sum(item["quantity"] for item in row["items"]),
+                    "; ".join(
+                        f"{item['product_name']} ({item['variant_snapshot']}) x {item['quantity']}"
+                        for item in row["items"]
+                    ),
+                ]
+            )
+
+
+def order_items_csv(orders, chunk_size=2000):
+    writer = SafeWriter()
+    yield writer.writerow(ITEM_COLUMNS)
+    for batch in order_batches(orders, chunk_size):
+        for row in batch:
+            for item in row["items"]:
+                yield writer.writerow(
+                    [
+                        row["order_number"],
+                        row["created_at"].isoformat(),
+                        row["status"],
+                        item["product_id"],
+                        item["product_name"],
+                        item["variant_snapshot"],
+                        item["unit_price"],
+                        item["quantity"],
+                        item["unit_price"] * item["quantity"],
+                    ]
+                )
+
+
+def orders_jsonl(orders, chunk_size=2000):
+    for batch in order_batches(orders, chunk_size):
+        yield "".join(json.dumps(_order_record(row), cls=DjangoJSONEncoder) + "\n" for row in batch)
@@ -0,0 +1,209 @@
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+
+from .catalog import CatalogIndex
+from .models import ProductCard
+
+SIZE_ORDER = ["S", "M", "L", "XL", "XXL", "6M", "12M", "18M", "24M", "3Y"]
+
+
+def parse_price(value):
+    if value in (None, ""):
+        return None
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        return None
+
+
+def sort_sizes(sizes):
+    known = [size for size in SIZE_ORDER if size in sizes]
+    return known + sorted(size for size in sizes if size not in SIZE_ORDER)
+
+
+def mask_from_positions(positions, width):
+    bits = bytearray((width + 7) // 8)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, "little")
+
+
+def positions_from_mask(mask):
+    positions = []
+    while mask:
+        low = mask & -mask
+        positions.append(low.bit_length() - 1)
+        mask ^= low
+    return positions
+
+
+@dataclass
+class FacetResult:
+    count: int
+    mask: int = field(repr=False)
+    categories: dict
+    sizes: dict
+    prices: dict
+    in_stock: int
+
+
+class FacetIndex(CatalogIndex):
+    STATE = (
+        "_positions",
+        "_product_ids",
+        "_prices",
+        "_all",
+        "_in_stock",
+        "_categories",
+        "_sizes",
+        "_price_buckets",
+        "_sorted_prices",
+    )
+
+    def __init__(self):
+        super().__init__()
+        self._reset()
+
+    def _reset(self):
+        self._positions = {}
+        self._product_ids = []
+        self._prices = []
+        self._all = 0
+        self._in_stock = 0
+        self._categories = {}
+        self._sizes = {}
+        self._price_buckets = {}
+        self._sorted_prices = None
+
+    def price_buckets(self):
+        bounds = getattr(settings, "FACET_PRICE_BUCKETS", [499, 999, 1999])
+        buckets = []
+        lower = 0
+        for upper in bounds:
+            buckets.append((f"{lower}-{upper}", Decimal(upper)))
+            lower = upper
+        buckets.append((f"{lower}+", None))
+        return buckets
+
+    def _bucket_for(self, price):
+        for label, upper in self.price_buckets():
+            if upper is None or price <= upper:
+                return label
+        return None
+
+    def load(self, version):
+        # Built in a scratch index so queries keep using the current bitsets meanwhile.
+        scratch = FacetIndex()
+        cards = ProductCard.objects.filter(is_active=True).only(
+            "product_id", "category_slug", "price", "in_stock", "sizes"
+        )
+        for card in cards.iterator(chunk_size=2000):
+            scratch._set(card)
+        with self._lock:
+            for name in self.STATE:
+                setattr(self, name, getattr(scratch, name))
+            self.version = version
+
+    def _clear(self, position):
+        bit = 1 << position
+        self._all &= ~bit
+        self._in_stock &= ~bit
+        for bitsets in (self._categories, self._sizes, self._price_buckets):
+            for key, mask in list(bitsets.items()):
+                if mask & bit:
+                    bitsets[key] = mask & ~bit
+
+    def _set(self, card):
+        position = self._positions.get(card.product_id)
+        if position is None:
+            position = len(self._product_ids)
+            self._positions[card.product_id] = position
+            self._product_ids.append(card.product_id)
+            self._prices.append(card.price)
+        else:
+            self._clear(position)
+            self._prices[position] = card.price
+        self._sorted_prices = None
+        if not card.is_active:
+            return
+        bit = 1 << position
+        self._all |= bit
+        if card.in_stock:
+            self._in_stock |= bit
+        self._categories[card.category_slug] = self._categories.get(card.category_slug, 0) | bit
+        for size in card.size_list:
+            self._sizes[size] = self._sizes.get(size, 0) | bit
+        bucket = self._bucket_for(card.price)
+        if bucket:
+            self._price_buckets[bucket] = self._price_buckets.get(bucket, 0) | bit
+
+    def apply_cards(self, cards, version):
+        with self._lock:
+            if self.version is None or self.version != version - 1:
+                return
+            for card in cards:
+                self._set(card)
+            self.version = version
+
+    def _price_mask(self, min_price, max_price):
+        if self._sorted_prices is None:
+            order = sorted(range(len(self._prices)), key=self._prices.__getitem__)
+            self._sorted_prices = ([self._prices[position] for position in order], order)
+        prices, order = self._sorted_prices
+        start = bisect_left(prices, min_price) if min_price is not None else 0
+        end = bisect_right(prices, max_price) if max_price is not None else len(prices)
+        return mask_from_positions(order[start:end], len(self._prices))
+
+    def query(self, category=None, size=None, min_price=None, max_price=None, in_stock=None):
+        self.ensure_current()
+        with self._lock:
+            everything = self._all
+            filters = {
+                "category": self._categories.get(category, 0) if category else everything,
+                "size": self._sizes.get(size, 0) if size else everything,
+                "price": (
+                    self._price_mask(min_price, max_price)
+                    if min_price is not None or max_price is not None
+                    else everything
+                ),
+                "in_stock": self._in_stock if in_stock else everything,
+            }
+
+            def matching(exclude=None):
+                mask = everything
+                for name, filter_mask in filters.items():
+                    if name != exclude:
+                        mask &= filter_mask
+                return mask
+
+            mask = matching()
+            without_category = matching("category")
+            without_size = matching("size")
+            without_price = matching("price")
+            return FacetResult(
+                count=mask.bit_count(),
+                mask=mask,
+                categories={
+                    slug: (bits & without_category).bit_count()
+                    for slug, bits in self._categories.items()
+                },
+                sizes={
+                    size_name: (bits & without_size).bit_count()
+                    for size_name, bits in self._sizes.items()
+                },
+                prices={
+                    label: (self._price_buckets.get(label, 0) & without_price).bit_count()
+                    for label, _ in self.price_buckets()
+                },
+                in_stock=(mask & self._in_stock).bit_count(),
+            )
+
+    def product_ids(self, result):
+        with self._lock:
+            return [self._product_ids[position] for position in positions_from_mask(result.mask)]
+
+
+facet_index = FacetIndex()
@@ -0,0 +1,146 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .catalog import bump_catalog_version
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_FORMATS = {
+    "jpeg": (".jpg", {"quality": 82, "optimize": True, "progressive": True}),
+    "webp": (".webp", {"quality": 80, "method": 4}),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def derivative_widths():
+    return sorted(getattr(settings, "IMAGE_DERIVATIVE_WIDTHS", [320, 640, 1024, 1600]))
+
+
+def derivative_name(name, width, extension):
+    return f"derivatives/{os.path.splitext(name)[0]}-{width}{extension}"
+
+
+def build_derivatives(name, storage=None):
+    """Write resized JPEG and WebP copies of ``name``; runs in a worker process.
+
+    Widths wider than the source are skipped; a source narrower than the
+    largest width also gets a copy at its own size. Returns the mapping
+    stored in the model's ``derivatives`` field.
+    """
+    storage = storage or default_storage
+    with storage.open(name) as handle, Image.open(handle) as source:
+        image = ImageOps.exif_transpose(source)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        if image.mode == "RGBA":
+            flattened = Image.new("RGB", image.size, "white")
+            flattened.paste(image, mask=image.getchannel("A"))
+            image = flattened
+        width, height = image.size
+        result = {"source": name, "width": width, "height": height}
+        widths = derivative_widths()
+        targets = [target for target in widths if target < width]
+        if width < widths[-1]:
+            targets.append(width)
+        for target in targets:
+            resized = image if target == width else image.resize((target, round(height * target / width)), Image.LANCZOS)
+            for image_format, (extension, options) in DERIVATIVE_FORMATS.items():
+                buffer = BytesIO()
+                resized.save(buffer, image_format.upper(), **options)
+                path = derivative_name(name, target, extension)
+                if storage.exists(path):
+                    storage.delete(path)
+                result.setdefault(image_format, {})[str(target)] = storage.save(path, ContentFile(buffer.getvalue()))
+    return result
+
+
+def delete_derivatives(derivatives, storage=None):
+    storage = storage or default_storage
+    for image_format in DERIVATIVE_FORMATS:
+        for path in (derivatives or {}).get(image_format, {}).values():
+            storage.delete(path)
+
+
+def save_derivatives(model_label, pk, result):
+    """Record a finished build unless the image was replaced in the meantime."""
+    model = apps.get_model(model_label)
+    if not model.objects.filter(pk=pk, image=result["source"]).update(derivatives=result, updated_at=timezone.now()):
+        delete_derivatives(result)
+        return
+    if model_label == "app.ProductImage":
+        from .services import ProductCardService
+
+        ProductCardService.refresh(model.objects.filter(pk=pk).values_list("product_id", flat=True))
+    else:
+        bump_catalog_version()
+
+
+def init_worker():
+    import django
+
+    django.setup()
+
+
+def process_pool(max_workers=None):
+    """Worker processes for derivative builds.
+
+    Workers are spawned, not forked: a web worker has request threads and
+    open database connections that a forked child would inherit mid-use.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max_workers or getattr(settings, "IMAGE_DERIVATIVE_WORKERS", 2),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+    )
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = process_pool()
+        return _executor
+
+
+def _finish(model_label, pk, future):
+    try:
+        save_derivatives(model_label, pk, future.result())
+    except Exception:
+        logger.exception("Building image derivatives for %s %s failed", model_label, pk)
+    finally:
+        # Done-callbacks run on the executor's management thread.
+        connections.close_all()
+
+
+def submit_derivatives(model_label, pk, name):
+    if not getattr(settings, "IMAGE_DERIVATIVES_ASYNC", True):
+        save_derivatives(model_label, pk, build_derivatives(name))
+        return
+    future = get_executor().submit(build_derivatives, name)
+    future.add_done_callback(lambda done: _finish(model_label, pk, done))
+
+
+def schedule_derivatives(instance):
+    """Queue a derivative build for ``instance.image`` once the transaction commits."""
+    name = instance.image.name if instance.image else ""
+    current = instance.derivatives or {}
+    if not name or current.get("source") == name:
+        return
+    model_label, pk = instance._meta.label, instance.pk
+    if current:
+        transaction.on_commit(lambda: delete_derivatives(current))
+    transaction.on_commit(lambda: submit_derivatives(model_label, pk, name))
@@ -0,0 +1,539 @@
+import csv
+import hashlib
+import json
+import os
+import re
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from itertools import groupby, islice
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.text import slugify
+from PIL import Image
+
+from .images import schedule_derivatives
+from .models import Category, Product, ProductImage, ProductVariant
+from .search import get_search_backend
+from .services import ProductCardService
+
+TRUE_VALUES = {"1", "true", "yes", "y", "on"}
+PRODUCT_UPDATE_FIELDS = ["category", "name", "price", "updated_at"]
+# Written only when the input has the column, so a partial file never resets them.
+OPTIONAL_PRODUCT_FIELDS = ["description", "original_price", "is_featured", "is_bestseller", "is_active"]
+VARIANT_UPDATE_FIELDS = ["product", "size", "color", "updated_at"]
+OPTIONAL_VARIANT_FIELDS = ["stock_quantity", "is_active"]
+
+
+class CatalogImportError(Exception):
+    pass
+
+
+@dataclass
+class ProductRecord:
+    line: int
+    slug: str
+    name: str
+    category: str
+    price: Decimal
+    # The OPTIONAL_PRODUCT_FIELDS given in the input.
+    fields: dict
+    variants: list
+    images: list
+
+
+@dataclass
+class BatchReport:
+    number: int
+    products: int = 0
+    products_created: int = 0
+    products_updated: int = 0
+    variants_created: int = 0
+    variants_updated: int = 0
+    images: int = 0
+    errors: list = field(default_factory=list)
+    diff: list = field(default_factory=list)
+
+    def summary(self):
+        return (
+            f"batch {self.number}: {self.products} products "
+            f"(+{self.products_created} ~{self.products_updated}), "
+            f"variants +{self.variants_created} ~{self.variants_updated}, "
+            f"{self.images} images, {len(self.errors)} errors"
+        )
+
+
+@dataclass
+class ImportReport:
+    dry_run: bool
+    batches: list = field(default_factory=list)
+
+    def total(self, name):
+        return sum(getattr(batch, name) for batch in self.batches)
+
+    @property
+    def errors(self):
+        return [error for batch in self.batches for error in batch.errors]
+
+    @property
+    def diff(self):
+        return [line for batch in self.batches for line in batch.diff]
+
+
+def _decimal(value, name, required=True):
+    if value in (None, ""):
+        if required:
+            raise CatalogImportError(f"{name} is required.")
+        return None
+    try:
+        number = Decimal(str(value))
+    except InvalidOperation:
+        raise CatalogImportError(f"{name} must be a number, got {value!r}.")
+    if number < 0:
+        raise CatalogImportError(f"{name} cannot be negative.")
+    return number.quantize(Decimal("0.01"))
+
+
+def _given(value):
+    return value not in (None, "")
+
+
+def _flag(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def _split_images(value):
+    if isinstance(value, list):
+        return [str(path).strip() for path in value if str(path).strip()]
+    return [path.strip() for path in (value or "").split("|") if path.strip()]
+
+
+def read_rows(stream, file_format):
+    """Yield ``(line_number, row)`` from a CSV or JSONL text stream."""
+    if file_format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, {key.strip(): (value or "").strip() for key, value in row.items() if key}
+    elif file_format == "jsonl":
+        for line_number, line in enumerate(stream, start=1):
+            if line.strip():
+                try:
+                    yield line_number, json.loads(line)
+                except ValueError as exc:
+                    yield line_number, {"_error": f"Invalid JSON: {exc}"}
+    else:
+        raise CatalogImportError(f"Unsupported format {file_format!r}; use csv or jsonl.")
+
+
+def group_products(rows):
+    """Merge consecutive flat variant rows of the same product; nested JSONL passes through."""
+
+    def key(item):
+        _, row = item
+        return row.get("slug") or slugify(row.get("name", ""))
+
+    for _, group in groupby(rows, key=key):
+        group = list(group)
+        line, first = group[0]
+        if "variants" in first or "_error" in first:
+            for line, row in group:
+                yield line, row
+            continue
+        product = dict(first)
+        product["variants"] = [
+            {
+                "sku": row.get("sku"),
+                "size": row.get("size"),
+                "color": row.get("color", ""),
+                "stock_quantity": row.get("stock_quantity"),
+                "is_active": row.get("variant_active"),
+            }
+            for _, row in group
+            if row.get("sku")
+        ]
+        images = []
+        for _, row in group:
+            images.extend(path for path in _split_images(row.get("images")) if path not in images)
+        product["images"] = images
+        yield line, product
+
+
+def parse_record(line, raw):
+    if "_error" in raw:
+        raise CatalogImportError(raw["_error"])
+    name = (raw.get("name") or "").strip()
+    if not name:
+        raise CatalogImportError("name is required.")
+    category = (raw.get("category") or "").strip()
+    if not category:
+        raise CatalogImportError("category is required.")
+    variants = []
+    combos = set()
+    for variant in raw.get("variants") or []:
+        sku = (variant.get("sku") or "").strip()
+        size = (variant.get("size") or "").strip()
+        color = (variant.get("color") or "").strip()
+        if not sku or not size:
+            raise CatalogImportError("every variant needs a sku and a size.")
+        if (size, color) in combos:
+            raise CatalogImportError(f"duplicate variant {size} {color}".strip() + ".")
+        combos.add((size, color))
+        fields = {"sku": sku, "size": size, "color": color}
+        if _given(variant.get("stock_quantity")):
+            try:
+                fields["stock_quantity"] = int(variant["stock_quantity"])
+            except (TypeError, ValueError):
+                raise CatalogImportError(f"stock_quantity for {sku} must be a whole number.")
+            if fields["stock_quantity"] < 0:
+                raise CatalogImportError(f"stock_quantity for {sku} cannot be negative.")
+        if _given(variant.get("is_active")):
+            fields["is_active"] = _flag(variant["is_active"])
+        variants.append(fields)
+    fields = {}
+    if "description" in raw:
+        fields["description"] = raw["description"] or ""
+    if "original_price" in raw:
+        fields["original_price"] = _decimal(raw["original_price"], "original_price", required=False)
+    for flag in ("is_featured", "is_bestseller", "is_active"):
+        if _given(raw.get(flag)):
+            fields[flag] = _flag(raw[flag])
+    return ProductRecord(
+        line=line,
+        slug=slugify(raw.get("slug") or name),
+        name=name,
+        category=category,
+        price=_decimal(raw.get("price"), "price"),
+        fields=fields,
+        variants=variants,
+        images=_split_images(raw.get("images")),
+    )
+
+
+def image_target(slug, path):
+    return f"products/import/{slug}-{os.path.basename(path)}"
+
+
+def imported_from(name, target):
+    """Whether a stored image ``name`` came from the file behind ``target``, in any version."""
+    stem, extension = os.path.splitext(target)
+    return re.fullmatch(rf"{re.escape(stem)}(-[0-9a-f]{{12}})?(_[A-Za-z0-9]{{7}})?{re.escape(extension)}", name) is not None
+
+
+def store_image(source, target):
+    """Validate and copy one image into storage; safe to call from worker threads.
+
+    The stored name carries a hash of the content, so importing the same file
+    again reuses it while a changed file lands next to it under a new name.
+    Returns ``(name, created)``.
+    """
+    with Image.open(source) as image:
+        image.verify()
+    digest = hashlib.sha256()
+    with open(source, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 16), b""):
+            digest.update(chunk)
+    stem, extension = os.path.splitext(target)
+    name = f"{stem}-{digest.hexdigest()[:12]}{extension}"
+    if default_storage.exists(name):
+        return name, False
+    with open(source, "rb") as handle:
+        return default_storage.save(name, File(handle)), True
+
+
+def delete_files(names):
+    for name in names:
+        default_storage.delete(name)
+
+
+class CatalogImporter:
+    """Upsert products, variants and images from CSV/JSONL in validated batches.
+
+    CSV input has one row per variant; rows of a product must be consecutive
+    and share its slug (or name). JSONL input has one product per line with
+    nested ``variants`` and ``images`` lists. Image paths are relative to
+    ``images_dir``; the first image of a product becomes primary. Optional
+    columns left out of the input keep their stored values.
+    """
+
+    def __init__(self, images_dir=None, dry_run=False, batch_size=None, workers=None, progress=None):
+        self.images_dir = os.path.realpath(images_dir) if images_dir else None
+        self.dry_run = dry_run
+        self.batch_size = batch_size or getattr(settings, "CATALOG_IMPORT_BATCH_SIZE", 500)
+        self.workers = workers or getattr(settings, "CATALOG_IMPORT_WORKERS", min(8, os.cpu_count() or 1))
+        self.progress = progress
+        self._categories = {}
+
+    def run(self, stream, file_format):
+        report = ImportReport(dry_run=self.dry_run)
+        products = group_products(read_rows(stream, file_format))
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            self.pool = pool
+            number = 0
+            while batch := list(islice(products, self.batch_size)):
+                number += 1
+                batch_report = self.import_batch(number, batch)
+                report.batches.append(batch_report)
+                if self.progress:
+                    self.progress(batch_report)
+        return report
+
+    def _image_source(self, path):
+        if not self.images_dir:
+            raise CatalogImportError(f"image {path} given but no images directory.")
+        source = os.path.realpath(os.path.join(self.images_dir, path))
+        if os.path.commonpath([source, self.images_dir]) != self.images_dir or not os.path.isfile(source):
+            raise CatalogImportError(f"image {path} not found.")
+        return source
+
+    def _validate(self, report, batch):
+        records = {}
+        skus = set()
+        for line, raw in batch:
+            try:
+                record = parse_record(line, raw)
+                if record.slug in records:
+                    raise CatalogImportError(f"product {record.slug} appears twice in this batch.")
+                batch_skus = {variant["sku"] for variant in record.variants}
+                if len(batch_skus) != len(record.variants):
+                    raise CatalogImportError("a SKU is repeated within the product.")
+                if batch_skus & skus:
+                    raise CatalogImportError(f"SKU {sorted(batch_skus & skus)[0]} appears twice in this batch.")
+                for path in record.images:
+                    self._image_source(path)
+            except CatalogImportError as exc:
+                report.errors.append(f"line {line}: {exc}")
+                continue
+            skus |= batch_skus
+            records[record.slug] = record
+        return records
+
+    def _resolve_categories(self, report, records):
+        wanted = {record.category for record in records.values()} - self._categories.keys()
+        if wanted:
+            for category in Category.objects.filter(name__in=wanted) | Category.objects.filter(slug__in=wanted):
+                self._categories[category.name] = category
+                self._categories[category.slug] = category
+        missing = sorted({record.category for record in records.values()} - self._categories.keys())
+        for name in missing:
+            report.diff.append(f"+ category {name}")
+            if self.dry_run:
+                self._categories[name] = name
+            else:
+                self._categories[name], _ = Category.objects.get_or_create(name=name, defaults={"slug": slugify(name)})
+
+    def _diff(self, report, records):
+        existing = {
+            row["slug"]: row
+            for row in Product.objects.filter(slug__in=records).values(
+                "slug", "name", "category__name", "price", *OPTIONAL_PRODUCT_FIELDS
+            )
+        }
+        skus = [variant["sku"] for record in records.values() for variant in record.variants]
+        variants = {}
+        for row in ProductVariant.objects.filter(Q(sku__in=skus) | Q(product__slug__in=records)).values(
+            "sku", "product__slug", "size", "color", *OPTIONAL_VARIANT_FIELDS
+        ):
+            variants[row["sku"]] = row
+            variants[(row["product__slug"], row["size"], row["color"])] = row
+        for slug, record in records.items():
+            current = existing.get(slug)
+            if current is None:
+                report.products_created += 1
+                report.diff.append(f"+ product {slug} ({len(record.variants)} variants)")
+            else:
+                report.products_updated += 1
+                changes = [
+                    f"{name} {current[key]} -> {value}"
+                    for name, key, value in [
+                        ("name", "name", record.name),
+                        ("category", "category__name", self._categories.get(record.category, record.category)),
+                        ("price", "price", record.price),
+                        *[(name, name, value) for name, value in record.fields.items() if name != "description"],
+                    ]
+                    if str(current[key]) != str(value)
+                ]
+                if current["description"] != record.fields.get("description", current["description"]):
+                    changes.append("description changed")
+                if changes:
+                    report.diff.append(f"~ product {slug}: " + ", ".join(changes))
+            for variant in record.variants:
+                current_variant = variants.get(variant["sku"]) or variants.get(
+                    (slug, variant["size"], variant["color"])
+                )
+                if current_variant is None:
+                    report.variants_created += 1
+                    continue
+                report.variants_updated += 1
+                changes = [
+                    f"{name} {current_variant[key]} -> {value}"
+                    for name, key, value in [
+                        ("sku", "sku", variant["sku"]),
+                        ("product", "product__slug", slug),
+                        ("size", "size", variant["size"]),
+                        ("color", "color", variant["color"]),
+                        ("stock", "stock_quantity", variant.get("stock_quantity")),
+                        ("is_active", "is_active", variant.get("is_active")),
+                    ]
+                    if value is not None and current_variant[key] != value
+                ]
+                if changes:
+                    report.diff.append(f"~ variant {current_variant['sku']}: " + ", ".join(changes))
+            report.images += len(record.images)
+
+    def _store_images(self, records):
+        """Store every image of the batch; returns ``({(slug, position): name}, created names)``.
+
+        If any image fails, the files this call created are removed again.
+        """
+        jobs = {}
+        for record in records.values():
+            for position, path in enumerate(record.images):
+                jobs[(record.slug, position)] = self.pool.submit(
+                    store_image, self._image_source(path), image_target(record.slug, path)
+                )
+        stored, created, failure = {}, [], None
+        for key, future in jobs.items():
+            try:
+                stored[key], is_new = future.result()
+            except (OSError, SyntaxError, ValueError) as exc:
+                failure = failure or exc
+                continue
+            if is_new:
+                created.append(stored[key])
+        if failure:
+            delete_files(created)
+            raise failure
+        return stored, created
+
+    def import_batch(self, number, batch):
+        report = BatchReport(number=number)
+        records = self._validate(report, batch)
+        report.products = len(records)
+        if not records:
+            return report
+        self._resolve_categories(report, records)
+        self._diff(report, records)
+        if self.dry_run:
+            return report
+
+        # File work happens before the write transaction so it never holds the
+        # lock; files it created are removed again if the batch is not saved.
+        try:
+            stored, created = self._store_images(records)
+        except (OSError, SyntaxError, ValueError) as exc:
+            report.errors.append(f"batch {number}: image processing failed: {exc}")
+            return report
+
+        try:
+            product_ids = self._write(records, stored)
+        except IntegrityError as exc:
+            delete_files(created)
+            report.errors.append(f"batch {number}: not saved: {exc}")
+            return report
+        except Exception:
+            delete_files(created)
+            raise
+
+        # bulk_create skips model signals, so refresh the read models directly.
+        ids = list(product_ids.values())
+        ProductCardService.refresh(ids)
+        get_search_backend().index_product_ids(ids)
+        return report
+
+    def _write(self, records, stored):
+        with transaction.atomic():
+            # One upsert per set of optional columns, since update_fields is per statement.
+            products = defaultdict(list)
+            for slug, record in records.items():
+                columns = tuple(name for name in OPTIONAL_PRODUCT_FIELDS if name in record.fields)
+                products[columns].append(
+                    Product(
+                        slug=slug,
+                        category=self._categories[record.category],
+                        name=record.name,
+                        price=record.price,
+                        **record.fields,
+                    )
+                )
+            for columns, batch in products.items():
+                Product.objects.bulk_create(
+                    batch,
+                    update_conflicts=True,
+                    unique_fields=["slug"],
+                    update_fields=PRODUCT_UPDATE_FIELDS + list(columns),
+                )
+            product_ids = dict(Product.objects.filter(slug__in=records).values_list("slug", "id"))
+            # A size/colour already on the product keeps its row even when the
+            # file gives it a new SKU; everything else upserts on SKU.
+            by_combo = {
+                (product_id, size, color): (pk, sku)
+                for pk, product_id, size, color, sku in ProductVariant.objects.filter(
+                    product_id__in=product_ids.values()
+                ).values_list("pk", "product_id", "size", "color", "sku")
+            }
+            renamed = defaultdict(list)
+            upserts = defaultdict(list)
+            for slug, record in records.items():
+                for variant in record.variants:
+                    columns = tuple(name for name in OPTIONAL_VARIANT_FIELDS if name in variant)
+                    instance = ProductVariant(product_id=product_ids[slug], **variant)
+                    pk, sku = by_combo.get((instance.product_id, instance.size, instance.color), (None, None))
+                    if pk is not None and sku != instance.sku:
+                        instance.pk = pk
+                        instance.updated_at = timezone.now()
+                        renamed[columns].append(instance)
+                    else:
+                        upserts[columns].append(instance)
+            for columns, batch in renamed.items():
+                ProductVariant.objects.bulk_update(batch, ["sku", "updated_at", *columns])
+            for columns, batch in upserts.items():
+                ProductVariant.objects.bulk_create(
+                    batch,
+                    update_conflicts=True,
+                    unique_fields=["sku"],
+                    update_fields=VARIANT_UPDATE_FIELDS + list(columns),
+                )
+            self._write_images(records, stored, product_ids)
+        return product_ids
+
+    def _write_images(self, records, stored, product_ids):
+        current = defaultdict(list)
+        for image in ProductImage.objects.filter(product_id__in=product_ids.values()):
+            current[image.product_id].append(image)
+        new_images, replaced, replaced_files = [], [], []
+        for (slug, position), name in stored.items():
+            product_id = product_ids[slug]
+            images = current[product_id]
+            if any(image.image.name == name for image in images):
+                continue
+            # A changed file from the same source path replaces the earlier
+            # copy in place, keeping its primary flag and ordering.
+            target = image_target(slug, records[slug].images[position])
+            previous = next((image for image in images if imported_from(image.image.name, target)), None)
+            if previous is not None:
+                replaced_files.append(previous.image.name)
+                previous.image = name
+                previous.updated_at = timezone.now()
+                replaced.append(previous)
+                continue
+            new_images.append(
+                ProductImage(
+                    product_id=product_id,
+                    image=name,
+                    is_primary=position == 0 and not any(image.is_primary for image in images),
+                    alt_text=records[slug].name,
+                )
+            )
+        ProductImage.objects.bulk_update(replaced, ["image", "updated_at"])
+        for image in replaced + ProductImage.objects.bulk_create(new_images):
+            schedule_derivatives(image)
+        if replaced_files:
+            transaction.on_commit(lambda: delete_files(replaced_files))
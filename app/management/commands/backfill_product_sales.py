@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from app.services import ProductSalesService
+
+
+class Command(BaseCommand):
+    help = "Rebuild the ProductSalesDaily rollup from order items (all history by default)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, help="Only rebuild the last N days, including today.")
+
+    def handle(self, *args, **options):
+        start = None
+        if options["days"]:
+            start = timezone.localdate() - timedelta(days=options["days"] - 1)
+        rebuilt = ProductSalesService.rebuild(start=start)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} product sales rows."))
@@ -0,0 +1,62 @@
+from concurrent.futures import as_completed
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.core.management.base import BaseCommand
+
+from app.images import build_derivatives, process_pool
+from app.models import Category, ProductImage
+from app.services import ProductCardService
+
+
+class Command(BaseCommand):
+    help = "Build resized JPEG/WebP derivatives for product and category images that lack them."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Rebuild images that already have derivatives.")
+        parser.add_argument("--workers", type=int, help="Worker processes (default IMAGE_DERIVATIVE_WORKERS).")
+        parser.add_argument(
+            "--static",
+            nargs="*",
+            metavar="PATH",
+            help="Files in the first STATICFILES_DIRS entry to build derivatives for (default STATIC_IMAGE_DERIVATIVES).",
+        )
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        jobs = []
+        for model in (ProductImage, Category):
+            for pk, name, derivatives in model.objects.exclude(image="").exclude(image=None).values_list(
+                "pk", "image", "derivatives"
+            ):
+                if options["force"] or (derivatives or {}).get("source") != name:
+                    jobs.append((model, pk, name))
+
+        static_paths = options["static"]
+        if static_paths is None:
+            static_paths = getattr(settings, "STATIC_IMAGE_DERIVATIVES", [])
+        static_storage = FileSystemStorage(location=settings.STATICFILES_DIRS[0]) if static_paths else None
+        built = failed = 0
+        product_image_ids = []
+        with process_pool(workers) as pool:
+            futures = {pool.submit(build_derivatives, name): (model, pk, name) for model, pk, name in jobs}
+            futures.update(
+                {pool.submit(build_derivatives, path, static_storage): (None, None, path) for path in static_paths}
+            )
+            for future in as_completed(futures):
+                model, pk, name = futures[future]
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f"{name}: {exc}")
+                    continue
+                built += 1
+                if model is not None and model.objects.filter(pk=pk, image=name).update(derivatives=result):
+                    if model is ProductImage:
+                        product_image_ids.append(pk)
+
+        # Cards copy the primary image's derivatives; refresh them once at the end.
+        product_ids = ProductImage.objects.filter(pk__in=product_image_ids).values_list("product_id", flat=True)
+        ProductCardService.refresh(product_ids)
+        self.stdout.write(self.style.SUCCESS(f"Built derivatives for {built} images ({failed} failed)."))
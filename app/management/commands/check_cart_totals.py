@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+
+from app.models import Cart
+from app.services import CartService
+
+
+class Command(BaseCommand):
+    help = "Compare stored cart item counts and subtotals with their items, optionally repairing drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Rewrite drifted carts from their items.")
+        parser.add_argument("--all", action="store_true", help="Check ordered and abandoned carts too.")
+
+    def handle(self, *args, **options):
+        carts = CartService.cart_totals_queryset()
+        if not options["all"]:
+            carts = carts.filter(status=Cart.Status.ACTIVE)
+        drifted = carts.filter(~Q(item_count=F("actual_count")) | ~Q(subtotal=F("actual_subtotal")))
+        found = 0
+        for cart in drifted.iterator():
+            found += 1
+            self.stdout.write(
+                f"Cart {cart.pk}: stored {cart.item_count} items / {cart.subtotal}, "
+                f"actual {cart.actual_count} items / {cart.actual_subtotal}"
+            )
+            if options["fix"]:
+                CartService.recalculate_totals(cart)
+        if not found:
+            self.stdout.write(self.style.SUCCESS("All cart totals match."))
+        elif options["fix"]:
+            self.stdout.write(self.style.SUCCESS(f"Repaired {found} carts."))
+        else:
+            self.stdout.write(self.style.WARNING(f"{found} carts have drifted; run with --fix to repair."))
@@ -0,0 +1,47 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.importers import CatalogImporter, CatalogImportError
+
+
+class Command(BaseCommand):
+    help = "Import products, variants and images from a CSV or JSONL catalog file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Catalog file (.csv or .jsonl).")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension.")
+        parser.add_argument("--images-dir", help="Directory image paths are relative to (default: the file's directory).")
+        parser.add_argument("--batch-size", type=int, help="Products per transaction.")
+        parser.add_argument("--workers", type=int, help="Threads used to copy images.")
+        parser.add_argument("--dry-run", action="store_true", help="Report changes without writing anything.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or ("csv" if path.lower().endswith(".csv") else "jsonl")
+        importer = CatalogImporter(
+            images_dir=options["images_dir"] or os.path.dirname(os.path.abspath(path)),
+            dry_run=options["dry_run"],
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            progress=lambda batch: self.stdout.write(batch.summary()),
+        )
+        try:
+            with open(path, encoding="utf-8-sig", newline="") as stream:
+                report = importer.run(stream, file_format)
+        except (OSError, CatalogImportError) as exc:
+            raise CommandError(str(exc))
+
+        for line in report.diff if options["dry_run"] else []:
+            self.stdout.write(line)
+        for error in report.errors:
+            self.stderr.write(error)
+        verb = "Would import" if options["dry_run"] else "Imported"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {report.total('products')} products "
+                f"({report.total('products_created')} new), "
+                f"{report.total('variants_created') + report.total('variants_updated')} variants, "
+                f"{report.total('images')} images; {len(report.errors)} rows skipped."
+            )
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from app.services import ProductCardService
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized product card rows used by storefront listings."
+
+    def handle(self, *args, **options):
+        refreshed = ProductCardService.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {refreshed} product cards."))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from app.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the product full-text search index."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        indexed = backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} products with {type(backend).__name__}."))
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from app.services import ProductSalesService
+
+
+class Command(BaseCommand):
+    help = "Set is_bestseller on the top sellers from the sales rollup and clear it everywhere else."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=getattr(settings, "BESTSELLER_WINDOW_DAYS", 30))
+        parser.add_argument("--limit", type=int, default=getattr(settings, "BESTSELLER_COUNT", 8))
+        parser.add_argument("--by", choices=["units", "revenue"], default="units")
+
+    def handle(self, *args, **options):
+        changed = ProductSalesService.refresh_bestsellers(days=options["days"], limit=options["limit"], by=options["by"])
+        self.stdout.write(self.style.SUCCESS(f"Updated is_bestseller on {len(changed)} products."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from app.services import InventoryService
+
+
+class Command(BaseCommand):
+    help = "Return stock held by expired checkout reservations. Run every minute or so from cron."
+
+    def handle(self, *args, **options):
+        released = InventoryService.release_expired()
+        self.stdout.write(self.style.SUCCESS(f"Released {released} expired reservations."))
@@ -0,0 +1,53 @@
+import csv
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.services import InventoryService
+
+
+class Command(BaseCommand):
+    help = "Apply warehouse stock updates keyed by SKU from a CSV or JSONL file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV with sku and quantity/delta columns, or JSONL; '-' reads JSONL from stdin.")
+        parser.add_argument("--delta", action="store_true", help="Treat a CSV quantity column as a delta.")
+        parser.add_argument("--chunk-size", type=int, help="Updates per transaction.")
+
+    def read_updates(self, stream, is_csv, delta):
+        if not is_csv:
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        for row in csv.DictReader(stream):
+            update = {"sku": row.get("sku", "")}
+            if row.get("delta") not in (None, ""):
+                update["delta"] = row["delta"].strip()
+            elif row.get("quantity") not in (None, ""):
+                update["delta" if delta else "quantity"] = row["quantity"].strip()
+            yield update
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        try:
+            if path == "-":
+                result = InventoryService.sync_stock(self.read_updates(sys.stdin, False, False), options["chunk_size"])
+            else:
+                with open(path, encoding="utf-8-sig", newline="") as stream:
+                    updates = self.read_updates(stream, path.lower().endswith(".csv"), options["delta"])
+                    result = InventoryService.sync_stock(updates, options["chunk_size"])
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        for error in result.errors:
+            self.stderr.write(error)
+        if result.unknown:
+            self.stderr.write(f"Unknown SKUs ({len(result.unknown)}): {', '.join(result.unknown[:50])}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Updated {result.updated} variants, {result.unchanged} unchanged, "
+                f"{len(result.unknown)} unknown SKUs, {len(result.errors)} invalid rows."
+            )
+        )
@@ -0,0 +1,28 @@
+from .cart_storage import get_cart_storage
+from .catalog import pinned_catalog_version
+
+
+class CartMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        storage = request.cart = get_cart_storage(request)
+        response = self.get_response(request)
+        # Logging in swaps request.cart; the anonymous storage still needs to
+        # drop its cookie or session entry.
+        if request.cart is not storage:
+            storage.save(response)
+        request.cart.save(response)
+        return response
+
+
+class CatalogVersionMiddleware:
+    """Read the catalog version once per request; later reads reuse it."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with pinned_catalog_version():
+            return self.get_response(request)
@@ -1,4 +1,5 @@
 from django.conf import settings
+from django.core.files.storage import default_storage
 from django.core.validators import MinValueValidator
 from django.db import models
 from django.utils import timezone
@@ -18,6 +19,7 @@ class Category(TimeStampedModel):
     slug = models.SlugField(max_length=140, unique=True)
     is_active = models.BooleanField(default=True, db_index=True)
     image = models.ImageField(upload_to="categories/", blank=True, null=True)
+    derivatives = models.JSONField(default=dict, blank=True, editable=False)
 
     class Meta:
         ordering = ["name"]
@@ -83,6 +85,7 @@ class ProductImage(TimeStampedModel):
     image = models.ImageField(upload_to="products/")
     is_primary = models.BooleanField(default=False, db_index=True)
     alt_text = models.CharField(max_length=200, blank=True)
+    derivatives = models.JSONField(default=dict, blank=True, editable=False)
 
     class Meta:
         ordering = ["-is_primary", "id"]
@@ -116,6 +119,57 @@ class ProductVariant(TimeStampedModel):
         return f"{self.product.name} - {self.size}{color}"
 
 
+class ProductCard(models.Model):
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name="card")
+    name = models.CharField(max_length=200)
+    slug = models.SlugField(max_length=220)
+    category_slug = models.SlugField(max_length=140)
+    category_name = models.CharField(max_length=120)
+    image = models.CharField(max_length=255, blank=True)
+    image_derivatives = models.JSONField(default=dict, blank=True)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    original_price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+    discount_percent = models.PositiveSmallIntegerField(default=0)
+    in_stock = models.BooleanField(default=False)
+    sizes = models.CharField(max_length=255, blank=True)
+    default_size = models.CharField(max_length=20, blank=True)
+    default_color = models.CharField(max_length=30, blank=True)
+    is_active = models.BooleanField(default=True)
+    is_featured = models.BooleanField(default=False)
+    is_bestseller = models.BooleanField(default=False)
+    created_at = models.DateTimeField(db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    SIZE_SEPARATOR = "|"
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["is_active", "created_at"]),
+            models.Index(fields=["is_active", "category_slug", "created_at"]),
+            models.Index(fields=["is_active", "is_featured"]),
+            models.Index(fields=["is_active", "is_bestseller"]),
+            models.Index(fields=["is_active", "price"]),
+        ]
+
+    @classmethod
+    def size_lookup(cls, size):
+        return f"{cls.SIZE_SEPARATOR}{size}{cls.SIZE_SEPARATOR}"
+
+    @property
+    def size_list(self):
+        return [size for size in self.sizes.split(self.SIZE_SEPARATOR) if size]
+
+    @property
+    def image_url(self):
+        if not self.image:
+            return ""
+        return default_storage.url(self.image)
+
+    def __str__(self):
+        return self.name
+
+
 class Cart(TimeStampedModel):
     class Status(models.TextChoices):
         ACTIVE = "active", "Active"
@@ -125,6 +179,9 @@ class Cart(TimeStampedModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, blank=True, null=True, related_name="carts")
     session_key = models.CharField(max_length=40, blank=True, db_index=True)
     status = models.CharField(max_length=12, choices=Status.choices, default=Status.ACTIVE, db_index=True)
+    # Maintained by CartService on every item change; see check_cart_totals.
+    item_count = models.PositiveIntegerField(default=0)
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0)
 
     class Meta:
         indexes = [
@@ -135,10 +192,6 @@ class Cart(TimeStampedModel):
     def __str__(self):
         return f"Cart {self.pk} ({self.status})"
 
-    @property
-    def subtotal(self):
-        return sum(item.line_total for item in self.items.select_related("product"))
-
 
 class CartItem(TimeStampedModel):
     cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name="items")
@@ -164,6 +217,26 @@ class CartItem(TimeStampedModel):
         return f"{self.product.name} x {self.quantity}"
 
 
+class StockReservation(TimeStampedModel):
+    """Units held for a shopper during checkout; already deducted from stock."""
+
+    variant = models.ForeignKey(ProductVariant, on_delete=models.CASCADE, related_name="reservations")
+    holder = models.CharField(max_length=64)
+    quantity = models.PositiveIntegerField(validators=[MinValueValidator(1)])
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["holder", "variant"], name="unique_holder_variant"),
+        ]
+        indexes = [
+            models.Index(fields=["variant", "expires_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.holder}: {self.variant_id} x {self.quantity}"
+
+
 class Address(TimeStampedModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, blank=True, null=True, related_name="addresses")
     full_name = models.CharField(max_length=120)
@@ -208,6 +281,52 @@ class Order(TimeStampedModel):
         return self.order_number
 
 
+class OrderDailyStats(models.Model):
+    """Order rollup per local calendar day the orders were placed."""
+
+    date = models.DateField(unique=True)
+    order_count = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    placed_count = models.PositiveIntegerField(default=0)
+    confirmed_count = models.PositiveIntegerField(default=0)
+    shipped_count = models.PositiveIntegerField(default=0)
+    delivered_count = models.PositiveIntegerField(default=0)
+    cancelled_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-date"]
+        verbose_name_plural = "order daily stats"
+
+    def __str__(self):
+        return f"{self.date}: {self.order_count} orders"
+
+    @staticmethod
+    def status_field(status):
+        return f"{status}_count"
+
+
+class ProductSalesDaily(models.Model):
+    """Units and revenue per product per day, excluding cancelled orders."""
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="sales_daily")
+    date = models.DateField()
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["product", "date"], name="unique_product_sales_day"),
+        ]
+        indexes = [
+            models.Index(fields=["date", "product"]),
+        ]
+        verbose_name_plural = "product sales daily"
+
+    def __str__(self):
+        return f"{self.product_id} on {self.date}: {self.units}"
+
+
 class OrderItem(TimeStampedModel):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="items")
     product = models.ForeignKey(Product, on_delete=models.PROTECT, related_name="order_items")
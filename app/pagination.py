@@ -0,0 +1,141 @@
+import base64
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(direction, values):
+    payload = json.dumps([direction, [value.isoformat() if hasattr(value, "isoformat") else value for value in values]])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        direction, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        return None
+    if direction not in ("next", "previous") or not isinstance(values, list):
+        return None
+    return direction, values
+
+
+class KeysetPaginator:
+    def __init__(self, queryset, per_page, count=None):
+        self.object_list = queryset
+        self.per_page = per_page
+        self._count = count
+
+    @property
+    def count(self):
+        return self._count
+
+
+class KeysetPage:
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, next_query=None, previous_query=None, first_query=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_query = next_query
+        self.previous_query = previous_query
+        self.first_query = first_query
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_query is not None
+
+    def has_previous(self):
+        return self.previous_query is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginationMixin:
+    """Cursor pagination over (created_at, id), newest first."""
+
+    keyset_pagination = True
+    keyset_fields = ("created_at", "id")
+    cursor_kwarg = "cursor"
+    keyset_estimate_count = True
+
+    def use_keyset_pagination(self, queryset):
+        return self.keyset_pagination
+
+    def estimate_count(self, queryset):
+        timeout = getattr(settings, "KEYSET_COUNT_CACHE_SECONDS", 60)
+        key = "keyset:count:" + hashlib.md5(str(queryset.query).encode()).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, timeout)
+        return count
+
+    def _cursor_values(self, values):
+        created_at = parse_datetime(values[0]) if isinstance(values[0], str) else values[0]
+        return [created_at, *values[1:]]
+
+    def _cursor_filter(self, values, direction):
+        first, second = self.keyset_fields
+        created_at, pk = self._cursor_values(values)
+        lookup = "lt" if direction == "next" else "gt"
+        return Q(**{f"{first}__{lookup}": created_at}) | Q(**{first: created_at, f"{second}__{lookup}": pk})
+
+    def _query_for(self, direction=None, obj=None):
+        params = self.request.GET.copy()
+        params.pop(self.cursor_kwarg, None)
+        params.pop(self.page_kwarg, None)
+        if direction:
+            values = [getattr(obj, field) for field in self.keyset_fields]
+            params[self.cursor_kwarg] = encode_cursor(direction, values)
+        return params.urlencode()
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_keyset_pagination(queryset):
+            return super().paginate_queryset(queryset, page_size)
+        first, second = self.keyset_fields
+        cursor = decode_cursor(self.request.GET.get(self.cursor_kwarg, ""))
+        count = self.estimate_count(queryset) if self.keyset_estimate_count else None
+        direction = cursor[0] if cursor else "next"
+        page_qs = queryset
+        if cursor:
+            try:
+                page_qs = page_qs.filter(self._cursor_filter(cursor[1], direction))
+            except (IndexError, TypeError, ValueError):
+                cursor = None
+                direction = "next"
+                page_qs = queryset
+        if direction == "previous":
+            page_qs = page_qs.order_by(first, second)
+        else:
+            page_qs = page_qs.order_by(f"-{first}", f"-{second}")
+        rows = list(page_qs[: page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if direction == "previous":
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, cursor is not None
+
+        page = KeysetPage(
+            rows,
+            KeysetPaginator(queryset, page_size, count=count),
+            next_query=self._query_for("next", rows[-1]) if rows and has_next else None,
+            previous_query=self._query_for("previous", rows[0]) if rows and has_previous else None,
+            first_query=self._query_for() if has_previous else None,
+        )
+        return page.paginator, page, rows, page.has_other_pages()
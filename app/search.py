@@ -0,0 +1,220 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import OuterRef, Q, Subquery
+from django.utils.module_loading import import_string
+
+from .models import Product
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(query):
+    return TOKEN_RE.findall((query or "").lower())
+
+
+class SearchBackend:
+    batch_size = 500
+
+    def setup(self):
+        pass
+
+    def max_results(self):
+        return getattr(settings, "SEARCH_MAX_RESULTS", 500)
+
+    def search(self, query, limit=None):
+        """Return up to ``limit`` matching product ids, best first."""
+        raise NotImplementedError
+
+    def filter(self, queryset, query, field="pk"):
+        """Restrict ``queryset`` to products matching ``query``, best matches first.
+
+        ``field`` holds the product id on ``queryset``'s model. Matching runs in
+        the same query as the caller's own filters, so no result cap applies.
+        """
+        raise NotImplementedError
+
+    def index_products(self, products):
+        pass
+
+    def remove_products(self, product_ids):
+        pass
+
+    def index_product_ids(self, product_ids):
+        product_ids = sorted(set(product_ids))
+        for start in range(0, len(product_ids), self.batch_size):
+            products = Product.objects.filter(pk__in=product_ids[start:start + self.batch_size]).select_related("category")
+            self.index_products(products)
+
+    def rebuild(self):
+        product_ids = list(Product.objects.order_by("pk").values_list("pk", flat=True))
+        self.index_product_ids(product_ids)
+        return len(product_ids)
+
+
+class SimpleSearchBackend(SearchBackend):
+    @staticmethod
+    def _matches(tokens):
+        condition = Q()
+        for token in tokens:
+            condition &= (
+                Q(name__icontains=token)
+                | Q(description__icontains=token)
+                | Q(category__name__icontains=token)
+            )
+        return Product.objects.filter(condition)
+
+    def search(self, query, limit=None):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        qs = self._matches(tokens).order_by("-created_at").values_list("pk", flat=True)
+        return list(qs[: limit or self.max_results()])
+
+    def filter(self, queryset, query, field="pk"):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.none()
+        return queryset.filter(**{f"{field}__in": self._matches(tokens).values("pk")}).order_by("-created_at")
+
+
+class SQLiteFTS5Backend(SearchBackend):
+    table = "app_product_search"
+    # bm25 column weights for (name, description, category).
+    weights = (10.0, 1.0, 5.0)
+
+    def __init__(self):
+        self._table_ready = False
+
+    def setup(self):
+        self._table_ready = False
+        self.ensure_table()
+
+    def ensure_table(self):
+        if self._table_ready:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+                "name, description, category, "
+                "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+        self._table_ready = True
+
+    def _match_expression(self, query):
+        tokens = tokenize(query)
+        return " ".join(f'"{token}"*' for token in tokens)
+
+    def search(self, query, limit=None):
+        expression = self._match_expression(query)
+        if not expression:
+            return []
+        self.ensure_table()
+        weights = ", ".join(str(weight) for weight in self.weights)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s "
+                f"ORDER BY bm25({self.table}, {weights}) LIMIT %s",
+                [expression, limit or self.max_results()],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def filter(self, queryset, query, field="pk"):
+        expression = self._match_expression(query)
+        if not expression:
+            return queryset.none()
+        self.ensure_table()
+        opts = queryset.model._meta
+        column = (opts.pk if field == "pk" else opts.get_field(field)).column
+        weights = ", ".join(str(weight) for weight in self.weights)
+        # A join rather than an id list: bm25 ranks every match and the
+        # caller's filters apply before any slicing.
+        return queryset.extra(
+            select={"search_rank": f"bm25({self.table}, {weights})"},
+            tables=[self.table],
+            where=[f"{self.table}.rowid = {opts.db_table}.{column}", f"{self.table} MATCH %s"],
+            params=[expression],
+        ).order_by("search_rank", "-created_at")
+
+    def index_products(self, products):
+        rows = [(product.pk, product.name, product.description, product.category.name) for product in products]
+        if not rows:
+            return
+        self.remove_products([row[0] for row in rows])
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {self.table} (rowid, name, description, category) VALUES (%s, %s, %s, %s)",
+                rows,
+            )
+
+    def remove_products(self, product_ids):
+        product_ids = list(product_ids)
+        if not product_ids:
+            return
+        self.ensure_table()
+        with connection.cursor() as cursor:
+            for start in range(0, len(product_ids), self.batch_size):
+                chunk = product_ids[start:start + self.batch_size]
+                placeholders = ", ".join(["%s"] * len(chunk))
+                cursor.execute(f"DELETE FROM {self.table} WHERE rowid IN ({placeholders})", chunk)
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+        self.setup()
+        return super().rebuild()
+
+
+class PostgresSearchBackend(SearchBackend):
+    # Ranks on the fly; a stored tsvector column with a GIN index can be
+    # populated from index_products() once the catalog needs it.
+    @staticmethod
+    def _rank(query):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        vector = (
+            SearchVector("name", weight="A")
+            + SearchVector("category__name", weight="B")
+            + SearchVector("description", weight="C")
+        )
+        return SearchRank(vector, SearchQuery(query, search_type="websearch"))
+
+    def search(self, query, limit=None):
+        if not tokenize(query):
+            return []
+        qs = (
+            Product.objects.annotate(search_rank=self._rank(query))
+            .filter(search_rank__gt=0)
+            .order_by("-search_rank", "-created_at")
+            .values_list("pk", flat=True)
+        )
+        return list(qs[: limit or self.max_results()])
+
+    def filter(self, queryset, query, field="pk"):
+        if not tokenize(query):
+            return queryset.none()
+        rank = Product.objects.filter(pk=OuterRef(field)).annotate(search_rank=self._rank(query)).values("search_rank")
+        return (
+            queryset.annotate(search_rank=Subquery(rank[:1]))
+            .filter(search_rank__gt=0)
+            .order_by("-search_rank", "-created_at")
+        )
+
+
+_backend = None
+
+
+def get_search_backend():
+    global _backend
+    if _backend is None:
+        backend_path = getattr(settings, "SEARCH_BACKEND", None)
+        if backend_path:
+            _backend = import_string(backend_path)()
+        elif connection.vendor == "sqlite":
+            _backend = SQLiteFTS5Backend()
+        elif connection.vendor == "postgresql":
+            _backend = PostgresSearchBackend()
+        else:
+            _backend = SimpleSearchBackend()
+    return _backend
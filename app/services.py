@@ -1,11 +1,35 @@
-from dataclasses import dataclass
+import itertools
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
 
 from django.conf import settings
-from django.db import transaction
-from django.db.models import F
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, DecimalField, ExpressionWrapper, F, OuterRef, PositiveIntegerField, Prefetch, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, TruncDate
+from django.dispatch import Signal
+from django.utils import timezone
 from django.utils.crypto import get_random_string
 
-from .models import Address, Cart, CartItem, Order, OrderItem, Payment, ProductVariant
+from .catalog import bump_catalog_version
+from .models import (
+    Address,
+    Cart,
+    CartItem,
+    Order,
+    OrderDailyStats,
+    OrderItem,
+    Payment,
+    Product,
+    ProductCard,
+    ProductImage,
+    ProductSalesDaily,
+    ProductVariant,
+    StockReservation,
+)
+from .search import get_search_backend
 
 
 class CartError(Exception):
@@ -23,40 +47,99 @@ class CartTotals:
     total: object
 
 
-class CartService:
-    @staticmethod
-    def _ensure_session_key(request):
-        if not request.session.session_key:
-            request.session.save()
-        return request.session.session_key
+@dataclass
+class CartMergeResult:
+    cart: object
+    merged: int = 0
+    # (variant_id, requested, applied) for lines merged with fewer units than
+    # the anonymous cart held, because of MAX_CART_QTY or stock.
+    clamped: list = field(default_factory=list)
+    # variant_ids that could not be added at all (inactive, gone or out of stock).
+    dropped: list = field(default_factory=list)
 
-    @classmethod
-    def get_or_create_cart(cls, request):
-        user = request.user if request.user.is_authenticated else None
-        if user:
-            cart, _ = Cart.objects.get_or_create(user=user, status=Cart.Status.ACTIVE)
-            return cart
-        session_key = cls._ensure_session_key(request)
-        cart, _ = Cart.objects.get_or_create(session_key=session_key, status=Cart.Status.ACTIVE)
-        return cart
 
+@dataclass
+class VariantChoice:
+    product: object
+    variant: object
+    needs_color: bool
+
+
+@dataclass
+class StockSyncResult:
+    updated: int = 0
+    unchanged: int = 0
+    unknown: list = field(default_factory=list)
+    errors: list = field(default_factory=list)
+
+
+class CartService:
     @classmethod
-    def merge_carts(cls, user, session_key):
-        if not user or not session_key:
-            return
-        try:
-            session_cart = Cart.objects.get(session_key=session_key, status=Cart.Status.ACTIVE)
-        except Cart.DoesNotExist:
-            return
+    @transaction.atomic
+    def merge_carts(cls, user, source, held=None):
+        """Fold an anonymous cart from any storage backend into the user's cart.
+
+        Reads the incoming variants together with the user's current quantity
+        in one query and writes every merged line with one upsert, capping
+        each at MAX_CART_QTY and stock (plus the user's own ``held`` units, as
+        in check_quantity). Returns a CartMergeResult, or None when there was
+        nothing to merge.
+        """
+        incoming = source.quantities()
+        if not user or not incoming:
+            return None
+        held = held or {}
         user_cart, _ = Cart.objects.get_or_create(user=user, status=Cart.Status.ACTIVE)
-        for item in session_cart.items.all():
-            cls.add_item(user_cart, item.variant, item.quantity)
-        session_cart.status = Cart.Status.ABANDONED
-        session_cart.save(update_fields=["status"])
+        result = CartMergeResult(cart=user_cart)
+        max_qty = getattr(settings, "MAX_CART_QTY", 10)
+        existing_quantity = CartItem.objects.filter(cart=user_cart, variant=OuterRef("pk")).values("quantity")[:1]
+        variants = (
+            ProductVariant.objects.filter(pk__in=list(incoming))
+            .select_related("product")
+            .annotate(existing=Coalesce(Subquery(existing_quantity), 0))
+            .in_bulk()
+        )
+        items = []
+        for variant_id, quantity in incoming.items():
+            variant = variants.get(variant_id)
+            available = variant.stock_quantity + held.get(variant_id, 0) if variant else 0
+            if variant is None or not variant.is_active or available <= 0:
+                result.dropped.append(variant_id)
+                continue
+            applied = min(variant.existing + quantity, max_qty, available)
+            # Only a line left with fewer units than the shopper picked is worth
+            # reporting; topping up a line already at the cap loses nothing.
+            if applied < quantity:
+                result.clamped.append((variant_id, quantity, applied))
+            if applied <= variant.existing:
+                continue
+            items.append(
+                CartItem(
+                    cart=user_cart,
+                    variant=variant,
+                    product=variant.product,
+                    quantity=applied,
+                    unit_price=variant.product.price,
+                )
+            )
+        if items:
+            CartItem.objects.bulk_create(
+                items,
+                update_conflicts=True,
+                unique_fields=["cart", "variant"],
+                update_fields=["quantity", "unit_price", "updated_at"],
+            )
+            cls.recalculate_totals(user_cart)
+        result.merged = len(items)
+        source.discard()
+        return result
+
+    @classmethod
+    def compute_totals(cls, cart):
+        return cls.totals_for_subtotal(cart.subtotal if cart else Decimal("0"))
 
     @staticmethod
-    def compute_totals(cart):
-        subtotal = sum(item.line_total for item in cart.items.select_related("product"))
+    def totals_for_subtotal(subtotal):
         shipping_threshold = getattr(settings, "FREE_SHIPPING_THRESHOLD", 999)
         shipping_fee = getattr(settings, "FLAT_SHIPPING_FEE", 50)
         shipping = 0 if subtotal >= shipping_threshold else shipping_fee
@@ -64,69 +147,822 @@ class CartService:
         return CartTotals(subtotal=subtotal, shipping=shipping, total=total)
 
     @staticmethod
-    def add_item(cart, variant, quantity):
-        if not variant.is_active or variant.stock_quantity <= 0:
+    def _adjust_totals(cart, quantity_delta, amount_delta):
+        if not quantity_delta and not amount_delta:
+            return
+        Cart.objects.filter(pk=cart.pk).update(
+            item_count=F("item_count") + quantity_delta,
+            subtotal=F("subtotal") + amount_delta,
+            updated_at=timezone.now(),
+        )
+        # Mirror the deltas instead of reading the row back.
+        cart.item_count += quantity_delta
+        cart.subtotal += amount_delta
+
+    @staticmethod
+    def cart_totals_queryset():
+        line_total = ExpressionWrapper(
+            F("items__quantity") * F("items__unit_price"),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        )
+        return Cart.objects.annotate(
+            actual_count=Coalesce(Sum("items__quantity"), 0),
+            actual_subtotal=Coalesce(Sum(line_total), Value(Decimal("0")), output_field=DecimalField()),
+        )
+
+    @classmethod
+    def recalculate_totals(cls, cart):
+        actual = cls.cart_totals_queryset().values("actual_count", "actual_subtotal").get(pk=cart.pk)
+        Cart.objects.filter(pk=cart.pk).update(
+            item_count=actual["actual_count"], subtotal=actual["actual_subtotal"]
+        )
+        cart.item_count = actual["actual_count"]
+        cart.subtotal = actual["actual_subtotal"]
+        return cart
+
+    @staticmethod
+    def check_quantity(variant, quantity, current=0, held=0):
+        """Return the line quantity after adding ``quantity`` to ``current``.
+
+        ``held`` is what the shopper's own checkout hold has already taken out
+        of ``stock_quantity``; those units still count as available to them.
+        """
+        available = variant.stock_quantity + held
+        if not variant.is_active or available <= 0:
             raise StockError("This item is out of stock.")
         max_qty = getattr(settings, "MAX_CART_QTY", 10)
-        quantity = max(1, min(quantity, max_qty))
-        if quantity > variant.stock_quantity:
+        new_quantity = min(current + max(1, min(quantity, max_qty)), max_qty)
+        if new_quantity > available:
+            raise StockError("Requested quantity exceeds available stock.")
+        return new_quantity
+
+    @staticmethod
+    def check_update_quantity(variant, quantity, held=0):
+        quantity = min(quantity, getattr(settings, "MAX_CART_QTY", 10))
+        if quantity > variant.stock_quantity + held:
             raise StockError("Requested quantity exceeds available stock.")
-        item = CartItem.objects.filter(cart=cart, variant=variant).first()
-        if item:
-            new_quantity = min(item.quantity + quantity, max_qty)
-            if new_quantity > variant.stock_quantity:
-                raise StockError("Requested quantity exceeds available stock.")
-            item.quantity = new_quantity
-            item.unit_price = variant.product.price
-            item.save(update_fields=["quantity", "unit_price", "updated_at"])
-            return item
-        return CartItem.objects.create(
-            cart=cart,
-            variant=variant,
-            product=variant.product,
-            quantity=quantity,
-            unit_price=variant.product.price,
-        )
-
-    @staticmethod
-    def update_item(item, quantity):
+        return quantity
+
+    @staticmethod
+    def resolve_variant(product_id, size, color=""):
+        """Find the active variant for a size/colour pick with one query.
+
+        Loads the product's variants with their product, so the result also
+        tells whether the product needs a colour. ``variant`` is None when the
+        combination is unavailable; returns None for an unknown product.
+        """
+        variants = list(ProductVariant.objects.select_related("product").filter(product_id=product_id))
+        if not variants:
+            product = Product.objects.filter(pk=product_id).first()
+            return VariantChoice(product, None, False) if product else None
+        match = next(
+            (
+                variant
+                for variant in variants
+                if variant.is_active and variant.size == size and variant.color == (color or "")
+            ),
+            None,
+        )
+        return VariantChoice(variants[0].product, match, any(variant.color for variant in variants))
+
+    @classmethod
+    def add_item(cls, cart, variant, quantity):
+        return cls.add_items(cart, [(variant, quantity)])[0]
+
+    @classmethod
+    @transaction.atomic
+    def add_items(cls, cart, entries, held=None):
+        """Add ``(variant, quantity)`` pairs to ``cart`` with a single upsert.
+
+        Variants need their product loaded. ``held`` maps variant ids to the
+        units the shopper already holds (see check_quantity). Raises
+        StockError (and adds nothing) if any line cannot be satisfied;
+        returns the saved lines.
+        """
+        held = held or {}
+        existing = {
+            variant_id: (quantity, unit_price)
+            for variant_id, quantity, unit_price in CartItem.objects.select_for_update()
+            .filter(cart=cart, variant__in=[variant.pk for variant, _ in entries])
+            .values_list("variant_id", "quantity", "unit_price")
+        }
+        lines = {}
+        for variant, quantity in entries:
+            current = lines[variant.pk].quantity if variant.pk in lines else existing.get(variant.pk, (0, 0))[0]
+            lines[variant.pk] = CartItem(
+                cart=cart,
+                variant=variant,
+                product=variant.product,
+                quantity=cls.check_quantity(variant, quantity, current, held.get(variant.pk, 0)),
+                unit_price=variant.product.price,
+            )
+        items = list(lines.values())
+        CartItem.objects.bulk_create(
+            items,
+            update_conflicts=True,
+            unique_fields=["cart", "variant"],
+            update_fields=["quantity", "unit_price", "updated_at"],
+        )
+        previous = [existing.get(item.variant_id, (0, 0)) for item in items]
+        cls._adjust_totals(
+            cart,
+            sum(item.quantity for item in items) - sum(quantity for quantity, _ in previous),
+            sum(item.line_total for item in items) - sum(quantity * price for quantity, price in previous),
+        )
+        return items
+
+    @classmethod
+    @transaction.atomic
+    def update_item(cls, item, quantity, held=0):
         if quantity <= 0:
-            item.delete()
+            cls.remove_item(item)
             return
-        max_qty = getattr(settings, "MAX_CART_QTY", 10)
-        quantity = min(quantity, max_qty)
-        if quantity > item.variant.stock_quantity:
-            raise StockError("Requested quantity exceeds available stock.")
+        quantity = cls.check_update_quantity(item.variant, quantity, held)
+        previous_quantity, previous_total = item.quantity, item.line_total
         item.quantity = quantity
         item.unit_price = item.variant.product.price
         item.save(update_fields=["quantity", "unit_price", "updated_at"])
+        cls._adjust_totals(item.cart, quantity - previous_quantity, item.line_total - previous_total)
+
+    @classmethod
+    @transaction.atomic
+    def remove_item(cls, item):
+        deleted, _ = CartItem.objects.filter(pk=item.pk).delete()
+        if deleted:
+            cls._adjust_totals(item.cart, -item.quantity, -item.line_total)
+
+
+product_cards_refreshed = Signal()
+
+
+class ProductCardService:
+    BATCH_SIZE = 500
+    UPDATE_FIELDS = [
+        "name",
+        "slug",
+        "category_slug",
+        "category_name",
+        "image",
+        "image_derivatives",
+        "price",
+        "original_price",
+        "discount_percent",
+        "in_stock",
+        "sizes",
+        "default_size",
+        "default_color",
+        "is_active",
+        "is_featured",
+        "is_bestseller",
+        "created_at",
+        "updated_at",
+    ]
+
+    @staticmethod
+    def build_card(product):
+        images = list(product.images.all())
+        variants = [variant for variant in product.variants.all() if variant.is_active and variant.stock_quantity > 0]
+        sizes = sorted({variant.size for variant in variants})
+        default_variant = variants[0] if variants else None
+        return ProductCard(
+            product=product,
+            name=product.name,
+            slug=product.slug,
+            category_slug=product.category.slug,
+            category_name=product.category.name,
+            image=images[0].image.name if images else "",
+            image_derivatives=images[0].derivatives if images else {},
+            price=product.price,
+            original_price=product.original_price,
+            discount_percent=product.discount_percent,
+            in_stock=bool(variants),
+            sizes="".join(ProductCard.size_lookup(size) for size in sizes),
+            default_size=default_variant.size if default_variant else "",
+            default_color=default_variant.color if default_variant else "",
+            is_active=product.is_active,
+            is_featured=product.is_featured,
+            is_bestseller=product.is_bestseller,
+            created_at=product.created_at,
+        )
+
+    @classmethod
+    def refresh(cls, product_ids):
+        product_ids = sorted(set(product_ids))
+        refreshed = []
+        for start in range(0, len(product_ids), cls.BATCH_SIZE):
+            products = (
+                Product.objects.filter(pk__in=product_ids[start:start + cls.BATCH_SIZE])
+                .select_related("category")
+                .prefetch_related(
+                    Prefetch("images", queryset=ProductImage.objects.order_by("-is_primary", "id")),
+                    Prefetch("variants", queryset=ProductVariant.objects.order_by("id")),
+                )
+            )
+            cards = [cls.build_card(product) for product in products]
+            ProductCard.objects.bulk_create(
+                cards,
+                update_conflicts=True,
+                unique_fields=["product"],
+                update_fields=cls.UPDATE_FIELDS,
+            )
+            refreshed.extend(cards)
+        if refreshed:
+            version = bump_catalog_version()
+            product_cards_refreshed.send(sender=cls, cards=refreshed, version=version)
+        return len(refreshed)
+
+    @classmethod
+    def rebuild(cls):
+        product_ids = list(Product.objects.order_by("pk").values_list("pk", flat=True))
+        return cls.refresh(product_ids)
+
+
+class ProductService:
+    BULK_FLAGS = ("is_active", "is_featured", "is_bestseller")
+
+    @staticmethod
+    @transaction.atomic
+    def bulk_set_flag(product_ids, flag, value):
+        """Set one of BULK_FLAGS on many products with one UPDATE, then refresh their read models."""
+        if flag not in ProductService.BULK_FLAGS:
+            raise ValueError(f"Unknown product flag {flag!r}.")
+        product_ids = list(
+            Product.objects.filter(pk__in=product_ids).exclude(**{flag: value}).values_list("pk", flat=True)
+        )
+        if not product_ids:
+            return 0
+        Product.objects.filter(pk__in=product_ids).update(**{flag: value, "updated_at": timezone.now()})
+        # update() skips post_save, so do what product_saved would have done.
+        transaction.on_commit(lambda: ProductCardService.refresh(product_ids))
+        transaction.on_commit(lambda: get_search_backend().index_product_ids(product_ids))
+        return len(product_ids)
+
+
+class InventoryService:
+    """Guarded stock movements and short-lived checkout holds.
+
+    A reservation is deducted from ``stock_quantity`` when it is taken, so
+    ``stock_quantity`` is always what can still be promised; expiry or
+    release puts the units back.
+    """
+
+    @staticmethod
+    def reservation_ttl():
+        return timedelta(seconds=getattr(settings, "STOCK_RESERVATION_TTL", 15 * 60))
+
+    @staticmethod
+    @transaction.atomic(savepoint=False)
+    def adjust_stock(deltas):
+        """Apply ``{variant_id: delta}`` in one UPDATE; decrements never go below zero."""
+        deltas = {variant_id: delta for variant_id, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        guard = Q()
+        for variant_id, delta in deltas.items():
+            guard |= Q(pk=variant_id, stock_quantity__gte=-delta) if delta < 0 else Q(pk=variant_id)
+        updated = ProductVariant.objects.filter(guard).update(
+            stock_quantity=Case(
+                *[When(pk=variant_id, then=F("stock_quantity") + delta) for variant_id, delta in deltas.items()],
+                default=F("stock_quantity"),
+                output_field=PositiveIntegerField(),
+            )
+        )
+        if updated != len(deltas):
+            raise StockError("Some items in your cart are no longer available in the requested quantity.")
+
+        # Cards only change when a variant sold out or came back into stock.
+        crossed = Q()
+        for variant_id, delta in deltas.items():
+            crossed |= Q(pk=variant_id, stock_quantity=0 if delta < 0 else delta)
+        product_ids = set(ProductVariant.objects.filter(crossed).values_list("product_id", flat=True))
+        if product_ids:
+            transaction.on_commit(lambda: ProductCardService.refresh(product_ids))
+
+    @classmethod
+    def _settle(cls, holder, quantities):
+        held = {}
+        if holder:
+            held = dict(
+                StockReservation.objects.select_for_update()
+                .filter(holder=holder)
+                .values_list("variant_id", "quantity")
+            )
+        cls.adjust_stock(
+            {
+                variant_id: held.get(variant_id, 0) - quantities.get(variant_id, 0)
+                for variant_id in held.keys() | quantities.keys()
+            }
+        )
+        if held:
+            StockReservation.objects.filter(holder=holder).delete()
+
+    @classmethod
+    @transaction.atomic
+    def reserve(cls, holder, quantities):
+        """Hold ``{variant_id: quantity}`` for ``holder``, replacing its earlier holds."""
+        cls._settle(holder, quantities)
+        expires_at = timezone.now() + cls.reservation_ttl()
+        StockReservation.objects.bulk_create(
+            [
+                StockReservation(holder=holder, variant_id=variant_id, quantity=quantity, expires_at=expires_at)
+                for variant_id, quantity in quantities.items()
+                if quantity > 0
+            ]
+        )
+
+    @classmethod
+    @transaction.atomic(savepoint=False)
+    def commit(cls, holder, quantities):
+        """Turn ``holder``'s holds into a permanent decrement of ``quantities``."""
+        cls._settle(holder, quantities)
+
+    @classmethod
+    @transaction.atomic
+    def release(cls, holder):
+        cls._settle(holder, {})
+
+    @staticmethod
+    def held(holder):
+        """Return ``{variant_id: quantity}`` currently held for ``holder``."""
+        return dict(StockReservation.objects.filter(holder=holder).values_list("variant_id", "quantity"))
+
+    @classmethod
+    @transaction.atomic
+    def release_expired(cls, now=None):
+        expired = list(
+            StockReservation.objects.select_for_update(skip_locked=True)
+            .filter(expires_at__lte=now or timezone.now())
+            .values_list("pk", "variant_id", "quantity")
+        )
+        if not expired:
+            return 0
+        deltas = defaultdict(int)
+        for _, variant_id, quantity in expired:
+            deltas[variant_id] += quantity
+        StockReservation.objects.filter(pk__in=[pk for pk, _, _ in expired]).delete()
+        cls.adjust_stock(deltas)
+        return len(expired)
+
+    @staticmethod
+    def sync_chunk_size():
+        return getattr(settings, "INVENTORY_SYNC_CHUNK_SIZE", 500)
+
+    @staticmethod
+    def _parse_sync_update(update):
+        if not isinstance(update, dict) or not isinstance(update.get("sku"), str) or not update["sku"].strip():
+            raise ValueError("needs a sku")
+        if ("quantity" in update) == ("delta" in update):
+            raise ValueError("needs exactly one of quantity or delta")
+        mode = "quantity" if "quantity" in update else "delta"
+        value = update[mode]
+        if isinstance(value, bool) or not isinstance(value, (int, str)) or not str(value).lstrip("-").isdigit():
+            raise ValueError(f"{mode} must be a whole number")
+        value = int(value)
+        if mode == "quantity" and value < 0:
+            raise ValueError("quantity cannot be negative")
+        return update["sku"].strip(), mode, value
+
+    @classmethod
+    def sync_stock(cls, updates, chunk_size=None):
+        """Apply warehouse stock updates keyed by SKU, one transaction per chunk.
+
+        Each update is ``{"sku": ..., "quantity": n}`` (units physically on
+        hand) or ``{"sku": ..., "delta": n}``. Absolute counts are reduced by
+        the checkout holds already deducted from ``stock_quantity``; results
+        are clamped at zero.
+        """
+        result = StockSyncResult()
+        chunk_size = chunk_size or cls.sync_chunk_size()
+        product_ids = set()
+        iterator = iter(enumerate(updates))
+        while chunk := list(itertools.islice(iterator, chunk_size)):
+            parsed = []
+            for index, update in chunk:
+                try:
+                    parsed.append(cls._parse_sync_update(update))
+                except ValueError as exc:
+                    result.errors.append(f"update {index}: {exc}")
+            if parsed:
+                product_ids |= cls._sync_chunk(parsed, result)
+        # Cards (and with them the catalog version) only move when a variant
+        # sold out or came back into stock; refresh them once for the whole sync.
+        if product_ids:
+            ProductCardService.refresh(product_ids)
+        return result
+
+    @staticmethod
+    def _sync_chunk(parsed, result):
+        skus = {sku for sku, _, _ in parsed}
+        with transaction.atomic():
+            variants = {
+                sku: (pk, product_id, stock)
+                for sku, pk, product_id, stock in ProductVariant.objects.select_for_update()
+                .filter(sku__in=skus)
+                .values_list("sku", "pk", "product_id", "stock_quantity")
+            }
+            held = dict(
+                StockReservation.objects.filter(variant__sku__in=skus)
+                .values("variant_id")
+                .annotate(total=Sum("quantity"))
+                .values_list("variant_id", "total")
+            )
+            stock = {}
+            for sku, mode, value in parsed:
+                if sku not in variants:
+                    if sku not in result.unknown:
+                        result.unknown.append(sku)
+                    continue
+                pk, _, current = variants[sku]
+                current = stock.get(sku, current)
+                stock[sku] = max(0, value - held.get(pk, 0) if mode == "quantity" else current + value)
+            changed = {sku: quantity for sku, quantity in stock.items() if quantity != variants[sku][2]}
+            result.unchanged += len(stock) - len(changed)
+            if changed:
+                # One WHEN per distinct quantity keeps the CASE short: warehouse
+                # counts repeat far more often than SKUs do.
+                by_quantity = defaultdict(list)
+                for sku, quantity in changed.items():
+                    by_quantity[quantity].append(variants[sku][0])
+                result.updated += ProductVariant.objects.filter(pk__in=[variants[sku][0] for sku in changed]).update(
+                    stock_quantity=Case(
+                        *[When(pk__in=pks, then=Value(quantity)) for quantity, pks in by_quantity.items()],
+                        output_field=PositiveIntegerField(),
+                    ),
+                    updated_at=timezone.now(),
+                )
+        return {
+            variants[sku][1] for sku, quantity in changed.items() if (quantity == 0) != (variants[sku][2] == 0)
+        }
+
+    @staticmethod
+    def availability(variants=None):
+        """Annotate variants with on_hand, reserved (unexpired holds) and available."""
+        if variants is None:
+            variants = ProductVariant.objects.all()
+        now = timezone.now()
+        return variants.annotate(
+            held=Coalesce(Sum("reservations__quantity"), 0),
+            reserved=Coalesce(Sum("reservations__quantity", filter=Q(reservations__expires_at__gt=now)), 0),
+        ).annotate(
+            on_hand=F("stock_quantity") + F("held"),
+            available=F("stock_quantity") + F("held") - F("reserved"),
+        )
+
+
+class OrderStatsService:
+    @staticmethod
+    def start_of_day(day):
+        return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+    @classmethod
+    def _apply(cls, day, deltas):
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        changes = {field: F(field) + delta for field, delta in deltas.items()}
+        if OrderDailyStats.objects.filter(date=day).update(**changes):
+            return
+        # No row yet (first order of the day or a day before the backfill):
+        # build it from the orders themselves, which already include this
+        # change. If a concurrent order created the row first, add to theirs.
+        totals = cls.orders_on(day).aggregate(**cls.aggregates())
+        try:
+            with transaction.atomic():
+                OrderDailyStats.objects.create(date=day, **{**totals, "revenue": totals["revenue"] or 0})
+        except IntegrityError:
+            OrderDailyStats.objects.filter(date=day).update(**changes)
+
+    @staticmethod
+    def aggregates():
+        return {
+            "order_count": Count("id"),
+            "revenue": Sum("total"),
+            **{
+                OrderDailyStats.status_field(status): Count("id", filter=Q(status=status))
+                for status in Order.Status.values
+            },
+        }
+
+    @classmethod
+    def orders_on(cls, day):
+        return Order.objects.filter(
+            created_at__gte=cls.start_of_day(day), created_at__lt=cls.start_of_day(day + timedelta(days=1))
+        )
+
+    @classmethod
+    def record_order(cls, order):
+        cls._apply(
+            timezone.localdate(order.created_at),
+            {"order_count": 1, "revenue": order.total, OrderDailyStats.status_field(order.status): 1},
+        )
+
+    @classmethod
+    def record_status_change(cls, order, previous_status):
+        if previous_status == order.status:
+            return
+        cls._apply(
+            timezone.localdate(order.created_at),
+            {OrderDailyStats.status_field(previous_status): -1, OrderDailyStats.status_field(order.status): 1},
+        )
+
+    @classmethod
+    def record_status_changes(cls, changes, status):
+        """Bulk form of record_status_change for ``(created_at, previous_status)`` pairs."""
+        days = defaultdict(lambda: defaultdict(int))
+        for created_at, previous_status in changes:
+            if previous_status != status:
+                deltas = days[timezone.localdate(created_at)]
+                deltas[OrderDailyStats.status_field(previous_status)] -= 1
+                deltas[OrderDailyStats.status_field(status)] += 1
+        for day, deltas in days.items():
+            cls._apply(day, deltas)
+
+    @classmethod
+    @transaction.atomic
+    def rebuild(cls, start=None, end=None):
+        orders = Order.objects.all()
+        days = OrderDailyStats.objects.all()
+        if start:
+            orders = orders.filter(created_at__gte=cls.start_of_day(start))
+            days = days.filter(date__gte=start)
+        if end:
+            orders = orders.filter(created_at__lt=cls.start_of_day(end + timedelta(days=1)))
+            days = days.filter(date__lte=end)
+        aggregates = cls.aggregates()
+        rows = orders.annotate(day=TruncDate("created_at")).values("day").annotate(**aggregates).order_by("day")
+        stats = [OrderDailyStats(date=row.pop("day"), **row) for row in rows]
+        days.exclude(date__in=[row.date for row in stats]).delete()
+        OrderDailyStats.objects.bulk_create(
+            stats,
+            update_conflicts=True,
+            unique_fields=["date"],
+            update_fields=[*aggregates, "updated_at"],
+        )
+        return len(stats)
+
+    @classmethod
+    def summary(cls, today=None):
+        """Dashboard figures from stored rollups plus a live read of today."""
+        today = today or timezone.localdate()
+        week_start = today - timedelta(days=7)
+        month_start = today - timedelta(days=30)
+        status_fields = [OrderDailyStats.status_field(status) for status in Order.Status.values]
+
+        live = Order.objects.filter(created_at__gte=cls.start_of_day(today)).aggregate(
+            order_count=Count("id"),
+            revenue=Sum("total"),
+            **{field: Count("id", filter=Q(status=status)) for status, field in zip(Order.Status.values, status_fields)},
+        )
+        past = OrderDailyStats.objects.filter(date__lt=today)
+        totals = past.aggregate(
+            total_orders=Sum("order_count"),
+            total_revenue=Sum("revenue"),
+            week_orders=Sum("order_count", filter=Q(date__gte=week_start)),
+            week_revenue=Sum("revenue", filter=Q(date__gte=week_start)),
+            month_orders=Sum("order_count", filter=Q(date__gte=month_start)),
+            month_revenue=Sum("revenue", filter=Q(date__gte=month_start)),
+            **{f"total_{field}": Sum(field) for field in status_fields},
+        )
+        daily = dict(past.filter(date__gte=today - timedelta(days=13)).values_list("date", "revenue"))
+        daily[today] = live["revenue"] or 0
+
+        def combined(key, live_key):
+            return (totals[key] or 0) + (live[live_key] or 0)
+
+        return {
+            "total_orders": combined("total_orders", "order_count"),
+            "orders_today": live["order_count"],
+            "orders_this_week": combined("week_orders", "order_count"),
+            "orders_this_month": combined("month_orders", "order_count"),
+            "total_revenue": combined("total_revenue", "revenue"),
+            "revenue_today": live["revenue"] or 0,
+            "revenue_this_week": combined("week_revenue", "revenue"),
+            "revenue_this_month": combined("month_revenue", "revenue"),
+            "order_status": [
+                {"status": status, "count": count}
+                for status, field in zip(Order.Status.values, status_fields)
+                if (count := combined(f"total_{field}", field))
+            ],
+            "daily_revenue": [
+                (day, daily.get(day, 0)) for day in (today - timedelta(days=offset) for offset in range(13, -1, -1))
+            ],
+        }
+
+
+class ProductSalesService:
+    @staticmethod
+    def _line_deltas(items, sign=1):
+        deltas = defaultdict(lambda: [0, Decimal("0")])
+        for item in items:
+            deltas[item.product_id][0] += sign * item.quantity
+            deltas[item.product_id][1] += sign * item.unit_price * item.quantity
+        return deltas
+
+    @classmethod
+    def _apply(cls, day, deltas):
+        if not deltas:
+            return
+        rows = ProductSalesDaily.objects.filter(date=day)
+        existing = set(rows.filter(product_id__in=deltas).values_list("product_id", flat=True))
+        if existing:
+            rows.filter(product_id__in=existing).update(
+                units=Case(
+                    *[When(product_id=pk, then=F("units") + deltas[pk][0]) for pk in existing],
+                    output_field=PositiveIntegerField(),
+                ),
+                revenue=Case(
+                    *[When(product_id=pk, then=F("revenue") + deltas[pk][1]) for pk in existing],
+                    output_field=DecimalField(max_digits=14, decimal_places=2),
+                ),
+            )
+        missing = [pk for pk in deltas if pk not in existing]
+        if not missing:
+            return
+        if any(deltas[pk][0] < 0 for pk in missing):
+            cls.rebuild(day, day)
+            return
+        try:
+            with transaction.atomic():
+                ProductSalesDaily.objects.bulk_create(
+                    [ProductSalesDaily(product_id=pk, date=day, units=deltas[pk][0], revenue=deltas[pk][1]) for pk in missing]
+                )
+        except IntegrityError:
+            # Another checkout created the same rows first; add onto them instead.
+            cls._apply(day, {pk: deltas[pk] for pk in missing})
+
+    @classmethod
+    def record_order(cls, order, items):
+        cls._apply(timezone.localdate(order.created_at), cls._line_deltas(items))
+        cls.schedule_bestseller_refresh()
+
+    @classmethod
+    def record_status_change(cls, order, previous_status):
+        cancelled = Order.Status.CANCELLED
+        if (previous_status == cancelled) == (order.status == cancelled):
+            return
+        sign = -1 if order.status == cancelled else 1
+        cls._apply(timezone.localdate(order.created_at), cls._line_deltas(order.items.all(), sign))
+        cls.schedule_bestseller_refresh()
+
+    @classmethod
+    def record_status_changes(cls, changes, status):
+        """Bulk form of record_status_change for ``{order_id: (created_at, previous_status)}``."""
+        cancelled = Order.Status.CANCELLED
+        crossing = {
+            order_id: created_at
+            for order_id, (created_at, previous_status) in changes.items()
+            if (previous_status == cancelled) != (status == cancelled)
+        }
+        if not crossing:
+            return
+        sign = -1 if status == cancelled else 1
+        items_by_day = defaultdict(list)
+        for item in OrderItem.objects.filter(order_id__in=crossing).only("order_id", "product_id", "quantity", "unit_price"):
+            items_by_day[timezone.localdate(crossing[item.order_id])].append(item)
+        for day, items in items_by_day.items():
+            cls._apply(day, cls._line_deltas(items, sign))
+        cls.schedule_bestseller_refresh()
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild(start=None, end=None):
+        items = OrderItem.objects.exclude(order__status=Order.Status.CANCELLED)
+        days = ProductSalesDaily.objects.all()
+        if start:
+            items = items.filter(order__created_at__gte=OrderStatsService.start_of_day(start))
+            days = days.filter(date__gte=start)
+        if end:
+            items = items.filter(order__created_at__lt=OrderStatsService.start_of_day(end + timedelta(days=1)))
+            days = days.filter(date__lte=end)
+        rows = (
+            items.annotate(day=TruncDate("order__created_at"))
+            .values("day", "product_id")
+            .annotate(units=Sum("quantity"), revenue=Sum(F("quantity") * F("unit_price")))
+            .order_by()
+        )
+        sales = [
+            ProductSalesDaily(product_id=row["product_id"], date=row["day"], units=row["units"], revenue=row["revenue"])
+            for row in rows
+        ]
+        days.delete()
+        ProductSalesDaily.objects.bulk_create(sales, batch_size=1000)
+        return len(sales)
+
+    @staticmethod
+    def top_products(days=30, limit=5, by="units", today=None):
+        """Top sellers over the last ``days`` days (today included), from the rollup alone."""
+        today = today or timezone.localdate()
+        order_field = "-revenue" if by == "revenue" else "-total_sold"
+        return list(
+            ProductSalesDaily.objects.filter(date__gt=today - timedelta(days=days), date__lte=today)
+            .values("product_id")
+            .annotate(name=F("product__name"), total_sold=Sum("units"), revenue=Sum("revenue"))
+            .filter(total_sold__gt=0)
+            .order_by(order_field, "product_id")[:limit]
+        )
+
+    @classmethod
+    def refresh_bestsellers(cls, days=None, limit=None, by="units"):
+        """Flag the current top sellers as bestsellers in one update; returns changed product ids."""
+        days = days or getattr(settings, "BESTSELLER_WINDOW_DAYS", 30)
+        limit = limit or getattr(settings, "BESTSELLER_COUNT", 8)
+        top_ids = [row["product_id"] for row in cls.top_products(days=days, limit=limit, by=by)]
+        changed = list(
+            Product.objects.filter(
+                Q(pk__in=top_ids, is_bestseller=False) | (Q(is_bestseller=True) & ~Q(pk__in=top_ids))
+            ).values_list("pk", flat=True)
+        )
+        if changed:
+            Product.objects.filter(pk__in=changed).update(
+                is_bestseller=Case(When(pk__in=top_ids, then=Value(True)), default=Value(False))
+            )
+            transaction.on_commit(lambda: ProductCardService.refresh(changed))
+        return changed
+
+    @classmethod
+    def schedule_bestseller_refresh(cls):
+        if not getattr(settings, "BESTSELLER_AUTO_REFRESH", False):
+            return
+        interval = getattr(settings, "BESTSELLER_REFRESH_INTERVAL", 300)
+        if cache.add("bestsellers:refresh", 1, interval):
+            transaction.on_commit(cls.refresh_bestsellers)
 
 
 class OrderService:
+    ORDER_NUMBER_ATTEMPTS = 5
+
     @staticmethod
     def _generate_order_number():
-        while True:
-            order_number = f"QO{get_random_string(8).upper()}"
-            if not Order.objects.filter(order_number=order_number).exists():
-                return order_number
+        # Random rather than sequential: guest order pages are only guarded by
+        # the number, so it must not be guessable from a neighbouring order.
+        return f"QO{get_random_string(10, allowed_chars='ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789')}"
 
     @classmethod
+    def _create_with_number(cls, **fields):
+        """Create the order, drawing a fresh number if the last one was taken."""
+        for attempt in range(cls.ORDER_NUMBER_ATTEMPTS):
+            try:
+                with transaction.atomic():
+                    return Order.objects.create(order_number=cls._generate_order_number(), **fields)
+            except IntegrityError:
+                if attempt == cls.ORDER_NUMBER_ATTEMPTS - 1:
+                    raise
+
+    @staticmethod
     @transaction.atomic
-    def create_order(cls, cart, form_data):
-        items = (
-            cart.items.select_related("variant", "product")
-            .select_for_update(of=("self", "variant"))
-            .all()
-        )
+    def save(order, update_fields=None):
+        """Save an existing order, moving the rollups along if its status changed."""
+        previous_status = Order.objects.select_for_update().values_list("status", flat=True).get(pk=order.pk)
+        order.save(update_fields=update_fields)
+        OrderStatsService.record_status_change(order, previous_status)
+        ProductSalesService.record_status_change(order, previous_status)
+
+    @classmethod
+    def update_status(cls, order, status):
+        order.status = status
+        cls.save(order, update_fields=["status"])
+
+    @staticmethod
+    @transaction.atomic
+    def bulk_update_status(order_ids, status):
+        """Move many orders to ``status`` with one UPDATE; returns how many changed."""
+        changes = {
+            pk: (created_at, previous_status)
+            for pk, created_at, previous_status in Order.objects.select_for_update()
+            .filter(pk__in=order_ids)
+            .exclude(status=status)
+            .order_by()
+            .values_list("pk", "created_at", "status")
+        }
+        if not changes:
+            return 0
+        Order.objects.filter(pk__in=changes).update(status=status, updated_at=timezone.now())
+        OrderStatsService.record_status_changes(changes.values(), status)
+        ProductSalesService.record_status_changes(changes, status)
+        return len(changes)
+
+    @classmethod
+    @transaction.atomic
+    def create_order(cls, items, form_data, user=None, holder=None, cart=None):
+        """Place an order for ``items`` (cart lines, saved or not).
+
+        Pass a database ``cart`` instead to lock and read its lines; it is
+        emptied and marked ordered afterwards. Quantities are not re-checked
+        against stock here: ``holder``'s checkout hold already set the units
+        aside and InventoryService.commit guards the final decrement.
+        """
+        if cart is not None:
+            user = cart.user
+            items = list(
+                cart.items.select_related("variant", "product")
+                .select_for_update(of=("self",))
+            )
         if not items:
             raise CartError("Cart is empty.")
-
-        for item in items:
-            if item.quantity > item.variant.stock_quantity:
-                raise StockError(f"{item.product.name} is out of stock.")
+        InventoryService.commit(holder, {item.variant_id: item.quantity for item in items})
 
         address = Address.objects.create(
-            user=cart.user if cart.user else None,
+            user=user,
             full_name=form_data["full_name"],
             phone=form_data["phone"],
             email=form_data.get("email", ""),
@@ -137,30 +973,31 @@ class OrderService:
             is_snapshot=True,
         )
 
-        totals = CartService.compute_totals(cart)
-        order_number = cls._generate_order_number()
-        order = Order.objects.create(
-            user=cart.user if cart.user else None,
-            order_number=order_number,
+        totals = CartService.totals_for_subtotal(sum((item.line_total for item in items), Decimal("0")))
+        order = cls._create_with_number(
+            user=user,
             subtotal=totals.subtotal,
             shipping=totals.shipping,
             total=totals.total,
             address=address,
         )
+        OrderStatsService.record_order(order)
 
-        for item in items:
-            OrderItem.objects.create(
-                order=order,
-                product=item.product,
-                variant=item.variant,
-                product_name=item.product.name,
-                variant_snapshot=f"{item.variant.size} {item.variant.color}".strip(),
-                unit_price=item.unit_price,
-                quantity=item.quantity,
-            )
-            ProductVariant.objects.filter(pk=item.variant_id).update(
-                stock_quantity=F("stock_quantity") - item.quantity
-            )
+        OrderItem.objects.bulk_create(
+            [
+                OrderItem(
+                    order=order,
+                    product=item.product,
+                    variant=item.variant,
+                    product_name=item.product.name,
+                    variant_snapshot=f"{item.variant.size} {item.variant.color}".strip(),
+                    unit_price=item.unit_price,
+                    quantity=item.quantity,
+                )
+                for item in items
+            ]
+        )
+        ProductSalesService.record_order(order, items)
 
         Payment.objects.create(
             order=order,
@@ -168,9 +1005,10 @@ class OrderService:
             amount=totals.total,
         )
 
-        cart.status = Cart.Status.ORDERED
-        cart.save(update_fields=["status"])
-        cart.items.all().delete()
-
+        if cart is not None:
+            CartItem.objects.filter(cart=cart).delete()
+            cart.status = Cart.Status.ORDERED
+            cart.item_count = 0
+            cart.subtotal = 0
+            cart.save(update_fields=["status", "item_count", "subtotal", "updated_at"])
         return order
-
@@ -0,0 +1,120 @@
+from django.contrib import messages
+from django.contrib.auth.signals import user_logged_in
+from django.db import transaction
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from .cart_storage import get_cart_storage
+from .catalog import bump_catalog_version
+from .facets import facet_index
+from .images import delete_derivatives, schedule_derivatives
+from .models import Category, Product, ProductImage, ProductVariant
+from .search import get_search_backend
+from .services import CartService, ProductCardService, product_cards_refreshed
+from .suggest import suggest_index
+
+
+def refresh_cards_on_commit(product_ids):
+    product_ids = list(product_ids)
+    if product_ids:
+        transaction.on_commit(lambda: ProductCardService.refresh(product_ids))
+
+
+def reindex_search_on_commit(product_ids):
+    product_ids = list(product_ids)
+    if product_ids:
+        transaction.on_commit(lambda: get_search_backend().index_product_ids(product_ids))
+
+
+@receiver(post_migrate)
+def setup_search_backend(sender, app_config=None, **kwargs):
+    if app_config is not None and app_config.label == "app":
+        get_search_backend().setup()
+
+
+@receiver(product_cards_refreshed)
+def update_facet_index(sender, cards, version, **kwargs):
+    facet_index.apply_cards(cards, version)
+
+
+@receiver(product_cards_refreshed)
+def update_suggest_index(sender, cards, version, **kwargs):
+    suggest_index.apply_cards(cards, version)
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    refresh_cards_on_commit([instance.pk])
+    reindex_search_on_commit([instance.pk])
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    product_id = instance.pk
+    transaction.on_commit(lambda: get_search_backend().remove_products([product_id]))
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_delete, sender=ProductVariant)
+def product_child_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    refresh_cards_on_commit([instance.product_id])
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_save, sender=Category)
+def image_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    schedule_derivatives(instance)
+
+
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_delete, sender=Category)
+def image_deleted(sender, instance, **kwargs):
+    derivatives = instance.derivatives
+    if derivatives:
+        transaction.on_commit(lambda: delete_derivatives(derivatives))
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(bump_catalog_version)
+    if created:
+        return
+    product_ids = list(instance.products.values_list("pk", flat=True))
+    refresh_cards_on_commit(product_ids)
+    reindex_search_on_commit(product_ids)
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(user_logged_in)
+def merge_anonymous_cart(sender, request, user, **kwargs):
+    anonymous = getattr(request, "cart", None)
+    if anonymous is None:
+        return
+    request.cart = get_cart_storage(request)
+    # The anonymous checkout hold would otherwise count against the merged lines.
+    anonymous.release()
+    result = CartService.merge_carts(user, anonymous, held=request.cart.held_quantities())
+    if result is None:
+        return
+    request.cart.update_count()
+    if result.clamped or result.dropped:
+        messages.warning(
+            request,
+            "Some items from your cart were limited or removed based on available stock.",
+            fail_silently=True,
+        )
@@ -0,0 +1,128 @@
+import mimetypes
+import os
+import re
+from email.utils import formatdate
+from urllib.parse import unquote
+from wsgiref.util import FileWrapper
+
+from django.conf import settings
+
+HASHED_NAME = re.compile(r"\.[0-9a-f]{12}\.[^/.]+$")
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+CHUNK_SIZE = 64 * 1024
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class StaticFileResolver:
+    """Map a request path under STATIC_URL to a file in STATIC_ROOT.
+
+    Picks a precompressed ``.br``/``.gz`` sibling when the client accepts
+    it; content-hashed names from the manifest storage are cached forever.
+    """
+
+    def __init__(self, root=None, prefix=None):
+        self.root = os.path.realpath(root or settings.STATIC_ROOT)
+        self.prefix = prefix or settings.STATIC_URL
+        self.max_age = getattr(settings, "STATIC_MAX_AGE", 60 * 60)
+
+    def resolve(self, method, path, headers):
+        """Return ``(status, headers, file_path)`` or None to fall through to Django."""
+        if method not in ("GET", "HEAD") or not path.startswith(self.prefix):
+            return None
+        name = unquote(path[len(self.prefix):])
+        file_path = os.path.realpath(os.path.join(self.root, name))
+        if not file_path.startswith(self.root + os.sep) or not os.path.isfile(file_path):
+            return None
+
+        content_type, _ = mimetypes.guess_type(file_path)
+        response_headers = [
+            ("Content-Type", content_type or "application/octet-stream"),
+            ("Vary", "Accept-Encoding"),
+        ]
+        accepted = accepted_encodings(headers.get("accept-encoding"))
+        for coding, suffix in ENCODINGS:
+            if coding in accepted and os.path.isfile(file_path + suffix):
+                file_path += suffix
+                response_headers.append(("Content-Encoding", coding))
+                break
+
+        stat = os.stat(file_path)
+        etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+        if HASHED_NAME.search(name):
+            cache_control = "public, max-age=31536000, immutable"
+        else:
+            cache_control = f"public, max-age={self.max_age}"
+        response_headers += [
+            ("Cache-Control", cache_control),
+            ("ETag", etag),
+            ("Last-Modified", formatdate(stat.st_mtime, usegmt=True)),
+        ]
+        if etag in headers.get("if-none-match", ""):
+            return 304, response_headers, None
+        response_headers.append(("Content-Length", str(stat.st_size)))
+        return 200, response_headers, None if method == "HEAD" else file_path
+
+
+class PrecompressedStaticFilesWSGI:
+    def __init__(self, application, root=None, prefix=None):
+        self.application = application
+        self.resolver = StaticFileResolver(root, prefix)
+
+    def __call__(self, environ, start_response):
+        headers = {
+            "accept-encoding": environ.get("HTTP_ACCEPT_ENCODING", ""),
+            "if-none-match": environ.get("HTTP_IF_NONE_MATCH", ""),
+        }
+        resolved = self.resolver.resolve(environ["REQUEST_METHOD"], environ.get("PATH_INFO", ""), headers)
+        if resolved is None:
+            return self.application(environ, start_response)
+        status, response_headers, file_path = resolved
+        start_response("200 OK" if status == 200 else "304 Not Modified", response_headers)
+        if file_path is None:
+            return []
+        # Both wrappers close the file when the server closes the response.
+        file_wrapper = environ.get("wsgi.file_wrapper", FileWrapper)
+        return file_wrapper(open(file_path, "rb"), CHUNK_SIZE)
+
+
+class PrecompressedStaticFilesASGI:
+    def __init__(self, application, root=None, prefix=None):
+        self.application = application
+        self.resolver = StaticFileResolver(root, prefix)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.application(scope, receive, send)
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope.get("headers", [])}
+        resolved = self.resolver.resolve(scope["method"], scope["path"], headers)
+        if resolved is None:
+            return await self.application(scope, receive, send)
+        status, response_headers, file_path = resolved
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(key.lower().encode("latin-1"), value.encode("latin-1")) for key, value in response_headers],
+            }
+        )
+        if file_path is None:
+            await send({"type": "http.response.body", "body": b""})
+            return
+        with open(file_path, "rb") as handle:
+            while chunk := handle.read(CHUNK_SIZE):
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
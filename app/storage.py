@@ -0,0 +1,102 @@
+import gzip
+import os
+import re
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # .br siblings are skipped; reported as check app.W002
+    brotli = None
+
+try:
+    import rjsmin
+except ImportError:  # JavaScript is hashed and compressed but not minified (app.W001)
+    rjsmin = None
+
+CSS_TOKENS = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*.*?\*/', re.S)
+CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+
+
+def _squash_css(code):
+    return CSS_PUNCTUATION.sub(r"\1", re.sub(r"\s+", " ", code)).replace(";}", "}")
+
+
+def minify_css(source):
+    """Drop comments and redundant whitespace, leaving string literals untouched."""
+    parts = []
+    code = ""
+    position = 0
+    for match in CSS_TOKENS.finditer(source):
+        code += source[position:match.start()]
+        position = match.end()
+        if match.group(1):
+            parts.extend([_squash_css(code), match.group(1)])
+            code = ""
+        else:
+            code += " "
+    parts.append(_squash_css(code + source[position:]))
+    return "".join(parts).strip()
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that minifies CSS/JS before hashing and writes .gz/.br siblings."""
+
+    compress_extensions = (".css", ".js", ".svg", ".json", ".txt", ".xml", ".html", ".map")
+    min_compress_size = 512
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Not collected yet (DEBUG off before collectstatic has run): link
+            # the plain name instead of failing every page on {% static %}.
+            return name
+
+    def minify(self, name, content):
+        if name.endswith(".css"):
+            return minify_css(content)
+        if name.endswith(".js") and rjsmin is not None:
+            return rjsmin.jsmin(content)
+        return content
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+        paths = dict(paths)
+        for name in paths:
+            if name.endswith((".css", ".js")):
+                with self.open(name) as handle:
+                    original = handle.read().decode("utf-8")
+                minified = self.minify(name, original)
+                if minified != original:
+                    self.delete(name)
+                    self._save(name, ContentFile(minified.encode("utf-8")))
+                    # Hash (and rewrite urls in) the minified copy, not the source file.
+                    paths[name] = (self, name)
+
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                self.compress(hashed_name)
+            yield name, hashed_name, processed
+
+    def compress(self, name):
+        if not name.endswith(self.compress_extensions):
+            return
+        path = self.path(name)
+        with open(path, "rb") as handle:
+            data = handle.read()
+        if len(data) < self.min_compress_size:
+            return
+        encoders = [(".gz", lambda raw: gzip.compress(raw, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            encoders.append((".br", lambda raw: brotli.compress(raw, quality=11)))
+        for suffix, encode in encoders:
+            compressed = encode(data)
+            # Only keep encodings that actually save bytes.
+            if len(compressed) < len(data):
+                with open(path + suffix, "wb") as handle:
+                    handle.write(compressed)
+            elif os.path.exists(path + suffix):
+                os.remove(path + suffix)
@@ -0,0 +1,183 @@
+import heapq
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.urls import reverse
+
+from .catalog import CatalogIndex
+from .models import Category, ProductCard
+from .search import tokenize
+
+MIN_PREFIX = 2
+MAX_PREFIX = 12
+
+
+def trigrams(token):
+    padded = f"  {token} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    kind: str
+    name: str
+    url: str
+    category: str = ""
+    image: str = ""
+    price: str = ""
+
+    def as_dict(self):
+        return {
+            "type": self.kind,
+            "name": self.name,
+            "url": self.url,
+            "category": self.category,
+            "image": self.image,
+            "price": self.price,
+        }
+
+
+class SuggestIndex(CatalogIndex):
+    def __init__(self):
+        super().__init__()
+        # (suggestions, texts, prefix -> positions, trigram -> positions, product_id -> position).
+        # Published position sets are never mutated, only replaced, so
+        # suggest() can read them without the lock.
+        self._state = ([], [], {}, {}, {})
+
+    @staticmethod
+    def _card_entry(card):
+        suggestion = Suggestion(
+            kind="product",
+            name=card.name,
+            url=reverse("store:product_detail", args=[card.slug]),
+            category=card.category_name,
+            image=card.image_url,
+            price=str(card.price),
+        )
+        return suggestion, tokenize(f"{card.name} {card.category_name}")
+
+    @staticmethod
+    def _keys(tokens):
+        prefixes, grams = set(), set()
+        for token in tokens:
+            prefixes.update(token[:length] for length in range(MIN_PREFIX, min(len(token), MAX_PREFIX) + 1))
+            grams.update(trigrams(token))
+        return prefixes, grams
+
+    def load(self, version):
+        entries = []
+        for category in Category.objects.filter(is_active=True).only("name", "slug"):
+            entries.append(
+                (
+                    Suggestion(
+                        kind="category",
+                        name=category.name,
+                        url=f"{reverse('store:product_list')}?category={category.slug}",
+                    ),
+                    tokenize(category.name),
+                )
+            )
+        positions = {}
+        cards = ProductCard.objects.filter(is_active=True).only(
+            "product_id", "name", "slug", "category_name", "image", "price"
+        )
+        for card in cards.iterator(chunk_size=2000):
+            positions[card.product_id] = len(entries)
+            entries.append(self._card_entry(card))
+
+        prefixes = defaultdict(set)
+        grams = defaultdict(set)
+        for position, (_, tokens) in enumerate(entries):
+            prefix_keys, gram_keys = self._keys(tokens)
+            for key in prefix_keys:
+                prefixes[key].add(position)
+            for key in gram_keys:
+                grams[key].add(position)
+
+        state = (
+            [suggestion for suggestion, _ in entries],
+            [" ".join(tokens) for _, tokens in entries],
+            dict(prefixes),
+            dict(grams),
+            positions,
+        )
+        with self._lock:
+            self._state = state
+            self.version = version
+
+    def apply_cards(self, cards, version):
+        """Re-index refreshed products in place; other gaps wait for ensure_current()."""
+        with self._lock:
+            if self.version is None or self.version != version - 1:
+                return
+            suggestions, texts, prefixes, grams, positions = self._state
+            for card in cards:
+                old = positions.pop(card.product_id, None)
+                if old is not None:
+                    prefix_keys, gram_keys = self._keys(texts[old].split())
+                    for index, keys in ((prefixes, prefix_keys), (grams, gram_keys)):
+                        for key in keys:
+                            index[key] = index[key] - {old}
+                if not card.is_active:
+                    continue
+                # Old slots stay in the lists (unreachable) until the next full load.
+                suggestion, tokens = self._card_entry(card)
+                position = len(suggestions)
+                suggestions.append(suggestion)
+                texts.append(" ".join(tokens))
+                positions[card.product_id] = position
+                prefix_keys, gram_keys = self._keys(tokens)
+                for index, keys in ((prefixes, prefix_keys), (grams, gram_keys)):
+                    for key in keys:
+                        index[key] = index.get(key, frozenset()) | {position}
+            self.version = version
+
+    @staticmethod
+    def _token_matches(state, token):
+        _, texts, prefixes, grams, _ = state
+        matches = prefixes.get(token[:MAX_PREFIX])
+        if matches is not None:
+            if len(token) > MAX_PREFIX:
+                return {position for position in matches if token in texts[position]}
+            return matches
+        counts = defaultdict(int)
+        token_grams = trigrams(token)
+        for gram in token_grams:
+            for position in grams.get(gram, ()):
+                counts[position] += 1
+        threshold = max(2, len(token_grams) // 2)
+        return {position for position, count in counts.items() if count >= threshold}
+
+    def suggest(self, query, limit=None):
+        limit = limit or getattr(settings, "SEARCH_SUGGEST_LIMIT", 8)
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        self.ensure_current()
+        state = self._state
+        entries = state[0]
+        candidates = None
+        for token in tokens:
+            matches = self._token_matches(state, token)
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                return []
+        query_text = " ".join(tokens)
+
+        def score(position):
+            suggestion = entries[position]
+            name = suggestion.name.lower()
+            return (
+                suggestion.kind != "category",
+                not name.startswith(query_text),
+                query_text not in name,
+                len(name),
+                name,
+            )
+
+        return [entries[position] for position in heapq.nsmallest(limit, candidates, key=score)]
+
+
+suggest_index = SuggestIndex()
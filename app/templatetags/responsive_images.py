@@ -0,0 +1,47 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+
+register = template.Library()
+
+
+def _srcset(entries):
+    return ", ".join(
+        f"{default_storage.url(path)} {width}w" for width, path in sorted(entries.items(), key=lambda entry: int(entry[0]))
+    )
+
+
+@register.simple_tag
+def derivative_url(name, derivatives=None, width=640, image_format="jpeg"):
+    """URL of the smallest derivative at least ``width`` wide, falling back to the original."""
+    options = (derivatives or {}).get(image_format)
+    if not options:
+        return default_storage.url(name) if name else ""
+    widths = sorted(int(option) for option in options)
+    chosen = next((option for option in widths if option >= width), widths[-1])
+    return default_storage.url(options[str(chosen)])
+
+
+@register.simple_tag
+def responsive_image(name, derivatives=None, alt="", sizes="100vw", css_class="", loading="lazy"):
+    """``<picture>`` with WebP and JPEG ``srcset``s, or a plain ``<img>`` until derivatives exist."""
+    if not name:
+        return ""
+    attrs = format_html(
+        'alt="{}"{}{}',
+        alt,
+        format_html(' class="{}"', css_class) if css_class else "",
+        format_html(' loading="{}"', loading) if loading else "",
+    )
+    derivatives = derivatives or {}
+    if not derivatives.get("jpeg"):
+        return format_html('<img src="{}" {}>', default_storage.url(name), attrs)
+    webp = derivatives.get("webp")
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" {}></picture>',
+        format_html('<source type="image/webp" srcset="{}" sizes="{}">', _srcset(webp), sizes) if webp else "",
+        derivative_url(name, derivatives),
+        _srcset(derivatives["jpeg"]),
+        sizes,
+        attrs,
+    )
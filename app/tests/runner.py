@@ -0,0 +1,24 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """Run the suite against a private in-memory cache.
+
+    The project cache is shared with running servers; tests clear it, bump the
+    catalog version and leave page and fragment entries behind. Catalog indexes
+    also rebuild inline, since a background thread cannot see a test's
+    uncommitted rows.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._settings_override = override_settings(
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+            CATALOG_INDEX_BACKGROUND_RELOAD=False,
+        )
+        self._settings_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._settings_override.disable()
+        super().teardown_test_environment(**kwargs)
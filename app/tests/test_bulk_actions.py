@@ -0,0 +1,86 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from app.models import ContactMessage, Order, OrderDailyStats, Product, ProductCard
+from app.services import OrderService, ProductService
+
+from .utils import CHECKOUT_DATA, make_variant
+
+
+class StaffTestCase(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("staff", password="secret", is_staff=True))
+
+
+class ProductBulkActionTests(StaffTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.products = [make_variant().product for _ in range(3)]
+
+    def test_updates_flags_and_cards(self):
+        ids = [product.pk for product in self.products[:2]]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("admin_panel:product_bulk"), {"ids": ids + ["junk"], "action": "feature"}
+            )
+        self.assertRedirects(response, reverse("admin_panel:product_list"), fetch_redirect_response=False)
+        self.assertEqual(set(Product.objects.filter(is_featured=True).values_list("pk", flat=True)), set(ids))
+        self.assertEqual(set(ProductCard.objects.filter(is_featured=True).values_list("product_id", flat=True)), set(ids))
+
+    def test_unchanged_products_are_not_counted(self):
+        Product.objects.filter(pk=self.products[0].pk).update(is_active=False)
+        ids = [product.pk for product in self.products]
+        self.assertEqual(ProductService.bulk_set_flag(ids, "is_active", False), 2)
+
+    def test_unknown_flag_is_rejected(self):
+        with self.assertRaises(ValueError):
+            ProductService.bulk_set_flag([self.products[0].pk], "price", 0)
+        self.client.post(reverse("admin_panel:product_bulk"), {"ids": [self.products[0].pk], "action": "delete"})
+        self.assertTrue(Product.objects.filter(pk=self.products[0].pk).exists())
+
+
+class OrderBulkStatusTests(StaffTestCase):
+    def place_order(self):
+        client = self.client_class()
+        variant = make_variant(stock=1)
+        client.post(reverse("store:cart_add"), {"product_id": variant.product_id, "size": "M", "quantity": 1})
+        client.get(reverse("store:checkout"))
+        client.post(reverse("store:order_create"), CHECKOUT_DATA)
+        return Order.objects.latest("pk")
+
+    def test_moves_orders_and_the_daily_stats(self):
+        orders = [self.place_order(), self.place_order()]
+        OrderService.update_status(orders[1], Order.Status.CANCELLED)
+        self.client.post(
+            reverse("admin_panel:order_bulk_status"),
+            {"ids": [order.pk for order in orders], "status": Order.Status.CANCELLED},
+        )
+        self.assertEqual(Order.objects.filter(status=Order.Status.CANCELLED).count(), 2)
+        self.assertEqual(OrderDailyStats.objects.get().placed_count, 0)
+
+    def test_invalid_status_changes_nothing(self):
+        order = self.place_order()
+        self.client.post(reverse("admin_panel:order_bulk_status"), {"ids": [order.pk], "status": "lost"})
+        order.refresh_from_db()
+        self.assertEqual(order.status, Order.Status.PLACED)
+
+
+class MessageBulkResolveTests(StaffTestCase):
+    def test_resolves_selected_messages(self):
+        messages = [
+            ContactMessage.objects.create(name="A", email="a@example.com", subject="Hi", message="x")
+            for _ in range(3)
+        ]
+        self.client.post(
+            reverse("admin_panel:message_bulk"), {"ids": [messages[0].pk, messages[1].pk], "action": "resolve"}
+        )
+        self.assertEqual(ContactMessage.objects.filter(is_resolved=True).count(), 2)
+
+    def test_requires_staff(self):
+        message = ContactMessage.objects.create(name="A", email="a@example.com", subject="Hi", message="x")
+        self.client.force_login(User.objects.create_user("shopper"))
+        self.client.post(reverse("admin_panel:message_bulk"), {"ids": [message.pk], "action": "resolve"})
+        message.refresh_from_db()
+        self.assertFalse(message.is_resolved)
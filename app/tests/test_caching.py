@@ -0,0 +1,138 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from app.catalog import bump_catalog_version
+
+from .utils import make_variant
+
+
+class SharedPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.variant = make_variant()
+        # Set by main.js; shared pages are only sent to browsers running it.
+        self.client.cookies["js"] = "1"
+
+    def queries_for(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        return queries.captured_queries
+
+    def test_repeat_visit_is_served_without_queries(self):
+        url = reverse("store:product_list")
+        first = self.client.get(url)
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(first.content, second.content)
+        self.assertContains(second, self.variant.product.name)
+
+    def test_parameter_order_shares_one_entry(self):
+        url = reverse("store:product_list")
+        self.client.get(f"{url}?size=M&category=all")
+        with self.assertNumQueries(0):
+            self.client.get(f"{url}?category=all&size=M")
+
+    def test_unknown_parameters_are_not_cached(self):
+        url = reverse("store:product_list")
+        self.client.get(f"{url}?utm_source=mail")
+        self.assertNotEqual(len(self.queries_for(f"{url}?utm_source=mail")), 0)
+        self.client.get(f"{url}?q=nighty")
+        self.assertNotEqual(len(self.queries_for(f"{url}?q=nighty")), 0)
+
+    def test_catalog_change_invalidates(self):
+        url = reverse("store:home")
+        self.client.get(url)
+        bump_catalog_version()
+        self.assertNotEqual(len(self.queries_for(url)), 0)
+
+    def test_shared_forms_are_left_for_main_js_to_fill(self):
+        url = reverse("store:product_detail", kwargs={"slug": self.variant.product.slug})
+        response = self.client.get(url)
+        self.assertNotContains(response, "csrfmiddlewaretoken")
+        self.assertContains(response, 'data-session-state="')
+
+    def test_visitors_without_scripts_get_forms_they_can_submit(self):
+        del self.client.cookies["js"]
+        url = reverse("store:product_detail", kwargs={"slug": self.variant.product.slug})
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertContains(response, 'name="csrfmiddlewaretoken"', count=2)
+        self.assertNotContains(response, "data-session-state")
+        self.assertNotEqual(len(self.queries_for(url)), 0)
+        token = response.context["csrf_token"]
+        csrf_client = self.client_class(enforce_csrf_checks=True)
+        csrf_client.cookies = self.client.cookies
+        response = csrf_client.post(
+            reverse("store:cart_add"),
+            {"product_id": self.variant.product_id, "size": "M", "quantity": 1, "csrfmiddlewaretoken": str(token)},
+        )
+        self.assertEqual(response.status_code, 302)
+
+    def test_signed_in_visitors_get_their_own_page(self):
+        self.client.force_login(User.objects.create_user("asha", password="secret"))
+        url = reverse("store:product_list")
+        self.client.get(url)
+        self.assertNotEqual(len(self.queries_for(url)), 0)
+
+
+class ConditionalPageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.variant = make_variant()
+        self.client.force_login(User.objects.create_user("asha", password="secret"))
+        self.url = reverse("store:product_detail", args=[self.variant.product.slug])
+        # The first visit issues the CSRF cookie, which is part of the ETag.
+        self.client.get(self.url)
+
+    def test_matching_etag_gets_304(self):
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_when_the_product_does(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.variant.stock_quantity = 2
+            self.variant.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_cart_changes_move_the_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.client.post(reverse("store:cart_add"), {"product_id": self.variant.product_id, "size": "M", "quantity": 1})
+        # The "added to cart" flash message is never answered with a 304.
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_listing_revalidates_on_the_catalog_version(self):
+        url = reverse("store:product_list")
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+        self.assertIn("Cookie", response["Vary"])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+        bump_catalog_version()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 200)
+
+    def test_only_blank_visitors_get_last_modified(self):
+        self.assertNotIn("Last-Modified", self.client.get(self.url))
+        self.client.logout()
+        response = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+
+
+class TestCacheTests(TestCase):
+    def test_suite_does_not_use_the_project_cache(self):
+        self.assertIsInstance(caches["default"], LocMemCache)
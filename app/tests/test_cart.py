@@ -0,0 +1,111 @@
+import json
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .utils import make_variant
+
+AJAX = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"}
+
+
+class CartApiMixin:
+    def add(self, variant, quantity=1):
+        response = self.client.post(
+            reverse("store:cart_add"),
+            {"product_id": variant.product_id, "size": variant.size, "quantity": quantity},
+            **AJAX,
+        )
+        return response.json()
+
+    def add_queries(self, existing_lines):
+        for _ in range(existing_lines):
+            self.add(make_variant())
+        variant = make_variant()
+        count = self.add(variant)["cart_count"]
+        with CaptureQueriesContext(connection) as queries:
+            data = self.add(variant)
+        self.assertTrue(data["success"])
+        self.assertEqual(data["cart_count"], count + 1)
+        self.assertEqual(data["lines"][0]["quantity"], 2)
+        return len(queries)
+
+    def test_add_query_count_does_not_grow_with_the_cart(self):
+        self.assertEqual(self.add_queries(1), self.add_queries(6))
+
+    def test_add_returns_totals_and_the_line(self):
+        variant = make_variant(price="600")
+        data = self.add(variant, 2)
+        self.assertEqual(data["totals"], {"subtotal": "1200.00", "shipping": "0", "total": "1200.00"})
+        self.assertEqual(len(data["lines"]), 1)
+        self.assertIn('data-line-id="%s"' % data["lines"][0]["id"], data["lines"][0]["html"])
+
+    def test_batch_update_reports_changed_and_removed_lines(self):
+        keep, drop = make_variant(stock=3), make_variant()
+        keep_id = self.add(keep)["lines"][0]["id"]
+        drop_id = self.add(drop)["lines"][0]["id"]
+        response = self.client.post(
+            reverse("store:cart_batch"),
+            json.dumps({"items": [{"item_id": keep_id, "quantity": 5}, {"item_id": drop_id, "quantity": 0}]}),
+            content_type="application/json",
+            **AJAX,
+        )
+        data = response.json()
+        self.assertEqual(data["removed"], [drop_id])
+        self.assertEqual([line["quantity"] for line in data["lines"]], [1])
+        self.assertEqual(data["errors"], [{"item_id": keep_id, "error": "Requested quantity exceeds available stock."}])
+        self.assertEqual(data["cart_count"], 1)
+
+    def test_remove(self):
+        line_id = self.add(make_variant())["lines"][0]["id"]
+        data = self.client.post(reverse("store:cart_remove", args=[line_id]), **AJAX).json()
+        self.assertEqual(data["removed"], [line_id])
+        self.assertEqual(data["cart_count"], 0)
+
+    def test_update_over_stock_returns_the_unchanged_line(self):
+        line_id = self.add(make_variant(stock=2))["lines"][0]["id"]
+        response = self.client.post(reverse("store:cart_update"), {"item_id": line_id, "quantity": 5}, **AJAX)
+        self.assertEqual(response.status_code, 400)
+        data = response.json()
+        self.assertEqual(data["error"], "Requested quantity exceeds available stock.")
+        self.assertEqual([line["quantity"] for line in data["lines"]], [1])
+
+    def test_batch_rejects_malformed_bodies_and_reports_unknown_lines(self):
+        url = reverse("store:cart_batch")
+        response = self.client.post(url, "not json", content_type="application/json", **AJAX)
+        self.assertEqual(response.status_code, 400)
+        body = json.dumps({"items": [{"item_id": 999999, "quantity": 1}, "junk"]})
+        data = self.client.post(url, body, content_type="application/json", **AJAX).json()
+        self.assertEqual(
+            data["errors"],
+            [{"item_id": 999999, "error": "Cart item not found."}, {"item_id": None, "error": "Invalid update."}],
+        )
+
+    def test_plain_form_posts_redirect_to_the_cart(self):
+        variant = make_variant()
+        response = self.client.post(
+            reverse("store:cart_add"), {"product_id": variant.product_id, "size": variant.size, "quantity": 1}
+        )
+        self.assertRedirects(response, reverse("store:cart"), fetch_redirect_response=False)
+        self.assertContains(self.client.get(reverse("store:cart")), 'data-line-id="')
+
+
+class CookieCartTests(CartApiMixin, TestCase):
+    pass
+
+
+@override_settings(CART_STORAGE="app.cart_storage.SessionCartStorage")
+class SessionCartTests(CartApiMixin, TestCase):
+    pass
+
+
+@override_settings(CART_STORAGE="app.cart_storage.DatabaseCartStorage")
+class AnonymousDatabaseCartTests(CartApiMixin, TestCase):
+    pass
+
+
+class UserCartTests(CartApiMixin, TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("asha", password="secret"))
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from app.models import Cart
+
+from .utils import make_variant
+
+AJAX = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"}
+
+
+def cart_queries(queries):
+    return [query["sql"] for query in queries if "app_cart" in query["sql"]]
+
+
+@override_settings(CART_STORAGE="app.cart_storage.DatabaseCartStorage")
+class CartMiddlewareTests(TestCase):
+    def add(self, variant, quantity=1):
+        return self.client.post(
+            reverse("store:cart_add"),
+            {"product_id": variant.product_id, "size": variant.size, "quantity": quantity},
+            **AJAX,
+        )
+
+    def test_new_visitor_gets_no_session_or_cart(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("store:contact"))
+        self.assertEqual(response.context["cart_count"], 0)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertEqual(cart_queries(queries), [])
+        self.assertFalse(Cart.objects.exists())
+
+    def test_count_is_served_from_the_session(self):
+        self.add(make_variant(), 2)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("store:contact"))
+        self.assertEqual(response.context["cart_count"], 2)
+        self.assertEqual(cart_queries(queries), [])
+        state = self.client.get(reverse("store:session_state")).json()
+        self.assertEqual(state["cart_count"], 2)
+
+    def test_count_is_recomputed_for_another_user(self):
+        self.add(make_variant(), 2)
+        user = User.objects.create_user("asha", password="secret")
+        cart = Cart.objects.create(user=user, item_count=4)
+        session = self.client.session
+        session["cart"] = {"id": cart.pk, "count": 4, "user": None}
+        session.save()
+        self.client.force_login(user)
+        response = self.client.get(reverse("store:contact"))
+        self.assertEqual(response.context["cart_count"], 4)
+        self.assertEqual(self.client.session["cart"]["user"], user.pk)
@@ -0,0 +1,66 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from app.models import Cart, CartItem
+from app.services import CartService
+
+from .utils import make_variant
+
+
+class CartTotalsTests(TestCase):
+    def setUp(self):
+        self.cart = Cart.objects.create(user=User.objects.create_user("asha"))
+
+    def assertStored(self, count, subtotal):
+        self.assertEqual((self.cart.item_count, self.cart.subtotal), (count, Decimal(subtotal)))
+        self.cart.refresh_from_db()
+        self.assertEqual((self.cart.item_count, self.cart.subtotal), (count, Decimal(subtotal)))
+
+    def test_item_changes_keep_the_columns_current(self):
+        shirt, gown = make_variant(price="400"), make_variant(price="650")
+        CartService.add_items(self.cart, [(shirt, 2), (gown, 1)])
+        self.assertStored(3, "1450")
+        CartService.add_items(self.cart, [(shirt, 1)])
+        self.assertStored(4, "1850")
+        item = CartItem.objects.select_related("variant__product").get(variant=gown)
+        item.cart = self.cart
+        CartService.update_item(item, 3)
+        self.assertStored(6, "3150")
+        CartService.remove_item(item)
+        self.assertStored(3, "1200")
+
+    def test_totals_apply_free_shipping_threshold(self):
+        CartService.add_items(self.cart, [(make_variant(price="500"), 1)])
+        self.assertEqual(CartService.compute_totals(self.cart).total, Decimal("550"))
+        CartService.add_items(self.cart, [(make_variant(price="500"), 1)])
+        self.assertEqual(CartService.compute_totals(self.cart).shipping, 0)
+
+
+class CheckCartTotalsCommandTests(TestCase):
+    def setUp(self):
+        self.cart = Cart.objects.create(user=User.objects.create_user("asha"))
+        CartService.add_items(self.cart, [(make_variant(price="300"), 2)])
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command("check_cart_totals", *args, stdout=out)
+        return out.getvalue()
+
+    def test_reports_and_repairs_drift(self):
+        self.assertIn("All cart totals match.", self.run_command())
+        Cart.objects.filter(pk=self.cart.pk).update(item_count=9, subtotal=Decimal("1"))
+        output = self.run_command()
+        self.assertIn(f"Cart {self.cart.pk}: stored 9 items / 1.00, actual 2 items / 600", output)
+        self.assertIn("1 carts have drifted", output)
+        self.assertIn("Repaired 1 carts.", self.run_command("--fix"))
+        self.cart.refresh_from_db()
+        self.assertEqual((self.cart.item_count, self.cart.subtotal), (2, Decimal("600")))
+
+    def test_skips_inactive_carts_unless_asked(self):
+        Cart.objects.filter(pk=self.cart.pk).update(status=Cart.Status.ORDERED, item_count=9)
+        self.assertIn("All cart totals match.", self.run_command())
+        self.assertIn("1 carts have drifted", self.run_command("--all"))
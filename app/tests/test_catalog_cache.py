@@ -0,0 +1,65 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from app.catalog import (
+    CATALOG_VERSION_KEY,
+    CatalogCache,
+    bump_catalog_version,
+    get_catalog_version,
+    pinned_catalog_version,
+)
+from app.models import Category
+
+
+class CatalogVersionTests(TestCase):
+    def test_bump_moves_the_version(self):
+        version = get_catalog_version()
+        self.assertEqual(bump_catalog_version(), version + 1)
+        self.assertEqual(get_catalog_version(), version + 1)
+
+    def test_version_is_recreated_after_eviction(self):
+        cache.delete(CATALOG_VERSION_KEY)
+        self.assertIsNotNone(bump_catalog_version())
+
+    def test_pinned_version_reads_the_cache_once(self):
+        get_catalog_version()
+        # Reads are only counted around the lookups: some backends implement
+        # incr() with a get(), which is not what is under test.
+        with pinned_catalog_version():
+            with mock.patch("app.catalog.cache.get", wraps=cache.get) as cache_get:
+                version = get_catalog_version()
+                self.assertEqual(get_catalog_version(), version)
+            self.assertEqual(cache_get.call_count, 1)
+            bumped = bump_catalog_version()
+            with mock.patch("app.catalog.cache.get", wraps=cache.get) as cache_get:
+                self.assertEqual(get_catalog_version(), bumped)
+            cache_get.assert_not_called()
+
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.nighty = Category.objects.create(name="Full Nighty")
+            Category.objects.create(name="Retired", is_active=False)
+        self.catalog = CatalogCache()
+
+    def test_lists_active_categories_without_requerying(self):
+        self.assertEqual([category.slug for category in self.catalog.categories()], ["full-nighty"])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.catalog.category("full-nighty"), self.nighty)
+            self.assertIsNone(self.catalog.category("retired"))
+
+    def test_category_changes_reload_the_cache(self):
+        self.catalog.categories()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.nighty.name = "Nighties"
+            self.nighty.save()
+            Category.objects.create(name="Kids")
+        self.assertEqual(self.catalog.category("full-nighty").name, "Nighties")
+        self.assertIsNotNone(self.catalog.category("kids"))
+
+    def test_category_page_title_comes_from_the_cache(self):
+        response = self.client.get(reverse("store:product_list"), {"category": "full-nighty"})
+        self.assertEqual(response.context["page_title"], "Full Nighty")
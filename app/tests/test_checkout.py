@@ -0,0 +1,79 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from app.models import Cart, Order, StockReservation
+
+from .utils import CHECKOUT_DATA, make_variant
+
+
+class CheckoutTests(TestCase):
+    def add_to_cart(self, variant, quantity):
+        self.client.post(
+            reverse("store:cart_add"),
+            {"product_id": variant.product_id, "size": variant.size, "quantity": quantity},
+        )
+
+    def checkout(self):
+        self.assertEqual(self.client.get(reverse("store:checkout")).status_code, 200)
+        return self.client.post(reverse("store:order_create"), CHECKOUT_DATA)
+
+    def assert_ordered(self, response, variant, quantity):
+        order = Order.objects.get()
+        self.assertRedirects(
+            response, reverse("store:order_success", args=[order.order_number]), fetch_redirect_response=False
+        )
+        self.assertEqual(order.items.get().quantity, quantity)
+        variant.refresh_from_db()
+        self.assertEqual(variant.stock_quantity, 0)
+        self.assertFalse(StockReservation.objects.exists())
+        return order
+
+    def test_guest_checkout_with_stock_equal_to_cart_quantity(self):
+        variant = make_variant(stock=3)
+        self.add_to_cart(variant, 3)
+        order = self.assert_ordered(self.checkout(), variant, 3)
+        self.assertIsNone(order.user)
+        self.assertFalse(Cart.objects.exists())
+
+    @override_settings(CART_STORAGE="app.cart_storage.SessionCartStorage")
+    def test_session_storage_guest_checkout(self):
+        variant = make_variant(stock=2)
+        self.add_to_cart(variant, 2)
+        self.assert_ordered(self.checkout(), variant, 2)
+
+    def test_logged_in_checkout_with_stock_equal_to_cart_quantity(self):
+        user = User.objects.create_user("asha", password="secret")
+        self.client.force_login(user)
+        variant = make_variant(stock=4)
+        self.add_to_cart(variant, 4)
+        order = self.assert_ordered(self.checkout(), variant, 4)
+        self.assertEqual(order.user, user)
+        self.assertEqual(Cart.objects.get().status, Cart.Status.ORDERED)
+
+    def test_own_hold_counts_as_available_when_editing_cart(self):
+        variant = make_variant(stock=2)
+        self.add_to_cart(variant, 1)
+        self.client.get(reverse("store:checkout"))
+        self.add_to_cart(variant, 1)
+        self.assert_ordered(self.client.post(reverse("store:order_create"), CHECKOUT_DATA), variant, 2)
+
+    def test_failed_order_leaves_no_cart_rows(self):
+        variant = make_variant(stock=2)
+        self.add_to_cart(variant, 2)
+        self.client.get(reverse("store:checkout"))
+        StockReservation.objects.all().delete()
+        response = self.client.post(reverse("store:order_create"), CHECKOUT_DATA)
+        self.assertRedirects(response, reverse("store:checkout"), fetch_redirect_response=False)
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(Cart.objects.exists())
+
+    def test_login_mid_checkout_keeps_held_lines(self):
+        User.objects.create_user("asha", password="secret", is_staff=True)
+        variant = make_variant(stock=3)
+        self.add_to_cart(variant, 3)
+        self.client.get(reverse("store:checkout"))
+        self.client.post(reverse("admin_panel:login"), {"username": "asha", "password": "secret"})
+        self.assertEqual(Cart.objects.get().items.get().quantity, 3)
+        self.assertFalse(StockReservation.objects.exists())
+        self.assert_ordered(self.checkout(), variant, 3)
@@ -0,0 +1,75 @@
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.db import SessionStore
+from django.core import signing
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.urls import reverse
+
+from app.cart_storage import CompactCartStorage, SignedCookieCartStorage
+
+from .utils import make_variant
+
+AJAX = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"}
+
+
+class CompactEncodingTests(SimpleTestCase):
+    def test_round_trip(self):
+        pairs = {12: 2, 7: 1}
+        self.assertEqual(CompactCartStorage.decode(CompactCartStorage.encode(pairs)), pairs)
+
+    def test_decode_skips_malformed_chunks(self):
+        self.assertEqual(CompactCartStorage.decode("3:2.x:1.4:0.5:-1.6:abc.9:1"), {3: 2, 9: 1})
+        self.assertEqual(CompactCartStorage.decode(None), {})
+
+
+class SignedCookieCartTests(TestCase):
+    def add(self, variant, quantity=1):
+        return self.client.post(
+            reverse("store:cart_add"),
+            {"product_id": variant.product_id, "size": variant.size, "quantity": quantity},
+            **AJAX,
+        )
+
+    def storage(self):
+        request = RequestFactory().get("/")
+        request.COOKIES = {name: morsel.value for name, morsel in self.client.cookies.items()}
+        request.user = AnonymousUser()
+        request.session = SessionStore()
+        return SignedCookieCartStorage(request)
+
+    def test_cart_lives_in_a_signed_cookie(self):
+        variant = make_variant()
+        response = self.add(variant, 2)
+        cookie = response.cookies["cart"]
+        self.assertTrue(cookie["httponly"])
+        self.assertEqual(cookie["samesite"], "Lax")
+        self.assertEqual(self.storage().pairs, {variant.pk: 2})
+
+    def test_tampered_cookie_is_ignored(self):
+        variant = make_variant()
+        self.add(variant)
+        value = self.client.cookies["cart"].value
+        self.client.cookies["cart"] = value.replace(f"{variant.pk}:1", f"{variant.pk}:9", 1)
+        self.assertEqual(self.storage().pairs, {})
+        response = self.client.get(reverse("store:cart"))
+        self.assertEqual(response.context["cart_count"], 0)
+
+    def test_cookie_signed_with_another_salt_is_ignored(self):
+        variant = make_variant()
+        self.client.cookies["cart"] = signing.get_cookie_signer(salt="cart").sign(f"{variant.pk}:3")
+        self.assertEqual(self.storage().pairs, {})
+
+    def test_emptying_the_cart_deletes_the_cookie(self):
+        variant = make_variant()
+        self.add(variant)
+        response = self.client.post(reverse("store:cart_remove", args=[variant.pk]), **AJAX)
+        self.assertEqual(response.cookies["cart"].value, "")
+        self.assertEqual(response.cookies["cart"]["max-age"], 0)
+
+    def test_deactivated_variants_cannot_be_updated(self):
+        variant = make_variant()
+        self.add(variant)
+        variant.is_active = False
+        variant.save(update_fields=["is_active"])
+        response = self.client.post(reverse("store:cart_update"), {"item_id": variant.pk, "quantity": 3}, **AJAX)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.storage().pairs, {variant.pk: 1})
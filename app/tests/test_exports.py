@@ -0,0 +1,50 @@
+import csv
+import io
+
+from django.test import TestCase
+
+from app.exports import order_items_csv, orders_csv
+from app.models import Address, Order, OrderItem
+
+from .utils import make_variant
+
+
+class OrderExportTests(TestCase):
+    def setUp(self):
+        address = Address.objects.create(
+            full_name="=HYPERLINK(\"http://evil\")",
+            phone="+919876543210",
+            address_line="@SUM(A1)",
+            city="Kochi",
+            state="Kerala",
+            pincode="682001",
+            is_snapshot=True,
+        )
+        order = Order.objects.create(order_number="QOTEST000001", subtotal=899, shipping=0, total=899, address=address)
+        variant = make_variant()
+        OrderItem.objects.create(
+            order=order,
+            product=variant.product,
+            variant=variant,
+            product_name="-2+3",
+            variant_snapshot="\tM",
+            unit_price=899,
+            quantity=1,
+        )
+
+    def read(self, stream):
+        return list(csv.DictReader(io.StringIO("".join(stream(Order.objects.all())))))
+
+    def test_orders_csv_escapes_formulas(self):
+        row = self.read(orders_csv)[0]
+        self.assertEqual(row["full_name"], "'=HYPERLINK(\"http://evil\")")
+        self.assertEqual(row["phone"], "'+919876543210")
+        self.assertEqual(row["address"], "'@SUM(A1)")
+        self.assertEqual(row["city"], "Kochi")
+        self.assertEqual(row["items"], "'-2+3 (\tM) x 1")
+        self.assertEqual(row["total"], "899.00")
+
+    def test_order_items_csv_escapes_formulas(self):
+        row = self.read(order_items_csv)[0]
+        self.assertEqual(row["product_name"], "'-2+3")
+        self.assertEqual(row["variant"], "'\tM")
@@ -0,0 +1,95 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from app.catalog import bump_catalog_version
+from app.facets import FacetIndex, mask_from_positions, parse_price, positions_from_mask, sort_sizes
+from app.models import Category, ProductCard
+
+from .utils import make_variant
+
+
+class FacetHelperTests(SimpleTestCase):
+    def test_mask_round_trip(self):
+        positions = [0, 3, 8, 70]
+        self.assertEqual(positions_from_mask(mask_from_positions(positions, 71)), positions)
+
+    def test_parse_price(self):
+        self.assertEqual(parse_price("499.50"), Decimal("499.50"))
+        self.assertIsNone(parse_price("cheap"))
+        self.assertIsNone(parse_price(""))
+
+    def test_sort_sizes_puts_known_sizes_first(self):
+        self.assertEqual(sort_sizes({"XL", "Free", "S", "M"}), ["S", "M", "XL", "Free"])
+
+
+class FacetIndexTests(TestCase):
+    def setUp(self):
+        kids = Category.objects.create(name="Kids")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cheap = make_variant(price="450", size="M").product
+            self.mid = make_variant(price="899", size="L").product
+            self.kids = make_variant(price="1500", size="M", stock=0, category=kids).product
+        self.index = FacetIndex()
+
+    def test_counts_exclude_their_own_filter(self):
+        result = self.index.query(category="full-nighty", size="M")
+        self.assertEqual(result.count, 1)
+        self.assertEqual(result.categories, {"full-nighty": 1, "kids": 0})
+        self.assertEqual(result.sizes, {"M": 1, "L": 1})
+        self.assertEqual(self.index.product_ids(result), [self.cheap.pk])
+
+    def test_price_range_and_buckets(self):
+        result = self.index.query(min_price=Decimal("450"), max_price=Decimal("900"))
+        self.assertEqual(sorted(self.index.product_ids(result)), [self.cheap.pk, self.mid.pk])
+        self.assertEqual(result.prices, {"0-499": 1, "499-999": 1, "999-1999": 1, "1999+": 0})
+
+    def test_in_stock_filter(self):
+        self.assertEqual(self.index.query().in_stock, 2)
+        self.assertEqual(self.index.query(in_stock=True).count, 2)
+
+    def test_applies_the_next_version_in_place(self):
+        self.index.query()
+        card = ProductCard.objects.get(product=self.mid)
+        card.is_active = False
+        version = bump_catalog_version()
+        self.index.apply_cards([card], version)
+        self.assertEqual(self.index.version, version)
+        # The card row is untouched, so a reload would still count it.
+        self.assertEqual(self.index.query().count, 2)
+
+    def test_ignores_out_of_order_versions(self):
+        self.index.query()
+        version = self.index.version
+        card = ProductCard.objects.get(product=self.mid)
+        card.is_active = False
+        self.index.apply_cards([card], version + 2)
+        self.assertEqual(self.index.version, version)
+
+    @override_settings(CATALOG_INDEX_BACKGROUND_RELOAD=True)
+    def test_version_gaps_rebuild_in_the_background(self):
+        self.index.query()
+        with mock.patch("app.catalog.threading.Thread") as thread:
+            with self.captureOnCommitCallbacks(execute=True):
+                make_variant(price="2500", size="XL")
+            # The request keeps answering from the old bitsets meanwhile.
+            self.assertEqual(self.index.query().count, 3)
+            self.assertEqual(self.index.query().count, 3)
+        thread.assert_called_once()
+        target, args = thread.call_args.kwargs["target"], thread.call_args.kwargs["args"]
+        with mock.patch("app.catalog.connections"):
+            target(*args)
+        self.assertEqual(self.index.query().count, 4)
+        self.assertEqual(self.index.query(size="XL").count, 1)
+
+
+class ProductListFacetTests(TestCase):
+    def test_size_options_carry_counts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            make_variant(size="M")
+            make_variant(size="L")
+        response = self.client.get(reverse("store:product_list"), {"size": "M"})
+        self.assertEqual(response.context["size_options"], [("M", 1), ("L", 1)])
+        self.assertEqual(response.context["facets"].count, 1)
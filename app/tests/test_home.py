@@ -0,0 +1,61 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from app.models import Product
+from app.views import HomeView
+
+from .utils import make_variant
+
+
+class HomeRailTests(TestCase):
+    def setUp(self):
+        # Signed-in visitors skip the shared page cache, so each GET renders.
+        self.client.force_login(User.objects.create_user("asha"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.featured = make_variant(is_featured=True).product
+            self.bestseller = make_variant(is_bestseller=True).product
+            self.both = make_variant(is_featured=True, is_bestseller=True).product
+            make_variant()
+
+    def render(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("store:home"))
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_rails_hold_their_flagged_products(self):
+        response, _ = self.render()
+        featured = [card.product_id for card in response.context["featured_products"]]
+        bestsellers = [card.product_id for card in response.context["bestseller_products"]]
+        self.assertEqual(featured, [self.both.pk, self.featured.pk])
+        self.assertEqual(bestsellers, [self.both.pk, self.bestseller.pk])
+
+    def test_rails_are_capped(self):
+        with mock.patch.object(HomeView, "rail_size", 1):
+            response, _ = self.render()
+        self.assertEqual([card.product_id for card in response.context["featured_products"]], [self.both.pk])
+        self.assertEqual([card.product_id for card in response.context["bestseller_products"]], [self.both.pk])
+
+    def test_cached_fragments_skip_the_rail_queries(self):
+        first, cold = self.render()
+        second, warm = self.render()
+        self.assertEqual(first.context["fragment_keys"], second.context["fragment_keys"])
+        self.assertLess(warm, cold)
+        self.assertContains(second, self.featured.name)
+
+    def test_product_change_moves_only_its_rail_keys(self):
+        before, _ = self.render()
+        with self.captureOnCommitCallbacks(execute=True):
+            product = Product.objects.get(pk=self.bestseller.pk)
+            product.name = "Renamed Bestseller"
+            product.save()
+        after, _ = self.render()
+        keys_before, keys_after = before.context["fragment_keys"], after.context["fragment_keys"]
+        self.assertEqual(keys_before["featured"], keys_after["featured"])
+        self.assertNotEqual(keys_before["bestseller"], keys_after["bestseller"])
+        self.assertContains(after, "Renamed Bestseller")
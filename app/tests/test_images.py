@@ -0,0 +1,107 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from app.images import build_derivatives, derivative_name, process_pool
+from app.models import ProductCard, ProductImage
+from app.templatetags.responsive_images import derivative_url, responsive_image
+
+from .utils import make_variant
+
+
+def image_file(size, mode="RGB", color="orange"):
+    buffer = io.BytesIO()
+    Image.new(mode, size, color).save(buffer, "PNG")
+    return ContentFile(buffer.getvalue(), name="photo.png")
+
+
+@override_settings(IMAGE_DERIVATIVE_WIDTHS=[100, 200, 400], IMAGE_DERIVATIVES_ASYNC=False)
+class ImageDerivativeTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_builds_jpeg_and_webp_at_each_smaller_width(self):
+        name = default_storage.save("products/photo.png", image_file((300, 150)))
+        result = build_derivatives(name)
+        self.assertEqual((result["source"], result["width"], result["height"]), (name, 300, 150))
+        self.assertEqual(sorted(result["jpeg"], key=int), ["100", "200", "300"])
+        self.assertEqual(result["webp"]["100"], derivative_name(name, 100, ".webp"))
+        with default_storage.open(result["jpeg"]["100"]) as handle, Image.open(handle) as resized:
+            self.assertEqual((resized.format, resized.size), ("JPEG", (100, 50)))
+
+    def test_transparent_images_are_flattened(self):
+        name = default_storage.save("products/clear.png", image_file((120, 120), "RGBA", (0, 0, 0, 0)))
+        result = build_derivatives(name)
+        with default_storage.open(result["jpeg"]["100"]) as handle, Image.open(handle) as resized:
+            self.assertEqual(resized.convert("RGB").getpixel((50, 50)), (255, 255, 255))
+
+    def test_saving_an_image_records_derivatives_on_the_card(self):
+        product = make_variant().product
+        with self.captureOnCommitCallbacks(execute=True):
+            image = ProductImage.objects.create(product=product, image=image_file((500, 500)), is_primary=True)
+        image.refresh_from_db()
+        self.assertEqual(image.derivatives["source"], image.image.name)
+        card = ProductCard.objects.get(product=product)
+        self.assertEqual(card.image_derivatives["jpeg"], image.derivatives["jpeg"])
+
+    def test_replacing_the_image_deletes_old_derivatives(self):
+        product = make_variant().product
+        with self.captureOnCommitCallbacks(execute=True):
+            image = ProductImage.objects.create(product=product, image=image_file((150, 150)))
+        image.refresh_from_db()
+        old = image.derivatives["jpeg"]["100"]
+        with self.captureOnCommitCallbacks(execute=True):
+            image.image = image_file((150, 150), color="blue")
+            image.save()
+        image.refresh_from_db()
+        self.assertFalse(default_storage.exists(old))
+        self.assertTrue(default_storage.exists(image.derivatives["jpeg"]["100"]))
+
+
+class DerivativeWorkerTests(TestCase):
+    def test_workers_are_spawned_not_forked(self):
+        pool = process_pool(1)
+        self.addCleanup(pool.shutdown)
+        self.assertEqual(pool._mp_context.get_start_method(), "spawn")
+
+    def test_command_builds_static_derivatives(self):
+        static = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, static)
+        Image.new("RGB", (300, 150), "orange").save(f"{static}/banner.png")
+        with override_settings(STATICFILES_DIRS=[static], STATIC_IMAGE_DERIVATIVES=["banner.png"]):
+            call_command("build_image_derivatives", workers=1, stdout=io.StringIO())
+        # Narrower than every configured width, so only a same-size copy.
+        self.assertEqual(sorted(os.listdir(f"{static}/derivatives")), ["banner-300.jpg", "banner-300.webp"])
+
+
+class ResponsiveImageTagTests(TestCase):
+    derivatives = {
+        "jpeg": {"320": "derivatives/a-320.jpg", "640": "derivatives/a-640.jpg"},
+        "webp": {"320": "derivatives/a-320.webp", "640": "derivatives/a-640.webp"},
+    }
+
+    def test_picks_the_smallest_wide_enough_derivative(self):
+        self.assertTrue(derivative_url("a.png", self.derivatives, width=300).endswith("a-320.jpg"))
+        self.assertTrue(derivative_url("a.png", self.derivatives, width=2000).endswith("a-640.jpg"))
+        self.assertTrue(derivative_url("a.png", {}, width=300).endswith("a.png"))
+
+    def test_renders_picture_with_srcsets(self):
+        html = responsive_image("a.png", self.derivatives, alt="Gown", sizes="50vw")
+        self.assertIn('<source type="image/webp" srcset="/media/derivatives/a-320.webp 320w, ', html)
+        self.assertIn('sizes="50vw"', html)
+        self.assertIn('alt="Gown"', html)
+
+    def test_falls_back_to_plain_img(self):
+        self.assertEqual(responsive_image("a.png", None, alt="Gown"), '<img src="/media/a.png" alt="Gown" loading="lazy">')
+        self.assertEqual(responsive_image("", self.derivatives), "")
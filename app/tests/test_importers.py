@@ -0,0 +1,97 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from app.importers import CatalogImporter
+from app.models import Product, ProductImage, ProductVariant
+
+HEADER = "slug,name,category,price,sku,size"
+
+
+class CatalogImporterTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.images = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        self.addCleanup(shutil.rmtree, self.images)
+        settings_override = override_settings(MEDIA_ROOT=self.media, IMAGE_DERIVATIVES_ASYNC=False)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def run_import(self, text, dry_run=False):
+        importer = CatalogImporter(images_dir=self.images, dry_run=dry_run, workers=2)
+        with self.captureOnCommitCallbacks(execute=True):
+            return importer.run(io.StringIO(text), "csv")
+
+    def write_image(self, name, color):
+        Image.new("RGB", (8, 8), color).save(os.path.join(self.images, name))
+
+    def stored_imports(self):
+        folder = os.path.join(self.media, "products", "import")
+        return sorted(os.listdir(folder)) if os.path.isdir(folder) else []
+
+    def test_missing_columns_keep_stored_values(self):
+        self.run_import(
+            "slug,name,category,price,description,is_featured,sku,size,stock_quantity,variant_active\n"
+            "nighty,Nighty,Full Nighty,899,Soft cotton,yes,N-M,M,7,no\n"
+        )
+        report = self.run_import(f"{HEADER}\nnighty,Nighty,Full Nighty,799,N-M,M\n")
+        self.assertEqual(report.errors, [])
+        product = Product.objects.get(slug="nighty")
+        self.assertEqual(product.price, 799)
+        self.assertEqual(product.description, "Soft cotton")
+        self.assertTrue(product.is_featured)
+        variant = ProductVariant.objects.get(sku="N-M")
+        self.assertEqual(variant.stock_quantity, 7)
+        self.assertFalse(variant.is_active)
+
+    def test_dry_run_diff_lists_every_written_field(self):
+        self.run_import(f"{HEADER},stock_quantity\nnighty,Nighty,Full Nighty,899,N-M,M,7\n")
+        report = self.run_import(
+            "slug,name,category,price,description,is_bestseller,sku,size,stock_quantity,variant_active\n"
+            "nighty,Nighty,Full Nighty,899,New copy,yes,N-M,M,5,no\n",
+            dry_run=True,
+        )
+        self.assertEqual(
+            report.diff,
+            [
+                "~ product nighty: is_bestseller False -> True, description changed",
+                "~ variant N-M: stock 7 -> 5, is_active True -> False",
+            ],
+        )
+        self.assertFalse(Product.objects.get().is_bestseller)
+
+    def test_changed_image_replaces_the_earlier_copy(self):
+        self.write_image("front.jpg", "red")
+        self.run_import(f"{HEADER},images\nnighty,Nighty,Full Nighty,899,N-M,M,front.jpg\n")
+        first = ProductImage.objects.get().image.name
+
+        self.write_image("front.jpg", "blue")
+        self.run_import(f"{HEADER},images\nnighty,Nighty,Full Nighty,899,N-M,M,front.jpg\n")
+        image = ProductImage.objects.get()
+        self.assertNotEqual(image.image.name, first)
+        self.assertTrue(image.is_primary)
+        self.assertFalse(default_storage.exists(first))
+        self.assertEqual(self.stored_imports(), [os.path.basename(image.image.name)])
+
+    def test_unchanged_image_is_reused(self):
+        self.write_image("front.jpg", "red")
+        row = f"{HEADER},images\nnighty,Nighty,Full Nighty,899,N-M,M,front.jpg\n"
+        self.run_import(row)
+        self.run_import(row)
+        self.assertEqual(ProductImage.objects.count(), 1)
+        self.assertEqual(len(self.stored_imports()), 1)
+
+    def test_unsaved_batch_removes_its_files(self):
+        self.write_image("front.jpg", "red")
+        with mock.patch.object(CatalogImporter, "_write", side_effect=IntegrityError("boom")):
+            report = self.run_import(f"{HEADER},images\nnighty,Nighty,Full Nighty,899,N-M,M,front.jpg\n")
+        self.assertEqual(len(report.errors), 1)
+        self.assertEqual(self.stored_imports(), [])
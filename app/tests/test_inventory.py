@@ -0,0 +1,151 @@
+import threading
+from collections import Counter
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from app.models import ProductVariant, StockReservation
+from app.services import InventoryService, StockError
+
+from .utils import make_variant
+
+
+class ReservationTests(TestCase):
+    def setUp(self):
+        self.variant = make_variant(stock=5)
+
+    def stock(self):
+        self.variant.refresh_from_db()
+        return self.variant.stock_quantity
+
+    def test_reserve_takes_units_out_of_stock(self):
+        InventoryService.reserve("session:a", {self.variant.pk: 3})
+        self.assertEqual(self.stock(), 2)
+        self.assertEqual(InventoryService.held("session:a"), {self.variant.pk: 3})
+
+    def test_reserving_again_replaces_the_earlier_hold(self):
+        InventoryService.reserve("session:a", {self.variant.pk: 3})
+        InventoryService.reserve("session:a", {self.variant.pk: 1})
+        self.assertEqual(self.stock(), 4)
+        self.assertEqual(StockReservation.objects.get().quantity, 1)
+
+    def test_cannot_reserve_more_than_stock(self):
+        InventoryService.reserve("session:a", {self.variant.pk: 4})
+        with self.assertRaises(StockError):
+            InventoryService.reserve("session:b", {self.variant.pk: 2})
+        self.assertEqual(self.stock(), 1)
+        self.assertFalse(StockReservation.objects.filter(holder="session:b").exists())
+
+    def test_commit_settles_the_difference(self):
+        InventoryService.reserve("session:a", {self.variant.pk: 2})
+        InventoryService.commit("session:a", {self.variant.pk: 3})
+        self.assertEqual(self.stock(), 2)
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_commit_without_hold_is_guarded(self):
+        # commit() joins the caller's transaction, as it does inside create_order.
+        with self.assertRaises(StockError), transaction.atomic():
+            InventoryService.commit(None, {self.variant.pk: 6})
+        self.assertEqual(self.stock(), 5)
+
+    def test_release_returns_the_units(self):
+        InventoryService.reserve("session:a", {self.variant.pk: 2})
+        InventoryService.release("session:a")
+        self.assertEqual(self.stock(), 5)
+        self.assertEqual(InventoryService.held("session:a"), {})
+
+    def test_release_expired_only_touches_old_holds(self):
+        InventoryService.reserve("session:a", {self.variant.pk: 2})
+        InventoryService.reserve("session:b", {self.variant.pk: 1})
+        StockReservation.objects.filter(holder="session:a").update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(InventoryService.release_expired(), 1)
+        self.assertEqual(self.stock(), 4)
+        self.assertEqual(list(StockReservation.objects.values_list("holder", flat=True)), ["session:b"])
+
+    def test_availability_counts_unexpired_holds(self):
+        InventoryService.reserve("session:a", {self.variant.pk: 2})
+        row = InventoryService.availability().get(pk=self.variant.pk)
+        self.assertEqual((row.on_hand, row.reserved, row.available), (5, 2, 3))
+
+
+
+class ConcurrentReservationTests(TransactionTestCase):
+    threads = 12
+    attempts = 6
+    stock = 20
+
+    def setUp(self):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.fail("Threads need a file-backed test database; see DATABASES['default']['TEST'].")
+        self.variant = make_variant(stock=self.stock)
+
+    def run_threads(self, target):
+        barrier = threading.Barrier(self.threads)
+        failures = []
+
+        def run(index):
+            try:
+                barrier.wait()
+                target(index)
+            except Exception as exc:  # Anything but StockError is a failure.
+                failures.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run, args=(index,)) for index in range(self.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(failures, [])
+
+    def test_concurrent_checkouts_never_oversell(self):
+        quantities = {self.variant.pk: 1}
+        outcomes = Counter()
+        outcomes_lock = threading.Lock()
+        lowest = [self.stock]
+        running = threading.Event()
+        running.set()
+
+        def watch():
+            try:
+                while running.is_set():
+                    stock = ProductVariant.objects.values_list("stock_quantity", flat=True).get(pk=self.variant.pk)
+                    lowest[0] = min(lowest[0], stock)
+            finally:
+                connection.close()
+
+        def checkout(index):
+            for attempt in range(self.attempts):
+                holder = f"session:{index}:{attempt}"
+                try:
+                    InventoryService.reserve(holder, quantities)
+                except StockError:
+                    outcome = "rejected"
+                else:
+                    if attempt % 3 == 2:
+                        InventoryService.release(holder)
+                        outcome = "released"
+                    else:
+                        InventoryService.commit(holder, quantities)
+                        outcome = "committed"
+                with outcomes_lock:
+                    outcomes[outcome] += 1
+
+        watcher = threading.Thread(target=watch)
+        watcher.start()
+        try:
+            self.run_threads(checkout)
+        finally:
+            running.clear()
+            watcher.join()
+
+        self.assertEqual(sum(outcomes.values()), self.threads * self.attempts)
+        self.assertGreater(outcomes["rejected"], 0)
+        self.assertLessEqual(outcomes["committed"], self.stock)
+        self.assertGreaterEqual(lowest[0], 0)
+        self.variant.refresh_from_db()
+        self.assertEqual(self.variant.stock_quantity, self.stock - outcomes["committed"])
+        self.assertFalse(StockReservation.objects.exists())
@@ -0,0 +1,66 @@
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.sessions.backends.db import SessionStore
+from django.test import RequestFactory, TestCase, override_settings
+
+from app.cart_storage import SessionCartStorage
+from app.models import Cart
+from app.services import CartService
+
+from .utils import make_variant
+
+
+@override_settings(MAX_CART_QTY=10)
+class MergeCartsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("asha", password="secret")
+        self.cart = Cart.objects.create(user=self.user)
+
+    def anonymous_cart(self, quantities):
+        request = RequestFactory().get("/")
+        request.session = SessionStore()
+        request.user = AnonymousUser()
+        storage = SessionCartStorage(request)
+        storage.pairs.update({variant.pk: quantity for variant, quantity in quantities.items()})
+        return storage
+
+    def merge(self, quantities, existing=None):
+        for variant, quantity in (existing or {}).items():
+            CartService.add_item(self.cart, variant, quantity)
+        result = CartService.merge_carts(self.user, self.anonymous_cart(quantities))
+        lines = dict(self.cart.items.values_list("variant_id", "quantity"))
+        return result, lines
+
+    def test_lines_are_added_together(self):
+        variant = make_variant(stock=8)
+        result, lines = self.merge({variant: 3}, existing={variant: 2})
+        self.assertEqual(lines, {variant.pk: 5})
+        self.assertEqual((result.merged, result.clamped, result.dropped), (1, [], []))
+        self.cart.refresh_from_db()
+        self.assertEqual(self.cart.item_count, 5)
+
+    def test_line_already_at_the_cap_is_not_reported(self):
+        variant = make_variant(stock=20)
+        result, lines = self.merge({variant: 2}, existing={variant: 10})
+        self.assertEqual(lines, {variant.pk: 10})
+        self.assertEqual((result.merged, result.clamped, result.dropped), (0, [], []))
+
+    def test_topping_up_to_the_cap_is_not_reported(self):
+        variant = make_variant(stock=20)
+        result, lines = self.merge({variant: 6}, existing={variant: 7})
+        self.assertEqual(lines, {variant.pk: 10})
+        self.assertEqual(result.clamped, [])
+
+    def test_short_stock_is_reported_as_clamped(self):
+        variant = make_variant(stock=3)
+        result, lines = self.merge({variant: 5})
+        self.assertEqual(lines, {variant.pk: 3})
+        self.assertEqual(result.clamped, [(variant.pk, 5, 3)])
+        self.assertEqual(result.dropped, [])
+
+    def test_unavailable_variants_are_dropped(self):
+        sold_out, inactive = make_variant(stock=0), make_variant()
+        inactive.is_active = False
+        inactive.save()
+        result, lines = self.merge({sold_out: 1, inactive: 1})
+        self.assertEqual(lines, {})
+        self.assertEqual(sorted(result.dropped), sorted([sold_out.pk, inactive.pk]))
@@ -0,0 +1,75 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from app.models import Address, Order, OrderDailyStats
+from app.services import OrderService, OrderStatsService
+
+
+class OrderStatsTests(TestCase):
+    def setUp(self):
+        self.address = Address.objects.create(
+            full_name="Asha", phone="1", address_line="x", city="c", state="s", pincode="1", is_snapshot=True
+        )
+        self.today = timezone.localdate()
+
+    def make_order(self, number, total=100, record=True):
+        order = Order.objects.create(
+            order_number=number, subtotal=total, shipping=0, total=total, address=self.address
+        )
+        if record:
+            OrderStatsService.record_order(order)
+        return order
+
+    def stats(self):
+        return OrderDailyStats.objects.get(date=self.today)
+
+    def test_first_order_creates_the_row_and_later_ones_add_to_it(self):
+        self.make_order("QO1")
+        self.make_order("QO2", total=50)
+        stats = self.stats()
+        self.assertEqual((stats.order_count, stats.revenue, stats.placed_count), (2, 150, 2))
+
+    def test_missing_row_is_built_from_earlier_orders(self):
+        self.make_order("QO1", record=False)
+        self.make_order("QO2")
+        self.assertEqual(self.stats().order_count, 2)
+
+    def test_row_created_concurrently_gets_the_deltas(self):
+        real = OrderStatsService.aggregates
+
+        def created_elsewhere():
+            OrderDailyStats.objects.create(date=self.today, order_count=1, revenue=70, placed_count=1)
+            return real()
+
+        with mock.patch.object(OrderStatsService, "aggregates", side_effect=created_elsewhere):
+            self.make_order("QO1")
+        stats = self.stats()
+        self.assertEqual((stats.order_count, stats.revenue, stats.placed_count), (2, 170, 2))
+
+    def test_status_change_moves_counts(self):
+        order = self.make_order("QO1")
+        OrderService.update_status(order, Order.Status.SHIPPED)
+        stats = self.stats()
+        self.assertEqual((stats.placed_count, stats.shipped_count), (0, 1))
+
+    def test_django_admin_status_change_updates_rollup(self):
+        order = self.make_order("QO1")
+        self.client.force_login(User.objects.create_superuser("admin", password="secret"))
+        response = self.client.post(
+            reverse("admin:app_order_change", args=[order.pk]),
+            {
+                "order_number": "QO1",
+                "status": Order.Status.CANCELLED,
+                "subtotal": "100",
+                "shipping": "0",
+                "total": "100",
+                "address": self.address.pk,
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        stats = self.stats()
+        self.assertEqual((stats.placed_count, stats.cancelled_count), (0, 1))
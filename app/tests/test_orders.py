@@ -0,0 +1,66 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from app.models import Order
+from app.services import OrderService
+
+from .utils import CHECKOUT_DATA, make_variant
+
+
+class OrderNumberTests(TestCase):
+    def place_order(self, client=None):
+        client = client or self.client
+        variant = make_variant(stock=1)
+        client.post(reverse("store:cart_add"), {"product_id": variant.product_id, "size": "M", "quantity": 1})
+        client.get(reverse("store:checkout"))
+        return client.post(reverse("store:order_create"), CHECKOUT_DATA)
+
+    def test_order_numbers_carry_a_random_part(self):
+        number = OrderService._generate_order_number()
+        self.assertRegex(number, r"^QO[A-Z0-9]{10}$")
+        self.assertNotEqual(number, OrderService._generate_order_number())
+
+    def test_taken_number_is_redrawn(self):
+        self.place_order()
+        taken = Order.objects.get().order_number
+        with mock.patch.object(OrderService, "_generate_order_number", side_effect=[taken, "QOFRESH00001"]):
+            self.place_order(self.client_class())
+        self.assertTrue(Order.objects.filter(order_number="QOFRESH00001").exists())
+
+
+class OrderSuccessAccessTests(TestCase):
+    def place_order(self, client):
+        variant = make_variant(stock=1)
+        client.post(reverse("store:cart_add"), {"product_id": variant.product_id, "size": "M", "quantity": 1})
+        client.get(reverse("store:checkout"))
+        client.post(reverse("store:order_create"), CHECKOUT_DATA)
+        order = Order.objects.latest("pk")
+        return reverse("store:order_success", args=[order.order_number])
+
+    def signed_in(self, username):
+        client = self.client_class()
+        client.force_login(User.objects.create_user(username, password="secret"))
+        return client
+
+    def test_guest_order_is_shown_only_to_the_placing_session(self):
+        url = self.place_order(self.client)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client_class().get(url).status_code, 403)
+        # Any signed-in shopper used to be able to open it.
+        self.assertEqual(self.signed_in("ravi").get(url).status_code, 403)
+
+    def test_guest_order_survives_signing_in(self):
+        url = self.place_order(self.client)
+        User.objects.create_user("asha", password="secret")
+        self.client.login(username="asha", password="secret")
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_account_order_is_shown_only_to_its_owner(self):
+        owner = self.signed_in("asha")
+        url = self.place_order(owner)
+        self.assertEqual(owner.get(url).status_code, 200)
+        self.assertEqual(self.signed_in("ravi").get(url).status_code, 403)
+        self.assertEqual(self.client_class().get(url).status_code, 403)
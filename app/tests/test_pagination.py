@@ -0,0 +1,70 @@
+from datetime import timedelta
+from urllib.parse import parse_qs
+
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+from django.views.generic import ListView
+
+from app.models import ProductCard
+from app.pagination import KeysetPaginationMixin, decode_cursor, encode_cursor
+
+from .utils import make_variant
+
+
+class CardListView(KeysetPaginationMixin, ListView):
+    paginate_by = 2
+    keyset_fields = ("created_at", "product_id")
+
+    def get_queryset(self):
+        return ProductCard.objects.all()
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(5):
+                make_variant()
+        # Two cards share a timestamp so the id tie-breaker is exercised.
+        now = timezone.now()
+        cards = list(ProductCard.objects.order_by("product_id"))
+        for offset, card in enumerate(cards):
+            card.created_at = now - timedelta(minutes=min(offset, 3))
+        ProductCard.objects.bulk_update(cards, ["created_at"])
+        self.expected = list(ProductCard.objects.order_by("-created_at", "-product_id").values_list("product_id", flat=True))
+
+    def page(self, query=""):
+        view = CardListView()
+        view.setup(RequestFactory().get(f"/?{query}"))
+        view.object_list = view.get_queryset()
+        return view.get_context_data()["page_obj"]
+
+    def test_next_links_walk_every_row_once(self):
+        seen, query = [], ""
+        while True:
+            page = self.page(query)
+            seen += [card.product_id for card in page]
+            if not page.has_next():
+                break
+            query = page.next_query
+        self.assertEqual(seen, self.expected)
+
+    def test_previous_link_returns_the_earlier_page(self):
+        second = self.page(self.page().next_query)
+        self.assertTrue(second.has_previous())
+        previous = self.page(second.previous_query)
+        self.assertEqual([card.product_id for card in previous], self.expected[:2])
+        self.assertFalse(previous.has_previous())
+
+    def test_links_keep_other_parameters(self):
+        page = self.page("category=all")
+        self.assertEqual(parse_qs(page.next_query)["category"], ["all"])
+
+    def test_bad_cursor_falls_back_to_the_first_page(self):
+        page = self.page("cursor=garbage")
+        self.assertEqual([card.product_id for card in page], self.expected[:2])
+        page = self.page("cursor=" + encode_cursor("next", ["not a date", 1]))
+        self.assertEqual([card.product_id for card in page], self.expected[:2])
+
+    def test_cursor_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor("previous", [3, "a"])), ("previous", [3, "a"]))
+        self.assertIsNone(decode_cursor(encode_cursor("sideways", [])))
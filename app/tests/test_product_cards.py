@@ -0,0 +1,56 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from app.catalog import get_catalog_version
+from app.models import Category, ProductCard, ProductVariant
+from app.services import ProductCardService, ProductService
+
+from .utils import make_variant
+
+
+class ProductCardTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.variant = make_variant(stock=3, size="M", original_price=Decimal("1299"))
+            ProductVariant.objects.create(product=self.variant.product, sku="SKU-L", size="L", stock_quantity=0)
+        self.product = self.variant.product
+
+    def card(self):
+        return ProductCard.objects.get(product=self.product)
+
+    def test_card_mirrors_product_and_in_stock_sizes(self):
+        card = self.card()
+        self.assertEqual((card.name, card.slug, card.category_name), (self.product.name, self.product.slug, "Full Nighty"))
+        self.assertEqual(card.size_list, ["M"])
+        self.assertEqual((card.default_size, card.in_stock), ("M", True))
+        self.assertEqual(card.discount_percent, self.product.discount_percent)
+
+    def test_selling_out_refreshes_the_card(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.variant.stock_quantity = 0
+            self.variant.save()
+        card = self.card()
+        self.assertEqual((card.in_stock, card.sizes), (False, ""))
+
+    def test_category_rename_reaches_cards(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            category = Category.objects.get()
+            category.name = "Nighties"
+            category.save()
+        self.assertEqual(self.card().category_name, "Nighties")
+
+    def test_bulk_flag_change_refreshes_cards(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(ProductService.bulk_set_flag([self.product.pk], "is_featured", True), 1)
+        self.assertTrue(self.card().is_featured)
+
+    def test_refresh_bumps_the_catalog_version(self):
+        version = get_catalog_version()
+        ProductCardService.refresh([self.product.pk])
+        self.assertGreater(get_catalog_version(), version)
+
+    def test_rebuild_recreates_missing_cards(self):
+        ProductCard.objects.all().delete()
+        self.assertEqual(ProductCardService.rebuild(), 1)
+        self.assertTrue(self.card().in_stock)
@@ -0,0 +1,86 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from app.models import CartItem, Order, Product, ProductSalesDaily
+from app.services import OrderService, ProductSalesService
+
+from .utils import CHECKOUT_DATA, make_variant
+
+
+class ProductSalesTests(TestCase):
+    def setUp(self):
+        self.gown = make_variant(stock=20, price="500")
+        self.robe = make_variant(stock=20, price="800")
+        self.today = timezone.localdate()
+
+    def order(self, *lines):
+        items = [
+            CartItem(product=variant.product, variant=variant, quantity=quantity, unit_price=variant.product.price)
+            for variant, quantity in lines
+        ]
+        return OrderService.create_order(items, CHECKOUT_DATA)
+
+    def sales(self, variant):
+        row = ProductSalesDaily.objects.get(product=variant.product, date=self.today)
+        return row.units, row.revenue
+
+    def test_orders_add_to_the_daily_rows(self):
+        self.order((self.gown, 2), (self.robe, 1))
+        self.order((self.gown, 1))
+        self.assertEqual(self.sales(self.gown), (3, Decimal("1500")))
+        self.assertEqual(self.sales(self.robe), (1, Decimal("800")))
+
+    def test_cancelling_and_restoring_moves_the_rollup(self):
+        order = self.order((self.gown, 2))
+        OrderService.update_status(order, Order.Status.CANCELLED)
+        self.assertEqual(self.sales(self.gown), (0, Decimal("0")))
+        OrderService.update_status(order, Order.Status.CONFIRMED)
+        self.assertEqual(self.sales(self.gown), (2, Decimal("1000")))
+
+    def test_bulk_status_change_moves_the_rollup(self):
+        first = self.order((self.gown, 1))
+        second = self.order((self.gown, 2), (self.robe, 1))
+        OrderService.bulk_update_status([first.pk, second.pk], Order.Status.CANCELLED)
+        self.assertEqual(self.sales(self.gown), (0, Decimal("0")))
+        self.assertEqual(self.sales(self.robe), (0, Decimal("0")))
+
+    def test_rebuild_matches_incremental_rows(self):
+        self.order((self.gown, 2), (self.robe, 1))
+        OrderService.update_status(self.order((self.robe, 3)), Order.Status.CANCELLED)
+        expected = set(ProductSalesDaily.objects.filter(units__gt=0).values_list("product_id", "units", "revenue"))
+        ProductSalesDaily.objects.all().delete()
+        out = StringIO()
+        call_command("backfill_product_sales", stdout=out)
+        self.assertIn("Rebuilt 2 product sales rows.", out.getvalue())
+        self.assertEqual(set(ProductSalesDaily.objects.values_list("product_id", "units", "revenue")), expected)
+
+    def test_top_products_ranks_within_the_window(self):
+        self.order((self.gown, 3), (self.robe, 2))
+        ProductSalesDaily.objects.create(
+            product=self.robe.product, date=self.today - timedelta(days=40), units=50, revenue=Decimal("40000")
+        )
+        by_units = ProductSalesService.top_products()
+        self.assertEqual([row["product_id"] for row in by_units], [self.gown.product_id, self.robe.product_id])
+        by_revenue = ProductSalesService.top_products(by="revenue")
+        self.assertEqual([row["product_id"] for row in by_revenue], [self.robe.product_id, self.gown.product_id])
+        self.assertEqual(ProductSalesService.top_products(days=60)[0]["total_sold"], 52)
+
+    def test_refresh_bestsellers_flags_only_the_top(self):
+        Product.objects.filter(pk=self.robe.product_id).update(is_bestseller=True)
+        self.order((self.gown, 3))
+        with self.captureOnCommitCallbacks(execute=True):
+            changed = ProductSalesService.refresh_bestsellers(limit=1)
+        self.assertEqual(sorted(changed), sorted([self.gown.product_id, self.robe.product_id]))
+        bestsellers = Product.objects.filter(is_bestseller=True).values_list("pk", flat=True)
+        self.assertEqual(list(bestsellers), [self.gown.product_id])
+
+    @override_settings(BESTSELLER_AUTO_REFRESH=True)
+    def test_auto_refresh_runs_after_an_order(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order((self.robe, 1))
+        self.assertTrue(Product.objects.get(pk=self.robe.product_id).is_bestseller)
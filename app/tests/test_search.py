@@ -0,0 +1,97 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from app.models import Category, Product, ProductCard
+from app.search import SimpleSearchBackend, SQLiteFTS5Backend, tokenize
+from app.services import ProductCardService
+
+from .utils import make_variant
+
+
+class TokenizeTests(TestCase):
+    def test_lowercases_and_drops_punctuation(self):
+        self.assertEqual(tokenize("Cotton, NIGHTY!"), ["cotton", "nighty"])
+        self.assertEqual(tokenize(None), [])
+
+
+class SearchBackendTests(TestCase):
+    def setUp(self):
+        self.cotton = make_variant(name="Cotton Nighty", description="Soft floral print").product
+        self.satin = make_variant(name="Satin Gown", description="Evening wear").product
+
+    def test_simple_backend_matches_every_token(self):
+        backend = SimpleSearchBackend()
+        self.assertEqual(backend.search("cotton"), [self.cotton.pk])
+        self.assertEqual(backend.search("floral nighty"), [self.cotton.pk])
+        self.assertEqual(backend.search("full"), [self.satin.pk, self.cotton.pk])
+        self.assertEqual(backend.search("cotton evening"), [])
+        self.assertEqual(backend.search("  "), [])
+
+    def test_fts5_backend_indexes_prefixes_and_removes(self):
+        backend = SQLiteFTS5Backend()
+        backend.rebuild()
+        self.assertEqual(backend.search("sat"), [self.satin.pk])
+        self.assertEqual(backend.search("floral"), [self.cotton.pk])
+        self.assertEqual(backend.search("cotton nighty"), [self.cotton.pk])
+        self.assertEqual(sorted(backend.search("full")), [self.cotton.pk, self.satin.pk])
+        backend.remove_products([self.cotton.pk])
+        self.assertEqual(backend.search("floral"), [])
+
+    def test_fts5_backend_ranks_name_above_description(self):
+        backend = SQLiteFTS5Backend()
+        lace = make_variant(name="Lace Robe", description="Pairs with a satin slip").product
+        backend.rebuild()
+        self.assertEqual(backend.search("satin"), [self.satin.pk, lace.pk])
+
+
+    def test_filter_combines_with_the_callers_filters(self):
+        for backend in (SimpleSearchBackend(), SQLiteFTS5Backend()):
+            backend.rebuild()
+            active = Product.objects.filter(is_active=True)
+            self.assertEqual(list(backend.filter(active, "cotton")), [self.cotton])
+            Product.objects.filter(pk=self.cotton.pk).update(is_active=False)
+            self.assertEqual(list(backend.filter(active, "cotton")), [])
+            Product.objects.filter(pk=self.cotton.pk).update(is_active=True)
+            self.assertFalse(backend.filter(active, "  ").exists())
+
+    def test_fts5_filter_ranks_other_models_by_product_id(self):
+        backend = SQLiteFTS5Backend()
+        lace = make_variant(name="Lace Robe", description="Pairs with a satin slip").product
+        backend.rebuild()
+        ProductCardService.refresh([self.satin.pk, lace.pk, self.cotton.pk])
+        cards = backend.filter(ProductCard.objects.all(), "satin", field="product_id")
+        self.assertEqual([card.product_id for card in cards], [self.satin.pk, lace.pk])
+
+    @override_settings(SEARCH_MAX_RESULTS=1)
+    def test_filter_is_not_capped(self):
+        backend = SQLiteFTS5Backend()
+        backend.rebuild()
+        self.assertEqual(len(backend.search("full")), 1)
+        self.assertEqual(backend.filter(Product.objects.all(), "full").count(), 2)
+
+
+class ProductSearchViewTests(TestCase):
+    def test_query_filters_the_product_list(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            cotton = make_variant(name="Cotton Nighty").product
+            make_variant(name="Satin Gown")
+        response = self.client.get(reverse("store:product_list"), {"q": "cotton"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([card.product_id for card in response.context["products"]], [cotton.pk])
+
+    @override_settings(SEARCH_MAX_RESULTS=1)
+    def test_filters_apply_before_any_cap(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            kids = make_variant(name="Cotton Frock", category=Category.objects.create(name="Kids")).product
+            make_variant(name="Cotton Nighty")
+        response = self.client.get(reverse("store:product_list"), {"q": "cotton", "category": "kids"})
+        self.assertEqual([card.product_id for card in response.context["products"]], [kids.pk])
+
+    def test_staff_product_search(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            cotton = make_variant(name="Cotton Nighty").product
+            make_variant(name="Cotton Gown", is_active=False)
+        self.client.force_login(User.objects.create_user("staff", is_staff=True))
+        response = self.client.get(reverse("admin_panel:product_list"), {"search": "cotton", "status": "active"})
+        self.assertEqual(list(response.context["products"]), [cotton])
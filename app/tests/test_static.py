@@ -0,0 +1,82 @@
+import gzip
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from app.checks import check_static_compression
+from app.static_serving import PrecompressedStaticFilesWSGI
+from app.storage import CompressedManifestStaticFilesStorage
+
+
+class PrecompressedStaticFilesTests(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.body = b"body { color: red; }" * 50
+        with open(os.path.join(self.root, "site.0123456789ab.css"), "wb") as handle:
+            handle.write(self.body)
+        with open(os.path.join(self.root, "site.0123456789ab.css.gz"), "wb") as handle:
+            handle.write(gzip.compress(self.body))
+        self.app = PrecompressedStaticFilesWSGI(lambda environ, start_response: [b"django"], self.root, "/static/")
+
+    def call(self, path, **environ):
+        started = {}
+
+        def start_response(status, headers):
+            started.update(status=status, headers=dict(headers))
+
+        result = self.app({"REQUEST_METHOD": "GET", "PATH_INFO": path, **environ}, start_response)
+        return started, result
+
+    def test_serves_gzip_sibling_with_immutable_caching(self):
+        started, result = self.call("/static/site.0123456789ab.css", HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(started["headers"]["Content-Encoding"], "gzip")
+        self.assertIn("immutable", started["headers"]["Cache-Control"])
+        self.assertEqual(gzip.decompress(b"".join(result)), self.body)
+        result.close()
+
+    def test_body_without_file_wrapper_closes_the_file(self):
+        _, result = self.call("/static/site.0123456789ab.css")
+        self.assertEqual(b"".join(result), self.body)
+        handle = result.filelike
+        result.close()
+        self.assertTrue(handle.closed)
+
+    def test_matching_etag_gets_304(self):
+        started, _ = self.call("/static/site.0123456789ab.css")
+        started, result = self.call("/static/site.0123456789ab.css", HTTP_IF_NONE_MATCH=started["headers"]["ETag"])
+        self.assertEqual(started["status"], "304 Not Modified")
+        self.assertEqual(result, [])
+
+    def test_other_paths_fall_through(self):
+        self.assertEqual(self.call("/static/../secret")[1], [b"django"])
+        self.assertEqual(self.call("/products/")[1], [b"django"])
+
+
+class CompressedManifestStorageTests(SimpleTestCase):
+    def test_url_before_collectstatic_falls_back_to_plain_name(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        with override_settings(DEBUG=False, STATIC_ROOT=root):
+            storage = CompressedManifestStaticFilesStorage()
+            self.assertEqual(storage.url("css/style.css"), "/static/css/style.css")
+
+
+@override_settings(STORAGES={"staticfiles": {"BACKEND": "app.storage.CompressedManifestStaticFilesStorage"}})
+class StaticCompressionCheckTests(SimpleTestCase):
+    def test_missing_packages_are_reported(self):
+        with mock.patch("app.storage.rjsmin", None), mock.patch("app.storage.brotli", None):
+            ids = [warning.id for warning in check_static_compression(None)]
+        self.assertEqual(ids, ["app.W001", "app.W002"])
+
+    def test_installed_packages_pass(self):
+        with mock.patch("app.storage.rjsmin", object()), mock.patch("app.storage.brotli", object()):
+            self.assertEqual(check_static_compression(None), [])
+
+    @override_settings(STORAGES={"staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"}})
+    def test_other_storages_are_not_checked(self):
+        with mock.patch("app.storage.rjsmin", None):
+            self.assertEqual(check_static_compression(None), [])
@@ -0,0 +1,56 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from app.services import InventoryService
+
+from .utils import make_variant
+
+
+class StockSyncTests(TestCase):
+    def test_absolute_counts_subtract_open_holds(self):
+        variant = make_variant(stock=5, size="M")
+        InventoryService.reserve("session:a", {variant.pk: 2})
+        result = InventoryService.sync_stock(
+            [{"sku": variant.sku, "quantity": 10}, {"sku": "NOPE", "delta": 1}, {"sku": variant.sku}]
+        )
+        variant.refresh_from_db()
+        self.assertEqual(variant.stock_quantity, 8)
+        self.assertEqual((result.updated, result.unknown, len(result.errors)), (1, ["NOPE"], 1))
+
+    def test_deltas_accumulate_and_clamp_at_zero(self):
+        variant = make_variant(stock=3)
+        InventoryService.sync_stock([{"sku": variant.sku, "delta": -2}, {"sku": variant.sku, "delta": "-5"}])
+        variant.refresh_from_db()
+        self.assertEqual(variant.stock_quantity, 0)
+
+
+@override_settings(INVENTORY_SYNC_TOKEN="s3cret")
+class StockSyncEndpointTests(TestCase):
+    def post(self, client, **headers):
+        return client.post(
+            reverse("admin_panel:inventory_sync"),
+            json.dumps({"updates": [{"sku": self.variant.sku, "quantity": 9}]}),
+            content_type="application/json",
+            **headers,
+        )
+
+    def setUp(self):
+        self.variant = make_variant(stock=1)
+
+    def test_bearer_token_skips_csrf(self):
+        response = self.post(Client(enforce_csrf_checks=True), HTTP_AUTHORIZATION="Bearer s3cret")
+        self.assertEqual(response.json()["updated"], 1)
+        self.variant.refresh_from_db()
+        self.assertEqual(self.variant.stock_quantity, 9)
+
+    def test_wrong_token_is_rejected(self):
+        response = self.post(Client(), HTTP_AUTHORIZATION="Bearer nope")
+        self.assertEqual(response.status_code, 401)
+
+    def test_staff_session_needs_csrf(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(User.objects.create_user("staff", password="secret", is_staff=True))
+        self.assertEqual(self.post(client).status_code, 403)
@@ -0,0 +1,87 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from app.catalog import bump_catalog_version
+from app.models import ProductCard
+from app.suggest import SuggestIndex
+
+from .utils import make_variant
+
+
+class SuggestIndexTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            make_variant(name="Cotton Nighty")
+            make_variant(name="Cotton Kaftan")
+            make_variant(name="Satin Gown")
+        self.index = SuggestIndex()
+
+    def names(self, query, **kwargs):
+        return [suggestion.name for suggestion in self.index.suggest(query, **kwargs)]
+
+    def test_prefix_matches_rank_categories_first(self):
+        self.assertEqual(self.names("full"), ["Full Nighty", "Satin Gown", "Cotton Kaftan", "Cotton Nighty"])
+        self.assertEqual(self.names("cot"), ["Cotton Kaftan", "Cotton Nighty"])
+        self.assertEqual(self.names("cotton nig"), ["Cotton Nighty", "Cotton Kaftan"])
+        self.assertEqual(self.names("cotton kaf"), ["Cotton Kaftan"])
+
+    def test_misspelling_falls_back_to_trigrams(self):
+        self.assertEqual(self.names("sattin"), ["Satin Gown"])
+
+    def test_limit_and_empty_query(self):
+        self.assertEqual(len(self.names("cot", limit=1)), 1)
+        self.assertEqual(self.names("!!"), [])
+
+    def test_reloads_when_catalog_version_moves(self):
+        self.assertEqual(self.names("linen"), [])
+        version = self.index.version
+        with self.captureOnCommitCallbacks(execute=True):
+            make_variant(name="Linen Set")
+        self.assertEqual(self.names("linen"), ["Linen Set"])
+        self.assertNotEqual(self.index.version, version)
+
+
+    def test_refreshed_cards_are_applied_without_a_reload(self):
+        self.names("cot")
+        card = ProductCard.objects.get(name="Cotton Kaftan")
+        card.name = "Linen Kaftan"
+        gone = ProductCard.objects.get(name="Satin Gown")
+        gone.is_active = False
+        with mock.patch.object(SuggestIndex, "load") as load:
+            self.index.apply_cards([card, gone], bump_catalog_version())
+            self.assertEqual(self.names("kaftan"), ["Linen Kaftan"])
+            self.assertEqual(self.names("cotton"), ["Cotton Nighty"])
+            self.assertEqual(self.names("satin"), [])
+        load.assert_not_called()
+
+    @override_settings(CATALOG_INDEX_BACKGROUND_RELOAD=True)
+    def test_version_gaps_rebuild_in_the_background(self):
+        self.names("cot")
+        with mock.patch("app.catalog.threading.Thread") as thread:
+            with self.captureOnCommitCallbacks(execute=True):
+                make_variant(name="Linen Set")
+            # The request keeps the old data and hands the rebuild to a thread.
+            self.assertEqual(self.names("linen"), [])
+            self.assertEqual(self.names("linen"), [])
+        thread.assert_called_once()
+        target, args = thread.call_args.kwargs["target"], thread.call_args.kwargs["args"]
+        with mock.patch("app.catalog.connections"):
+            target(*args)
+        self.assertEqual(self.names("linen"), ["Linen Set"])
+
+
+class SearchSuggestViewTests(TestCase):
+    def test_returns_suggestions_and_search_url(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            variant = make_variant(name="Satin Gown")
+        response = self.client.get(reverse("store:search_suggest"), {"q": "satin"})
+        data = response.json()
+        self.assertEqual(data["search_url"], f"{reverse('store:product_list')}?q=satin")
+        self.assertEqual(data["results"][0]["url"], reverse("store:product_detail", args=[variant.product.slug]))
+        self.assertEqual(data["results"][0]["type"], "product")
+
+    def test_short_query_returns_nothing(self):
+        response = self.client.get(reverse("store:search_suggest"), {"q": "s"})
+        self.assertEqual(response.json()["results"], [])
@@ -0,0 +1,26 @@
+import itertools
+from decimal import Decimal
+
+from app.models import Category, Product, ProductVariant
+
+CHECKOUT_DATA = {
+    "full_name": "Asha Nair",
+    "phone": "9876543210",
+    "address": "12 Beach Road",
+    "city": "Kochi",
+    "state": "Kerala",
+    "pincode": "682001",
+    "payment": "cod",
+}
+
+_names = itertools.count(1)
+
+
+def make_variant(stock=5, price="899", size="M", name=None, category=None, **kwargs):
+    if category is None:
+        category, _ = Category.objects.get_or_create(name="Full Nighty")
+    name = name or f"Cotton Nighty {next(_names)}"
+    product = Product.objects.create(category=category, name=name, price=Decimal(price), **kwargs)
+    return ProductVariant.objects.create(
+        product=product, sku=f"SKU-{product.pk}-{size}", size=size, stock_quantity=stock
+    )
@@ -7,10 +7,13 @@ app_name = "store"
 urlpatterns = [
     path("", views.HomeView.as_view(), name="home"),
     path("products/", views.ProductListView.as_view(), name="product_list"),
+    path("search/suggest/", views.SearchSuggestView.as_view(), name="search_suggest"),
     path("products/<slug:slug>/", views.ProductDetailView.as_view(), name="product_detail"),
+    path("session/state/", views.SessionStateView.as_view(), name="session_state"),
     path("cart/", views.CartView.as_view(), name="cart"),
     path("cart/add/", views.AddToCartView.as_view(), name="cart_add"),
     path("cart/update/", views.UpdateCartItemView.as_view(), name="cart_update"),
+    path("cart/batch/", views.CartBatchUpdateView.as_view(), name="cart_batch"),
     path("cart/remove/<int:item_id>/", views.RemoveCartItemView.as_view(), name="cart_remove"),
     path("checkout/", views.CheckoutView.as_view(), name="checkout"),
     path("checkout/place-order/", views.OrderCreateView.as_view(), name="order_create"),
@@ -1,59 +1,87 @@
+import hashlib
+import json
+from urllib.parse import urlencode
+
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Prefetch, Q
+from django.contrib.messages import get_messages
+from django.db.models import Max, OuterRef, Prefetch, Q, Subquery, prefetch_related_objects
 from django.http import Http404, HttpResponseForbidden, JsonResponse
+from django.middleware.csrf import get_token
 from django.shortcuts import get_object_or_404, redirect
-from django.urls import reverse_lazy
+from django.template.loader import render_to_string
+from django.urls import reverse, reverse_lazy
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import never_cache
 from django.views.generic import DetailView, FormView, ListView, TemplateView, View
 
+from .catalog import catalog_cache, get_catalog_version
+from .conditional import ConditionalPageMixin, SharedPageCacheMixin
+from .facets import facet_index, parse_price, sort_sizes
 from .forms import CartAddForm, CartUpdateForm, CheckoutForm, ContactForm, NewsletterForm
-from .models import CartItem, Category, Order, Product, ProductImage, ProductVariant
-from .services import CartError, CartService, OrderService, StockError
+from .models import CartItem, Order, Product, ProductCard, ProductImage, ProductVariant
+from .pagination import KeysetPaginationMixin
+from .search import get_search_backend
+from .services import CartError, CartService, StockError
+from .suggest import suggest_index
 
 
-class ProductListView(ListView):
+class ProductListView(SharedPageCacheMixin, ConditionalPageMixin, KeysetPaginationMixin, ListView):
     template_name = "category.html"
     context_object_name = "products"
     paginate_by = 24
+    keyset_fields = ("created_at", "product_id")
+    # Searches ("q") are too varied to be worth a shared copy.
+    page_cache_params = ("category", "size", "min_price", "max_price", "cursor", "page")
+
+    def get_validators(self):
+        # Every card refresh and category change bumps the catalog version.
+        return get_catalog_version(), None
+
+    def use_keyset_pagination(self, queryset):
+        return not self.request.GET.get("q")
 
     def get_queryset(self):
-        qs = (
-            Product.objects.active()
-            .select_related("category")
-            .prefetch_related(
-                Prefetch("images", queryset=ProductImage.objects.order_by("-is_primary", "id"))
-            )
-        )
+        qs = ProductCard.objects.filter(is_active=True)
         category = self.request.GET.get("category")
-        min_price = self.request.GET.get("min_price")
-        max_price = self.request.GET.get("max_price")
+        min_price = parse_price(self.request.GET.get("min_price"))
+        max_price = parse_price(self.request.GET.get("max_price"))
         size = self.request.GET.get("size")
         query = self.request.GET.get("q")
 
         if category and category != "all":
-            qs = qs.filter(category__slug=category)
-        if min_price:
+            qs = qs.filter(category_slug=category)
+        if min_price is not None:
             qs = qs.filter(price__gte=min_price)
-        if max_price:
+        if max_price is not None:
             qs = qs.filter(price__lte=max_price)
         if size:
-            qs = qs.filter(variants__size=size, variants__is_active=True, variants__stock_quantity__gt=0)
+            qs = qs.filter(sizes__contains=ProductCard.size_lookup(size))
         if query:
-            qs = qs.filter(
-                Q(name__icontains=query)
-                | Q(description__icontains=query)
-                | Q(category__name__icontains=query)
-            )
-        return qs.distinct()
+            qs = get_search_backend().filter(qs, query, field="product_id")
+        return qs
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["categories"] = Category.objects.filter(is_active=True)
+        category_filter = self.request.GET.get("category")
+        size_filter = self.request.GET.get("size", "")
+        facets = facet_index.query(
+            category=category_filter if category_filter and category_filter != "all" else None,
+            size=size_filter or None,
+            min_price=parse_price(self.request.GET.get("min_price")),
+            max_price=parse_price(self.request.GET.get("max_price")),
+        )
+        context["facets"] = facets
+        context["categories"] = [
+            (category, facets.categories.get(category.slug, 0))
+            for category in catalog_cache.categories()
+        ]
         context["page_title"] = "Shop All Products"
         context["active_page"] = "collection"
         category_slug = self.request.GET.get("category")
         if category_slug and category_slug != "all":
-            category = Category.objects.filter(slug=category_slug).first()
+            category = catalog_cache.category(category_slug)
             if category:
                 context["page_title"] = category.name
         context["filters"] = {
@@ -63,38 +91,128 @@ class ProductListView(ListView):
             "size": self.request.GET.get("size", ""),
             "q": self.request.GET.get("q", ""),
         }
-        context["size_options"] = ["S", "M", "L", "XL", "XXL", "6M", "12M", "18M", "24M", "3Y"]
+        sizes = set(facets.sizes) | ({size_filter} if size_filter else set())
+        context["size_options"] = [(size, facets.sizes.get(size, 0)) for size in sort_sizes(sizes)]
         return context
 
 
-class HomeView(TemplateView):
+class SearchSuggestView(View):
+    http_method_names = ["get"]
+
+    def get(self, request, *args, **kwargs):
+        query = request.GET.get("q", "").strip()
+        max_limit = getattr(settings, "SEARCH_SUGGEST_LIMIT", 8)
+        try:
+            limit = min(int(request.GET.get("limit", max_limit)), max_limit)
+        except ValueError:
+            limit = max_limit
+        suggestions = suggest_index.suggest(query, limit=max(limit, 1)) if len(query) >= 2 else []
+        return JsonResponse(
+            {
+                "query": query,
+                "results": [suggestion.as_dict() for suggestion in suggestions],
+                "search_url": f"{reverse('store:product_list')}?{urlencode({'q': query})}",
+            }
+        )
+
+
+def fragment_key(rows):
+    """Digest of ``(pk, updated_at)`` pairs; changes whenever a rail's contents do."""
+    return hashlib.md5("|".join(f"{pk}:{updated_at.isoformat()}" for pk, updated_at in rows).encode()).hexdigest()
+
+
+@method_decorator(never_cache, name="dispatch")
+class SessionStateView(View):
+    """Per-visitor parts of the layout, fetched by main.js on shared cached pages."""
+
+    http_method_names = ["get"]
+
+    def get(self, request, *args, **kwargs):
+        cart = getattr(request, "cart", None)
+        return JsonResponse(
+            {
+                "authenticated": request.user.is_authenticated,
+                "cart_count": cart.count if cart is not None else 0,
+                "csrf_token": get_token(request),
+                "messages": [{"message": str(message), "tags": message.tags} for message in get_messages(request)],
+            }
+        )
+
+
+class HomeView(SharedPageCacheMixin, TemplateView):
     template_name = "index.html"
+    rail_size = 8
+    rail_ordering = ("-created_at", "-product_id")
+
+    def get_rails(self):
+        """Fetch the featured and bestseller rails' ``(pk, updated_at)`` in one query."""
+        rows = (
+            ProductCard.objects.filter(Q(is_featured=True) | Q(is_bestseller=True), is_active=True)
+            .order_by(*self.rail_ordering)
+            .values_list("pk", "updated_at", "is_featured", "is_bestseller")
+        )
+        rails = {"featured": [], "bestseller": []}
+        for pk, updated_at, is_featured, is_bestseller in rows:
+            if is_featured and len(rails["featured"]) < self.rail_size:
+                rails["featured"].append((pk, updated_at))
+            if is_bestseller and len(rails["bestseller"]) < self.rail_size:
+                rails["bestseller"].append((pk, updated_at))
+        return rails
+
+    def rail_products(self, rows):
+        # Only evaluated when the fragment is not cached.
+        return ProductCard.objects.filter(pk__in=[pk for pk, _ in rows]).order_by(*self.rail_ordering)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["categories"] = Category.objects.filter(is_active=True)
-        variant_qs = ProductVariant.objects.filter(is_active=True, stock_quantity__gt=0).order_by("id")
-        context["featured_products"] = (
-            Product.objects.active()
-            .filter(is_featured=True)
-            .select_related("category")
-            .prefetch_related("images", Prefetch("variants", queryset=variant_qs))[:8]
-        )
-        context["bestseller_products"] = (
-            Product.objects.active()
-            .filter(is_bestseller=True)
-            .select_related("category")
-            .prefetch_related("images", Prefetch("variants", queryset=variant_qs))[:8]
-        )
+        categories = catalog_cache.categories()
+        rails = self.get_rails()
+        context["categories"] = categories
+        context["featured_products"] = self.rail_products(rails["featured"])
+        context["bestseller_products"] = self.rail_products(rails["bestseller"])
+        # Cards are rebuilt (bumping updated_at) whenever their product, variants or
+        # images change, so these keys move exactly when a rail's contents do.
+        context["fragment_keys"] = {
+            "categories": fragment_key((category.pk, category.updated_at) for category in categories),
+            "featured": fragment_key(rails["featured"]),
+            "bestseller": fragment_key(rails["bestseller"]),
+        }
+        context["fragment_timeout"] = getattr(settings, "HOME_FRAGMENT_CACHE_TIMEOUT", 60 * 60 * 24)
         context["active_page"] = "home"
         return context
 
 
-class ProductDetailView(DetailView):
+class ProductDetailView(SharedPageCacheMixin, ConditionalPageMixin, DetailView):
     template_name = "product.html"
     context_object_name = "product"
     slug_url_kwarg = "slug"
 
+    def get_validators(self):
+        # Cards refresh whenever an image or variant is saved or deleted and
+        # when stock crosses zero, so the category's newest card also covers
+        # removed rows and the related products strip.
+        newest_card = (
+            ProductCard.objects.filter(category_slug=OuterRef("category__slug"))
+            .order_by("-updated_at")
+            .values("updated_at")[:1]
+        )
+        rows = (
+            Product.objects.active()
+            .filter(slug=self.kwargs[self.slug_url_kwarg])
+            .values("updated_at", "category__updated_at")
+            .annotate(
+                images_at=Max("images__updated_at"),
+                variants_at=Max("variants__updated_at"),
+                cards_at=Subquery(newest_card),
+            )
+            .order_by()[:1]
+        )
+        row = next(iter(rows), None)
+        if row is None:
+            return None
+        last_modified = max(value for value in row.values() if value is not None)
+        return last_modified.isoformat(), last_modified
+
     def get_queryset(self):
         return (
             Product.objects.active()
@@ -113,29 +231,61 @@ class ProductDetailView(DetailView):
         context["sizes"] = sorted({variant.size for variant in variants})
         context["colors"] = sorted({variant.color for variant in variants if variant.color})
         context["related_products"] = (
-            Product.objects.active()
-            .filter(category=product.category)
-            .exclude(pk=product.pk)
-            .select_related("category")[:4]
+            ProductCard.objects.filter(is_active=True, category_slug=product.category.slug)
+            .exclude(pk=product.pk)[:4]
         )
         context["add_form"] = CartAddForm(initial={"product_id": product.id, "quantity": 1})
         context["active_page"] = "collection"
         return context
 
 
+def is_ajax(request):
+    return request.headers.get("x-requested-with") == "XMLHttpRequest"
+
+
+def cart_payload(request, lines=(), removed=(), errors=()):
+    """JSON body for cart API responses: totals plus a rendered row per given line.
+
+    ``removed`` lists the ids of lines that no longer exist (removed, or set
+    to zero). Only the given lines are rendered; the rest of the cart is not read.
+    """
+    cart = request.cart
+    lines = list(lines)
+    prefetch_related_objects(lines, "product__images")
+    totals = cart.totals()
+    return {
+        "success": not errors,
+        "errors": list(errors),
+        "cart_count": cart.count,
+        "totals": {
+            "subtotal": str(totals.subtotal),
+            "shipping": str(totals.shipping),
+            "total": str(totals.total),
+        },
+        "lines": [
+            {
+                "id": line.pk,
+                "quantity": line.quantity,
+                "line_total": str(line.line_total),
+                "html": render_to_string("partials/cart_item.html", {"item": line}, request=request),
+            }
+            for line in lines
+        ],
+        "removed": list(removed),
+    }
+
+
 class CartView(TemplateView):
     template_name = "cart.html"
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        cart = CartService.get_or_create_cart(self.request)
-        items = cart.items.select_related("product", "variant").prefetch_related("product__images").all()
-        totals = CartService.compute_totals(cart)
+        cart = self.request.cart
         context.update(
             {
                 "cart": cart,
-                "items": items,
-                "totals": totals,
+                "items": cart.lines(),
+                "totals": cart.totals(),
                 "update_form": CartUpdateForm(),
                 "active_page": "cart",
             }
@@ -147,48 +297,42 @@ class AddToCartView(View):
     http_method_names = ["post"]
 
     def post(self, request, *args, **kwargs):
-        is_ajax = request.headers.get("x-requested-with") == "XMLHttpRequest"
         form = CartAddForm(request.POST)
         if not form.is_valid():
             messages.error(request, "Invalid cart data.")
-            if is_ajax:
+            if is_ajax(request):
                 return JsonResponse({"success": False, "error": "Invalid cart data."}, status=400)
-            product_id = request.POST.get("product_id")
-            if product_id and Product.objects.filter(pk=product_id).exists():
-                product = Product.objects.get(pk=product_id)
-                return redirect("store:product_detail", slug=product.slug)
+            product_id = request.POST.get("product_id", "")
+            slug = Product.objects.filter(pk=product_id).values_list("slug", flat=True).first() if product_id.isdigit() else None
+            if slug:
+                return redirect("store:product_detail", slug=slug)
             return redirect("store:cart")
         data = form.cleaned_data
-        product = get_object_or_404(Product, pk=data["product_id"])
-        if ProductVariant.objects.filter(product=product, color__isnull=False).exclude(color="").exists():
-            if not data.get("color"):
-                messages.error(request, "Please select a color.")
-                if is_ajax:
-                    return JsonResponse({"success": False, "error": "Please select a color."}, status=400)
-                return redirect("store:product_detail", slug=product.slug)
-        variant = ProductVariant.objects.filter(
-            product=product,
-            size=data["size"],
-            color=data.get("color", ""),
-            is_active=True,
-        ).first()
+        choice = CartService.resolve_variant(data["product_id"], data["size"], data.get("color", ""))
+        if choice is None:
+            raise Http404("Product not found.")
+        product = choice.product
+        if choice.needs_color and not data.get("color"):
+            messages.error(request, "Please select a color.")
+            if is_ajax(request):
+                return JsonResponse({"success": False, "error": "Please select a color."}, status=400)
+            return redirect("store:product_detail", slug=product.slug)
+        variant = choice.variant
         if not variant:
             messages.error(request, "Selected variant is unavailable.")
-            if is_ajax:
+            if is_ajax(request):
                 return JsonResponse({"success": False, "error": "Selected variant is unavailable."}, status=400)
             return redirect("store:product_detail", slug=product.slug)
-        cart = CartService.get_or_create_cart(request)
         try:
-            CartService.add_item(cart, variant, data["quantity"])
+            line = request.cart.add(variant, data["quantity"])
         except StockError as exc:
             messages.error(request, str(exc))
-            if is_ajax:
+            if is_ajax(request):
                 return JsonResponse({"success": False, "error": str(exc)}, status=400)
         else:
+            if is_ajax(request):
+                return JsonResponse(cart_payload(request, [line]))
             messages.success(request, "Added to cart.")
-            if is_ajax:
-                cart_count = sum(item.quantity for item in cart.items.all())
-                return JsonResponse({"success": True, "cart_count": cart_count})
         action = request.POST.get("action", "add")
         if action == "buy":
             return redirect("store:checkout")
@@ -203,14 +347,29 @@ class UpdateCartItemView(View):
     def post(self, request, *args, **kwargs):
         form = CartUpdateForm(request.POST)
         if not form.is_valid():
+            if is_ajax(request):
+                return JsonResponse({"success": False, "error": "Invalid update."}, status=400)
             messages.error(request, "Invalid update.")
             return redirect("store:cart")
-        cart = CartService.get_or_create_cart(request)
-        item = get_object_or_404(CartItem, pk=form.cleaned_data["item_id"], cart=cart)
+        item_id = form.cleaned_data["item_id"]
         try:
-            CartService.update_item(item, form.cleaned_data["quantity"])
+            line = request.cart.update(item_id, form.cleaned_data["quantity"])
+        except CartItem.DoesNotExist:
+            if is_ajax(request):
+                return JsonResponse({"success": False, "error": "Cart item not found."}, status=404)
+            raise Http404("Cart item not found.")
         except StockError as exc:
+            if is_ajax(request):
+                return JsonResponse(
+                    {**cart_payload(request, [request.cart.line(item_id)], errors=[str(exc)]), "error": str(exc)},
+                    status=400,
+                )
             messages.error(request, str(exc))
+        else:
+            if is_ajax(request):
+                if line is None:
+                    return JsonResponse(cart_payload(request, removed=[item_id]))
+                return JsonResponse(cart_payload(request, [line]))
         return redirect("store:cart")
 
 
@@ -218,27 +377,81 @@ class RemoveCartItemView(View):
     http_method_names = ["post"]
 
     def post(self, request, *args, **kwargs):
-        cart = CartService.get_or_create_cart(request)
-        item = get_object_or_404(CartItem, pk=kwargs.get("item_id"), cart=cart)
-        item.delete()
+        item_id = kwargs.get("item_id")
+        try:
+            request.cart.remove(item_id)
+        except CartItem.DoesNotExist:
+            if is_ajax(request):
+                return JsonResponse({"success": False, "error": "Cart item not found."}, status=404)
+            raise Http404("Cart item not found.")
+        if is_ajax(request):
+            return JsonResponse(cart_payload(request, removed=[item_id]))
         messages.success(request, "Item removed.")
         return redirect("store:cart")
 
 
+class CartBatchUpdateView(View):
+    """Apply several quantity changes in one request; a quantity of 0 removes the line.
+
+    Expects a JSON body ``{"items": [{"item_id": 1, "quantity": 2}, ...]}``.
+    Lines that fail (unknown or over stock) are reported in ``errors`` and the
+    rest are still applied.
+    """
+
+    http_method_names = ["post"]
+
+    def post(self, request, *args, **kwargs):
+        try:
+            items = json.loads(request.body).get("items")
+        except (ValueError, AttributeError):
+            items = None
+        if not isinstance(items, list) or not items:
+            return JsonResponse({"success": False, "error": 'Expected a JSON object with an "items" list.'}, status=400)
+        lines = {}
+        removed = []
+        errors = []
+        for entry in items:
+            form = CartUpdateForm(entry if isinstance(entry, dict) else {})
+            if not form.is_valid():
+                errors.append({"item_id": None, "error": "Invalid update."})
+                continue
+            item_id = form.cleaned_data["item_id"]
+            try:
+                line = request.cart.update(item_id, form.cleaned_data["quantity"])
+            except CartItem.DoesNotExist:
+                errors.append({"item_id": item_id, "error": "Cart item not found."})
+                continue
+            except StockError as exc:
+                errors.append({"item_id": item_id, "error": str(exc)})
+                line = request.cart.line(item_id)
+            if line is None:
+                lines.pop(item_id, None)
+                removed.append(item_id)
+            else:
+                lines[item_id] = line
+        return JsonResponse(cart_payload(request, lines.values(), removed, errors=errors))
+
+
 class CheckoutView(TemplateView):
     template_name = "checkout.html"
 
     def dispatch(self, request, *args, **kwargs):
-        cart = CartService.get_or_create_cart(request)
-        if not cart.items.exists():
+        if request.cart.is_empty():
             messages.info(request, "Your cart is empty.")
             return redirect("store:cart")
         return super().dispatch(request, *args, **kwargs)
 
+    def get(self, request, *args, **kwargs):
+        try:
+            request.cart.reserve()
+        except StockError as exc:
+            messages.error(request, str(exc))
+            return redirect("store:cart")
+        return super().get(request, *args, **kwargs)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        cart = CartService.get_or_create_cart(self.request)
-        totals = CartService.compute_totals(cart)
+        cart = self.request.cart
         payment_method = self.request.GET.get("payment")
         if payment_method not in {"cod", "whatsapp"}:
             payment_method = None
@@ -246,8 +459,8 @@ class CheckoutView(TemplateView):
         context.update(
             {
                 "cart": cart,
-                "items": cart.items.select_related("product", "variant").prefetch_related("product__images"),
-                "totals": totals,
+                "items": cart.lines(),
+                "totals": cart.totals(),
                 "form": CheckoutForm(initial=initial),
                 "active_page": "cart",
             }
@@ -260,19 +473,18 @@ class OrderCreateView(FormView):
     template_name = "checkout.html"
 
     def dispatch(self, request, *args, **kwargs):
-        cart = CartService.get_or_create_cart(request)
-        if not cart.items.exists():
+        if request.cart.is_empty():
             messages.info(request, "Your cart is empty.")
             return redirect("store:cart")
         return super().dispatch(request, *args, **kwargs)
 
     def form_valid(self, form):
-        cart = CartService.get_or_create_cart(self.request)
         try:
-            order = OrderService.create_order(cart, form.cleaned_data)
+            order = self.request.cart.place_order(form.cleaned_data)
         except (CartError, StockError) as exc:
             messages.error(self.request, str(exc))
             return redirect("store:checkout")
+        self.request.cart.clear()
         self.request.session["last_order_number"] = order.order_number
         if form.cleaned_data.get("payment") == "whatsapp":
             messages.info(self.request, "We will contact you on WhatsApp to confirm your order.")
@@ -295,12 +507,13 @@ class OrderSuccessView(DetailView):
     def dispatch(self, request, *args, **kwargs):
         order_number = kwargs.get("order_number")
         order = get_object_or_404(Order, order_number=order_number)
-        if request.user.is_authenticated:
-            if order.user and order.user != request.user:
-                return HttpResponseForbidden()
+        if order.user_id:
+            allowed = order.user_id == request.user.pk
         else:
-            if request.session.get("last_order_number") != order_number:
-                return HttpResponseForbidden()
+            # Guest orders are only shown to the session that placed them.
+            allowed = request.session.get("last_order_number") == order_number
+        if not allowed:
+            return HttpResponseForbidden()
         return super().dispatch(request, *args, **kwargs)
 
     def get_context_data(self, **kwargs):
@@ -343,7 +556,7 @@ class ContactView(FormView):
         return context
 
 
-class StaticPageView(TemplateView):
+class StaticPageView(SharedPageCacheMixin, TemplateView):
     template_name = "about.html"
 
     def get_context_data(self, **kwargs):
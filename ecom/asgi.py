@@ -11,6 +11,9 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from app.static_serving import PrecompressedStaticFilesASGI
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ecom.settings')
 
-application = get_asgi_application()
+# Collected static files (precompressed, fingerprinted) are served ahead of Django.
+application = PrecompressedStaticFilesASGI(get_asgi_application())
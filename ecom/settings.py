@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,10 +43,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'app.middleware.CatalogVersionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'app.middleware.CartMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -78,9 +81,36 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # WAL lets readers run alongside the single writer; IMMEDIATE takes
+            # the write lock at BEGIN so checkouts queue instead of failing
+            # with "database is locked" on lock upgrade.
+            'init_command': 'PRAGMA journal_mode=WAL;PRAGMA synchronous=NORMAL',
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+        # A file, not the default in-memory database, so the concurrent stock
+        # tests can open one connection per thread.
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+    }
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# Shared between worker processes on the host; point this at Redis or
+# Memcached when running on more than one machine.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache',
     }
 }
 
+# Swaps in a private in-memory cache so tests never touch the one above.
+TEST_RUNNER = "app.tests.runner.TestRunner"
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -122,6 +152,15 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
+# collectstatic minifies CSS/JS, fingerprints names and writes .gz/.br
+# siblings; ecom.wsgi/ecom.asgi serve them with far-future cache headers.
+# JS minification and .br need the rjsmin and brotli packages (checks
+# app.W001/app.W002 warn when they are missing).
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "app.storage.CompressedManifestStaticFilesStorage"},
+}
+STATIC_MAX_AGE = 60 * 60
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
@@ -135,6 +174,39 @@ SESSION_COOKIE_SAMESITE = "Lax"
 FREE_SHIPPING_THRESHOLD = 999
 FLAT_SHIPPING_FEE = 50
 MAX_CART_QTY = 10
+# Anonymous carts; signed-in shoppers always use the database backend.
+CART_STORAGE = "app.cart_storage.SignedCookieCartStorage"
+CART_COOKIE_NAME = "cart"
+CART_COOKIE_AGE = 60 * 60 * 24 * 30
+STOCK_RESERVATION_TTL = 15 * 60
+# When enabled, is_bestseller follows the sales ranking instead of being set by hand.
+BESTSELLER_AUTO_REFRESH = False
+BESTSELLER_WINDOW_DAYS = 30
+BESTSELLER_COUNT = 8
+BESTSELLER_REFRESH_INTERVAL = 300
+# Caps SearchBackend.search() id lists; list pages filter in the database instead.
+SEARCH_MAX_RESULTS = 500
+SEARCH_SUGGEST_LIMIT = 8
+# Per-process catalog indexes rebuild in a background thread after a catalog
+# change, serving their previous data meanwhile; False rebuilds inline.
+CATALOG_INDEX_BACKGROUND_RELOAD = True
+FACET_PRICE_BUCKETS = [499, 999, 1999]
+KEYSET_COUNT_CACHE_SECONDS = 60
+CATALOG_IMPORT_BATCH_SIZE = 500
+CATALOG_IMPORT_WORKERS = 4
+# Bearer token for the warehouse stock sync endpoint; empty disables token access.
+INVENTORY_SYNC_TOKEN = os.environ.get("INVENTORY_SYNC_TOKEN", "")
+INVENTORY_SYNC_CHUNK_SIZE = 500
+# Resized JPEG/WebP copies built after upload in a background process pool.
+IMAGE_DERIVATIVE_WIDTHS = [320, 640, 1024, 1600]
+IMAGE_DERIVATIVE_WORKERS = 2
+IMAGE_DERIVATIVES_ASYNC = True
+# Static images with derivatives, built at deploy time (not committed) by
+# `manage.py build_image_derivatives` ahead of collectstatic.
+STATIC_IMAGE_DERIVATIVES = ["images/banner.png"]
+HOME_FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+# Anonymous storefront pages, keyed on URL and catalog version.
+PAGE_CACHE_TIMEOUT = 10 * 60
 LOGIN_URL = "/accounts/login/"
 LOGIN_REDIRECT_URL = "/"
 LOGOUT_REDIRECT_URL = "/"
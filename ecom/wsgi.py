@@ -11,6 +11,9 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from app.static_serving import PrecompressedStaticFilesWSGI
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ecom.settings')
 
-application = get_wsgi_application()
+# Collected static files (precompressed, fingerprinted) are served ahead of Django.
+application = PrecompressedStaticFilesWSGI(get_wsgi_application())
@@ -1,127 +1,112 @@
-// Queen Orange - Cart Management
+// Queen Orange - Cart page updates in place through the JSON cart API
 
-// Initialize cart from localStorage
-function initCart() {
-    const cart = localStorage.getItem('queenOrangeCart');
-    return cart ? JSON.parse(cart) : [];
-}
+const CART_BATCH_DELAY = 400;
 
-// Save cart to localStorage
-function saveCart(cart) {
-    localStorage.setItem('queenOrangeCart', JSON.stringify(cart));
-    updateCartCount();
+function cartRequest(url, options = {}) {
+    return fetch(url, {
+        method: "POST",
+        credentials: "same-origin",
+        ...options,
+        headers: {
+            "X-CSRFToken": getCookie("csrftoken"),
+            "X-Requested-With": "XMLHttpRequest",
+            ...(options.headers || {}),
+        },
+    }).then((response) => response.json());
 }
 
-// Get cart
-function getCart() {
-    return initCart();
+function formatPrice(value) {
+    return `₹${value}`;
 }
 
-// Add to cart
-function addToCart(productId, size, quantity = 1) {
-    const product = getProductById(productId);
-    if (!product) {
-        alert('Product not found!');
-        return false;
-    }
-    
-    if (!size) {
-        alert('Please select a size!');
-        return false;
+function applyCartPayload(cart, data) {
+    (data.lines || []).forEach((line) => {
+        const row = cart.querySelector(`.cart-item[data-line-id="${line.id}"]`);
+        if (!row) return;
+        const template = document.createElement("template");
+        template.innerHTML = line.html.trim();
+        row.replaceWith(template.content.firstElementChild);
+    });
+    (data.removed || []).forEach((lineId) => {
+        const row = cart.querySelector(`.cart-item[data-line-id="${lineId}"]`);
+        if (row) row.remove();
+    });
+    if (data.totals) {
+        cart.querySelector("[data-cart-subtotal]").textContent = formatPrice(data.totals.subtotal);
+        cart.querySelector("[data-cart-shipping]").textContent =
+            Number(data.totals.shipping) === 0 ? "FREE" : formatPrice(data.totals.shipping);
+        cart.querySelector("[data-cart-total]").textContent = formatPrice(data.totals.total);
     }
-    
-    const cart = getCart();
-    const existingItem = cart.find(item => item.id === productId && item.size === size);
-    
-    if (existingItem) {
-        existingItem.quantity += quantity;
-    } else {
-        cart.push({
-            id: productId,
-            name: product.name,
-            price: product.price,
-            image: product.image,
-            size: size,
-            quantity: quantity,
-            category: product.category
-        });
+    updateCartBadge(data.cart_count);
+    (data.errors || []).forEach((error) => showNotification(error.error || error, "error"));
+    if (!cart.querySelector(".cart-item")) {
+        // Let the server render the empty-cart state.
+        window.location.reload();
     }
-    
-    saveCart(cart);
-    return true;
 }
 
-// Remove from cart
-function removeFromCart(productId, size) {
-    let cart = getCart();
-    cart = cart.filter(item => !(item.id === productId && item.size === size));
-    saveCart(cart);
-}
+function initCartPage() {
+    const cart = document.querySelector("[data-cart]");
+    if (!cart) return;
 
-// Update quantity
-function updateQuantity(productId, size, quantity) {
-    const cart = getCart();
-    const item = cart.find(item => item.id === productId && item.size === size);
-    
-    if (item) {
-        if (quantity <= 0) {
-            removeFromCart(productId, size);
-        } else {
-            item.quantity = quantity;
-            saveCart(cart);
+    // Quantity clicks are applied to the input immediately and sent together
+    // once the shopper pauses, as one batch request.
+    const pending = new Map();
+    let timer = null;
+
+    async function flush() {
+        timer = null;
+        if (!pending.size) return;
+        const items = Array.from(pending, ([itemId, quantity]) => ({ item_id: itemId, quantity }));
+        pending.clear();
+        try {
+            const data = await cartRequest(cart.dataset.batchUrl, {
+                headers: { "Content-Type": "application/json" },
+                body: JSON.stringify({ items }),
+            });
+            if (data.error) {
+                showNotification(data.error, "error");
+                return;
+            }
+            applyCartPayload(cart, data);
+        } catch (error) {
+            showNotification("Unable to update your cart.", "error");
         }
     }
-}
-
-// Get cart total
-function getCartTotal() {
-    const cart = getCart();
-    return cart.reduce((total, item) => total + (item.price * item.quantity), 0);
-}
-
-// Get cart count
-function getCartCount() {
-    const cart = getCart();
-    return cart.reduce((count, item) => count + item.quantity, 0);
-}
-
-// Clear cart
-function clearCart() {
-    localStorage.removeItem('queenOrangeCart');
-    updateCartCount();
-}
-
-// Update cart count in header
-function updateCartCount() {
-    const count = getCartCount();
-    const cartCountElements = document.querySelectorAll('.cart-count, .cart-badge');
-    cartCountElements.forEach(element => {
-        element.textContent = count;
-        element.style.display = count > 0 ? 'flex' : 'none';
-    });
-}
 
-// Generate WhatsApp message for cart
-function generateWhatsAppMessage() {
-    const cart = getCart();
-    if (cart.length === 0) {
-        return 'Hello Queen Orange! I am interested in your products.';
-    }
-    
-    let message = 'Hello Queen Orange! I want to order:\n\n';
-    cart.forEach((item, index) => {
-        message += `${index + 1}. ${item.name}\n`;
-        message += `   Size: ${item.size}\n`;
-        message += `   Quantity: ${item.quantity}\n`;
-        message += `   Price: ₹${item.price} x ${item.quantity} = ₹${item.price * item.quantity}\n\n`;
+    cart.addEventListener("submit", async (event) => {
+        const form = event.target;
+        if (form.matches("[data-cart-update]")) {
+            event.preventDefault();
+            const button = event.submitter;
+            if (!button || button.name !== "quantity") return;
+            const itemId = Number(form.querySelector('input[name="item_id"]').value);
+            const input = form.querySelector(".quantity-input");
+            const step = Number(button.value) - Number(input.value);
+            const quantity = Math.max(0, (pending.get(itemId) ?? Number(input.value)) + step);
+            pending.set(itemId, quantity);
+            input.value = quantity;
+            form.querySelectorAll(".quantity-btn").forEach((quantityButton, index) => {
+                quantityButton.value = index === 0 ? quantity - 1 : quantity + 1;
+            });
+            clearTimeout(timer);
+            timer = setTimeout(flush, CART_BATCH_DELAY);
+        } else if (form.matches("[data-cart-remove]")) {
+            event.preventDefault();
+            const itemId = Number(form.closest(".cart-item").dataset.lineId);
+            pending.delete(itemId);
+            try {
+                const data = await cartRequest(form.action, { body: new FormData(form) });
+                if (!data.success) {
+                    showNotification(data.error || "Unable to remove this item.", "error");
+                    return;
+                }
+                applyCartPayload(cart, data);
+            } catch (error) {
+                showNotification("Unable to remove this item.", "error");
+            }
+        }
     });
-    message += `Total: ₹${getCartTotal()}`;
-    return encodeURIComponent(message);
-}
-
-// Generate WhatsApp link
-function getWhatsAppLink(message = null, phone = '919876543210') {
-    const finalMessage = message || generateWhatsAppMessage();
-    return `https://wa.me/${phone}?text=${finalMessage}`;
 }
 
+document.addEventListener("DOMContentLoaded", initCartPage);
@@ -157,7 +157,67 @@ function initQuickAddToCart() {
     });
 }
 
+function showFlashMessages(messages) {
+    if (!messages.length) return;
+    const header = document.querySelector(".header");
+    if (!header) return;
+    const container = document.createElement("div");
+    container.className = "container js-flash-messages";
+    container.style.marginTop = "var(--space-4)";
+    messages.forEach((message) => {
+        const notification = document.createElement("div");
+        notification.className = `notification ${message.tags}`;
+        notification.style.position = "relative";
+        notification.style.opacity = "1";
+        notification.textContent = message.message;
+        container.appendChild(notification);
+    });
+    header.after(container);
+}
+
+function fillCsrfTokens(token) {
+    document.querySelectorAll('form[method="post"]').forEach((form) => {
+        let input = form.querySelector('input[name="csrfmiddlewaretoken"]');
+        if (!input) {
+            input = document.createElement("input");
+            input.type = "hidden";
+            input.name = "csrfmiddlewaretoken";
+            form.prepend(input);
+        }
+        input.value = token;
+    });
+}
+
+// Tells the server this browser runs scripts, so it may be sent shared cached
+// pages whose forms rely on fillCsrfTokens (SharedPageCacheMixin.script_cookie).
+function markScriptsEnabled() {
+    if (!getCookie("js")) {
+        document.cookie = "js=1; path=/; max-age=31536000; SameSite=Lax";
+    }
+}
+
+// Shared cached pages leave out per-visitor parts of the layout; fetch them here.
+async function initSessionState() {
+    const url = document.body.dataset.sessionState;
+    if (!url) return;
+    try {
+        const response = await fetch(url, {
+            credentials: "same-origin",
+            headers: { "X-Requested-With": "XMLHttpRequest" },
+        });
+        if (!response.ok) return;
+        const data = await response.json();
+        fillCsrfTokens(data.csrf_token);
+        updateCartBadge(data.cart_count);
+        showFlashMessages(data.messages);
+    } catch (error) {
+        // The page still works; quick add-to-cart re-reads the CSRF cookie.
+    }
+}
+
 document.addEventListener("DOMContentLoaded", () => {
+    markScriptsEnabled();
+    initSessionState();
     initQuickAddToCart();
 });
 
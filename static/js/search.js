@@ -1,11 +1,24 @@
 // Navbar Search functionality
+const SEARCH_DEBOUNCE_MS = 200;
+let searchDebounceTimer = null;
+let searchController = null;
+
+function escapeHtml(value) {
+    const div = document.createElement('div');
+    div.textContent = value == null ? '' : String(value);
+    return div.innerHTML;
+}
+
 function performSearch(event) {
-    const query = event.target.value.toLowerCase().trim();
+    const query = event.target.value.trim();
     const resultsContainer = document.getElementById('navbarSearchResults');
     
     if (!resultsContainer) return;
     
+    clearTimeout(searchDebounceTimer);
+    
     if (query.length === 0) {
+        if (searchController) searchController.abort();
         resultsContainer.innerHTML = '';
         resultsContainer.classList.remove('active');
         return;
@@ -17,45 +30,73 @@ function performSearch(event) {
         return;
     }
     
-    // Search through all products
-    const results = PRODUCTS.filter(product => 
-        product.name.toLowerCase().includes(query) ||
-        product.category.toLowerCase().includes(query) ||
-        (product.description && product.description.toLowerCase().includes(query))
-    );
+    searchDebounceTimer = setTimeout(() => fetchSuggestions(query, resultsContainer), SEARCH_DEBOUNCE_MS);
+}
+
+async function fetchSuggestions(query, resultsContainer) {
+    if (searchController) searchController.abort();
+    searchController = new AbortController();
+    const endpoint = resultsContainer.dataset.suggestUrl || '/search/suggest/';
+    
+    let data;
+    try {
+        const response = await fetch(endpoint + '?q=' + encodeURIComponent(query), {
+            headers: { 'X-Requested-With': 'XMLHttpRequest' },
+            signal: searchController.signal,
+        });
+        if (!response.ok) return;
+        data = await response.json();
+    } catch (error) {
+        return;
+    }
+    renderSuggestions(query, data, resultsContainer);
+}
+
+function renderSuggestions(query, data, resultsContainer) {
+    const results = data.results || [];
     
     if (results.length === 0) {
-        resultsContainer.innerHTML = '<div class="search-message" style="padding: var(--space-6); text-align: center; color: var(--gray-600); font-size: 15px;">No products found matching "' + query + '"</div>';
+        resultsContainer.innerHTML = '<div class="search-message" style="padding: var(--space-6); text-align: center; color: var(--gray-600); font-size: 15px;">No products found matching "' + escapeHtml(query) + '"</div>';
         resultsContainer.classList.add('active');
         return;
     }
     
     // Display results
     let html = '<div style="padding: var(--space-5);">';
-    html += '<div style="font-size: 12px; font-weight: 700; color: var(--primary-dark); margin-bottom: var(--space-4); text-transform: uppercase; letter-spacing: 1px;">Found ' + results.length + ' product(s)</div>';
+    html += '<div style="font-size: 12px; font-weight: 700; color: var(--primary-dark); margin-bottom: var(--space-4); text-transform: uppercase; letter-spacing: 1px;">Suggestions</div>';
     html += '<div style="display: grid; gap: var(--space-2);">';
     
-    results.slice(0, 5).forEach(product => {
+    results.forEach(result => {
+        if (result.type === 'category') {
+            html += `
+            <a href="${escapeHtml(result.url)}" class="navbar-search-result-item" style="display: flex; gap: var(--space-3); padding: var(--space-3); border-radius: 12px; transition: all 0.2s ease; text-decoration: none; color: inherit;">
+                <div style="flex: 1; display: flex; flex-direction: column; justify-content: center; gap: 4px;">
+                    <div style="font-size: 10px; color: var(--primary); text-transform: uppercase; letter-spacing: 0.5px; font-weight: 700;">Category</div>
+                    <div style="font-size: 14px; font-weight: 600; color: var(--black); line-height: 1.3;">${escapeHtml(result.name)}</div>
+                </div>
+            </a>
+        `;
+            return;
+        }
+        const image = result.image
+            ? `<img src="${escapeHtml(result.image)}" alt="${escapeHtml(result.name)}" loading="lazy" style="width: 100%; height: 100%; object-fit: cover;">`
+            : '';
         html += `
-            <a href="product.html?id=${product.id}" class="navbar-search-result-item" style="display: flex; gap: var(--space-3); padding: var(--space-3); border-radius: 12px; transition: all 0.2s ease; text-decoration: none; color: inherit;">
+            <a href="${escapeHtml(result.url)}" class="navbar-search-result-item" style="display: flex; gap: var(--space-3); padding: var(--space-3); border-radius: 12px; transition: all 0.2s ease; text-decoration: none; color: inherit;">
                 <div style="width: 60px; height: 75px; flex-shrink: 0; border-radius: 8px; overflow: hidden; background: var(--gray-100);">
-                    <img src="${product.image}" alt="${product.name}" loading="lazy" style="width: 100%; height: 100%; object-fit: cover;">
+                    ${image}
                 </div>
                 <div style="flex: 1; display: flex; flex-direction: column; justify-content: center; gap: 4px;">
-                    <div style="font-size: 10px; color: var(--primary); text-transform: uppercase; letter-spacing: 0.5px; font-weight: 700;">${product.category}</div>
-                    <div style="font-size: 14px; font-weight: 600; color: var(--black); line-height: 1.3;">${product.name}</div>
-                    <div style="font-size: 16px; font-weight: 800; color: var(--primary-dark);">₹${product.price}</div>
+                    <div style="font-size: 10px; color: var(--primary); text-transform: uppercase; letter-spacing: 0.5px; font-weight: 700;">${escapeHtml(result.category)}</div>
+                    <div style="font-size: 14px; font-weight: 600; color: var(--black); line-height: 1.3;">${escapeHtml(result.name)}</div>
+                    <div style="font-size: 16px; font-weight: 800; color: var(--primary-dark);">₹${escapeHtml(result.price)}</div>
                 </div>
             </a>
         `;
     });
     
     html += '</div>';
-    
-    if (results.length > 5) {
-        html += '<div style="margin-top: var(--space-4); padding-top: var(--space-4); border-top: 1px solid var(--gray-200); text-align: center;"><a href="category.html?search=' + encodeURIComponent(query) + '" class="btn btn-primary" style="padding: var(--space-3) var(--space-6); font-size: 13px;">View All ' + results.length + ' Results</a></div>';
-    }
-    
+    html += '<div style="margin-top: var(--space-4); padding-top: var(--space-4); border-top: 1px solid var(--gray-200); text-align: center;"><a href="' + escapeHtml(data.search_url) + '" class="btn btn-primary" style="padding: var(--space-3) var(--space-6); font-size: 13px;">View All Results</a></div>';
     html += '</div>';
     
     resultsContainer.innerHTML = html;
@@ -117,14 +158,7 @@ function toggleSearchOverlay() {
 document.addEventListener('DOMContentLoaded', function() {
     const navbarSearchInput = document.getElementById('navbarSearchInput');
     if (navbarSearchInput) {
-        navbarSearchInput.addEventListener('keypress', function(e) {
-            if (e.key === 'Enter') {
-                const query = this.value.trim();
-                if (query.length >= 2) {
-                    window.location.href = 'category.html?search=' + encodeURIComponent(query);
-                }
-            }
-        });
+        navbarSearchInput.addEventListener('input', performSearch);
         
         // Close search results when clicking outside
         document.addEventListener('click', function(e) {
@@ -155,7 +189,7 @@ document.addEventListener('DOMContentLoaded', function() {
         const searchBtn = document.querySelector('.search-btn');
         
         if (navbarSearch && navbarSearch.classList.contains('mobile-search-active')) {
-            if (!navbarSearch.contains(e.target) && !searchBtn.contains(e.target)) {
+            if (!navbarSearch.contains(e.target) && !(searchBtn && searchBtn.contains(e.target))) {
                 toggleSearchOverlay();
             }
         }